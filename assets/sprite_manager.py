@@ -15,6 +15,7 @@ SPRITE_CONFIG_PATH = os.path.join(ASSETS_DIR, "config.json")
 # --------------- global cache ---------------
 _image_cache: dict[str, pygame.Surface] = {}
 _config_cache: dict | None = None
+_tile_sprites_cache: list = []   # [result] once load_tile_sprites has run
 
 
 def _get_config() -> dict | None:
@@ -144,7 +145,16 @@ class SpriteSet:
 # --------------- high-level loaders ---------------
 
 def load_tile_sprites() -> dict[int, pygame.Surface] | None:
-    """Load tile sprites according to config. Returns {tile_id: Surface} or None."""
+    """Load tile sprites according to config. Returns {tile_id: Surface} or None.
+
+    Cut once and shared by every IsoMap (the dict is never mutated).
+    """
+    if not _tile_sprites_cache:
+        _tile_sprites_cache.append(_load_tile_sprites())
+    return _tile_sprites_cache[0]
+
+
+def _load_tile_sprites() -> dict[int, pygame.Surface] | None:
     cfg = _get_config()
     if not cfg or "tiles" not in cfg:
         return None
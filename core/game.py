@@ -1,22 +1,28 @@
 # ============================================================
 #  Game core: state management, main loop — isometric RPG
 # ============================================================
+import os
 import pygame
 from core.settings import (
     SCREEN_WIDTH, SCREEN_HEIGHT, INTERNAL_WIDTH, INTERNAL_HEIGHT,
     PIXEL_SCALE, FPS, COLOR_BG, WINDOW_TITLE,
     STATE_LOGIN, STATE_MENU, STATE_SETTINGS, STATE_PLAYING,
     STATE_PAUSED, STATE_GAME_OVER, STATE_COMBAT, STATE_SAVE_PROMPT,
-    ENABLE_LOGIN,
+    ENABLE_LOGIN, PROCGEN_ZONE_SIZE,
 )
 from world.camera import Camera
+from world.influence import InfluenceMaps
 from entities.entity import EntityManager
 from entities.player import Player
 from ui.ui_manager import UIManager
+from ui.ui_menu import SETTINGS_ROWS
 from systems.chat_log import ChatLog
 from systems.combat_scene import CombatScene
+from systems.combat import is_trivial_encounter
 from systems.i18n import t, tf, switch_language, set_language
 from core.logger import get_logger
+from core import rng
+from core.replay import KeyboardInput
 
 log = get_logger("game")
 
@@ -24,17 +30,26 @@ _PLAYING_STATES = (STATE_PLAYING, STATE_PAUSED, STATE_COMBAT)
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, input_source=None, seed=None, headless=False):
+        # Headless: no window, no audio, no login — just the simulation,
+        # driven by an injected InputSource (bots, soak tests, CI).
+        self.headless = headless
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
         pygame.init()
-        pygame.display.set_caption(WINDOW_TITLE)
 
         # Load saved settings and apply before creating the display
         from core.settings_manager import SettingsManager
         self.settings_mgr = SettingsManager()
         set_language(self.settings_mgr.language)
-        flags = pygame.FULLSCREEN if self.settings_mgr.fullscreen else 0
         w, h = self.settings_mgr.resolution
-        self.screen = pygame.display.set_mode((w, h), flags)
+        if headless:
+            self.screen = pygame.Surface((w, h))   # offscreen, never shown
+        else:
+            pygame.display.set_caption(WINDOW_TITLE)
+            flags = pygame.FULLSCREEN if self.settings_mgr.fullscreen else 0
+            self.screen = pygame.display.set_mode((w, h), flags)
         # Sync module-level constants so all UI/entity code uses correct dimensions
         import core.settings as _s
         _s.SCREEN_WIDTH = w
@@ -44,7 +59,13 @@ class Game:
         self.canvas = pygame.Surface((INTERNAL_WIDTH, INTERNAL_HEIGHT))
         self.clock = pygame.time.Clock()
         self.running = True
-        self.state = STATE_LOGIN if ENABLE_LOGIN else STATE_MENU
+        self.state = STATE_LOGIN if ENABLE_LOGIN and not headless else STATE_MENU
+
+        # Determinism: all gameplay randomness comes from seeded streams,
+        # all input from one InputSource (keyboard, recorder or replay)
+        self.seed = rng.seed_all(seed)
+        self.input = input_source or KeyboardInput()
+        self.frame = 0
         self._settings_caller = STATE_MENU  # which state opened the settings screen
 
         # Save slot tracking
@@ -52,15 +73,20 @@ class Game:
         self._prompt_action = None  # "quit" | "main_menu"
 
         # Music (initialized after display so mixer is ready)
-        from systems.music import MusicManager
-        self.music_mgr = MusicManager()
-        self.music_mgr.set_volume(self.settings_mgr.music_volume)
-        if self.settings_mgr.music_enabled:
-            self.music_mgr.play()
+        self.music_mgr = None
+        if not headless:
+            from systems.music import MusicManager
+            self.music_mgr = MusicManager()
+            self.music_mgr.set_volume(self.settings_mgr.music_volume)
+            if self.settings_mgr.music_enabled:
+                self.music_mgr.play()
 
         # Subsystems
         self.scene_mgr = None
+        self.world = None          # SeamlessWorld over scene_mgr (seamless mode)
+        self.pathfinder = None     # ZonePathfinder: routes across zones
         self.iso_map = None
+        self.influence = None      # InfluenceMaps of the active scene (enemy AI)
         self.zones = []
         self._current_zone_id = None
         self._zone_banner_timer = 0
@@ -77,15 +103,32 @@ class Game:
         self.combat_scene = CombatScene()
 
         # Login UI (created once, lives here)
-        from ui.ui_login import LoginUI
-        self.login_ui = LoginUI()
+        self.login_ui = None
+        if not headless:
+            from ui.ui_login import LoginUI
+            self.login_ui = LoginUI()
+
+    def new_game(self, slot=None):
+        """Start a fresh game straight into gameplay (menu 'empty slot')."""
+        self.load_level()
+        self.save_slot = slot
+        self.state = STATE_PLAYING
 
     def load_level(self):
         from world.demo_level import build_demo_level
         log.info("Loading demo level")
         data = build_demo_level()
 
+        if self.scene_mgr:
+            self.scene_mgr.close()
         self.scene_mgr = data["scene_mgr"]
+        # Neighbour warm-up runs on a worker thread (inline when headless)
+        from world.scene_manager import SceneWarmer
+        self.scene_mgr.warmer = SceneWarmer(self._bake_scene, threaded=not self.headless)
+        from world.seamless import SeamlessWorld
+        self.world = SeamlessWorld(self.scene_mgr)
+        from world.pathfinding import ZonePathfinder
+        self.pathfinder = ZonePathfinder(self.scene_mgr, data["zone_tiles"])
         self.dialogue_manager = data["dialogue_mgr"]
         self.quest_manager = data["quest_mgr"]
         self.shop_manager = data["shop_mgr"]
@@ -109,15 +152,42 @@ class Game:
         self.chat_log.add(t("welcome_msg"), "system")
         log.info("Level loaded: player at (%s, %s)", px, py)
 
+    def load_procedural_zone(self, biome="meadow", seed=None, size=PROCGEN_ZONE_SIZE):
+        """Generate a procedural zone, register it as a scene and move the player in.
+
+        Terrain streams in from a worker thread (generated inline when
+        headless or recording/replaying, so simulations stay deterministic).
+        """
+        from world.procgen import build_procedural_scene, procedural_zone_id
+        if seed is None:
+            seed = self.seed
+        zone_id = procedural_zone_id(biome, seed, size)
+        if not self.scene_mgr.has_zone(zone_id):
+            scene = build_procedural_scene(zone_id, seed, biome, size, size,
+                                           threaded=not (self.headless
+                                                         or self.input.deterministic))
+            self.scene_mgr.add(zone_id, scene)
+            self.zones.append(scene["meta"])
+        self._activate_scene(zone_id)
+        player = self.entities.player
+        player.wx, player.wy = self.scene_mgr.active["player_start"]
+        self.camera.snap(player.wx, player.wy)
+        return zone_id
+
     def _activate_scene(self, zone_id: str, start_fade: bool = True):
         """Switch active scene: update iso_map, entities, minimap, banner."""
+        scene = self.scene_mgr.get(zone_id)     # builds the zone on first visit
         self.scene_mgr.active_id = zone_id
-        scene = self.scene_mgr.active
+        self.scene_mgr.trim()                   # evict scenes beyond the budget
         self.iso_map = scene["iso_map"]
-        self.entities.enemies = list(scene["enemies"])
+        self.influence = InfluenceMaps.for_scene(scene)
+        # Shared with the scene's SpawnDirector, which recycles/respawns in place
+        self.entities.enemies = scene["enemies"]
         self.entities.npcs    = list(scene["npcs"])
-        self.entities.projectiles = []   # clear any in-flight projectiles
-        self.ui.minimap.build(self.iso_map)
+        # In-flight projectiles are dropped, unless parked in a seamless neighbour
+        self.entities.projectiles = scene.pop("projectiles", [])
+        baked = self.scene_mgr.take_baked(zone_id)
+        self.ui.minimap.build(self.iso_map, baked.get("minimap"))
 
         # Zone entry banner
         self._current_zone_id = zone_id
@@ -131,15 +201,31 @@ class Game:
             self.scene_mgr.start_fade()
 
         # Switch to zone-appropriate music
-        if hasattr(self, "music_mgr") and self.music_mgr:
+        if self.music_mgr:
             self.music_mgr.play_zone(zone_id)
 
         log.info("Scene activated: %s", zone_id)
 
+    def _bake_scene(self, zone_id, scene):
+        """Warm-up for a prefetched neighbour; runs on the SceneWarmer thread."""
+        m = scene["iso_map"]
+        baked = {"nav": m.bake_nav(), "minimap": self.ui.minimap.render(m)}
+        if self.music_mgr:
+            self.music_mgr.preload_zone(zone_id)
+        return baked
+
+    @property
+    def seamless(self) -> bool:
+        """Seamless world mode is on and the active zone is part of the grid."""
+        return (self.world is not None and self.settings_mgr.seamless_world
+                and self.world.covers(self.scene_mgr.active_id))
+
     def try_scene_transition(self, direction: str, cross_coord: float) -> bool:
         """Move player to adjacent scene. Return True if transitioned."""
         if not self.scene_mgr:
             return False
+        if self.seamless:
+            return self.world.cross(self, direction)
         neighbor = self.scene_mgr.neighbor_id(direction)
         if not neighbor:
             return False
@@ -161,23 +247,58 @@ class Game:
         elif direction == "north":
             player.wx, player.wy = cross_coord, self.iso_map.rows - 1.5
 
-        player.wx, player.wy = self.iso_map.nearest_walkable(player.wx, player.wy)
+        player.wx, player.wy = self.iso_map.nearest_walkable(
+            player.wx, player.wy, player.radius)
 
         self.camera.snap(player.wx, player.wy)
         log.info("Scene transition: %s -> %s", prev_zone, neighbor)
         return True
 
     def start_combat(self, enemy):
-        """Trigger turn-based combat."""
+        """Trigger turn-based combat (or resolve a trivial one on the spot)."""
         if self.state == STATE_COMBAT:
             return
+        if self._try_instant_combat(enemy):
+            return
         log.info("Combat started: player vs %s", enemy.enemy_type)
         self.state = STATE_COMBAT
         self.combat_scene.start(self.entities.player, enemy, self)
-        self.music_mgr.play_combat()
+        if self.music_mgr:
+            self.music_mgr.play_combat()
+
+    def _try_instant_combat(self, enemy):
+        """'instant' combat speed: fight trivial encounters without the scene."""
+        sm = self.settings_mgr
+        player = self.entities.player
+        if sm.combat_speed != "instant" or not is_trivial_encounter(player, enemy, sm.difficulty):
+            return False
+        result = self.combat_scene.resolve_instantly(player, enemy, self)
+        if result == "win":
+            self.chat_log.add(tf("combat_instant_win", name=self.combat_scene._enemy_name()),
+                              "system")
+        else:   # enemy crits can still beat the worst-case estimate
+            log.warning("Instant combat vs %s ended in %s", enemy.enemy_type, result)
+        self._end_combat(result, enemy)
+        return True
+
+    def _end_combat(self, result, enemy):
+        """Apply a finished fight's result (from the combat scene or an instant resolve)."""
+        if result == "win":
+            enemy.active = False
+            self.state = STATE_PLAYING
+            log.info("Combat won: defeated %s", enemy.enemy_type)
+        elif result == "flee":
+            enemy.combat_cooldown = 180
+            enemy.ai_state = "idle"
+            enemy.ai_timer = 120
+            self.state = STATE_PLAYING
+            log.info("Combat: player fled from %s", enemy.enemy_type)
+        elif result == "lose":
+            self.state = STATE_GAME_OVER
+            log.info("Combat lost: player defeated by %s", enemy.enemy_type)
 
     def handle_events(self):
-        for event in pygame.event.get():
+        for event in self.input.poll():
             if event.type == pygame.QUIT:
                 if self.state in _PLAYING_STATES:
                     # Prompt to save before quitting
@@ -235,9 +356,7 @@ class Game:
                         log.info("Loaded slot %d", slot_num)
                 else:
                     # Empty slot — start fresh
-                    self.load_level()
-                    self.save_slot = slot_num
-                    self.state = STATE_PLAYING
+                    self.new_game(slot_num)
                     log.info("New game in slot %d", slot_num)
             elif key == pygame.K_DELETE or key == pygame.K_BACKSPACE:
                 slot_num = sel + 1
@@ -351,24 +470,10 @@ class Game:
         if self.state == STATE_COMBAT:
             self.combat_scene.update()
             if self.combat_scene.combat_finished:
-                result = self.combat_scene.result
-                enemy  = self.combat_scene.enemy
                 self.combat_scene.active = False
-                if result == "win":
-                    enemy.active = False
-                    self.state = STATE_PLAYING
+                self._end_combat(self.combat_scene.result, self.combat_scene.enemy)
+                if self.state == STATE_PLAYING and self.music_mgr:
                     self.music_mgr.resume_zone()
-                    log.info("Combat won: defeated %s", enemy.enemy_type)
-                elif result == "flee":
-                    enemy.combat_cooldown = 180
-                    enemy.ai_state = "idle"
-                    enemy.ai_timer = 120
-                    self.state = STATE_PLAYING
-                    self.music_mgr.resume_zone()
-                    log.info("Combat: player fled from %s", enemy.enemy_type)
-                elif result == "lose":
-                    self.state = STATE_GAME_OVER
-                    log.info("Combat lost: player defeated by %s", enemy.enemy_type)
             return
 
         if self.state == STATE_PLAYING:
@@ -387,7 +492,20 @@ class Game:
                         self.entities.player.add_message(t("quest_failed_msg"))
 
             self.entities.update(self)
+            spawner = self.scene_mgr.active.get("spawner")
+            if spawner:
+                spawner.update(self.scene_mgr.active, self.entities.player,
+                               self.camera)
+            if "streamer" in self.scene_mgr.active:   # procedural zone still generating
+                from world.procgen import stream_scene
+                stream_scene(self.scene_mgr.active, self.entities.player)
+            self.iso_map.flush()   # tile writes -> nav field, LOS cache, minimap
             if self.entities.player:
+                if self.seamless:
+                    self.world.update(self)
+                else:
+                    self.scene_mgr.pinned.clear()
+                    self.scene_mgr.prefetch(self.entities.player.wx, self.entities.player.wy)
                 self.camera.update(
                     self.entities.player.wx,
                     self.entities.player.wy
@@ -441,17 +559,24 @@ class Game:
             fps_surf = fps_font.render(f"FPS: {int(self.clock.get_fps())}", False, (200, 200, 80))
             self.screen.blit(fps_surf, (self.screen.get_width() - fps_surf.get_width() - 6, 4))
 
-        pygame.display.flip()
+        if not self.headless:
+            pygame.display.flip()
 
     def _draw_world(self):
         """Draw game world to canvas, then scale to screen (pixel art)."""
         self.canvas.fill(COLOR_BG)
-        if self.iso_map:
-            self.iso_map.draw(self.canvas, self.camera)
-        self.entities.draw(self.canvas, self.camera)
+        if self.scene_mgr and self.seamless:   # neighbour zones drawn around the active one
+            self.world.draw(self.canvas, self)
+        else:
+            if self.iso_map:
+                self.iso_map.draw(self.canvas, self.camera)
+            self.entities.draw(self.canvas, self.camera)
         scaled = pygame.transform.scale(self.canvas, self.screen.get_size())
         self.screen.blit(scaled, (0, 0))
-        self.entities.draw_labels(self.screen, self.camera)
+        if self.scene_mgr and self.seamless:
+            self.world.draw_labels(self.screen, self)
+        else:
+            self.entities.draw_labels(self.screen, self.camera)
 
     def _update_zone_banner(self):
         """Count down the zone entry banner timer."""
@@ -460,8 +585,13 @@ class Game:
 
     def _return_to_menu(self):
         """Tear down the current game world and return to the main menu."""
+        if self.scene_mgr:
+            self.scene_mgr.close()
         self.scene_mgr = None
+        self.world = None
+        self.pathfinder = None
         self.iso_map = None
+        self.influence = None
         self.entities = EntityManager()
         self.dialogue_manager = None
         self.quest_manager = None
@@ -480,6 +610,8 @@ class Game:
         """Recreate pygame display with current settings; sync module constants."""
         sm = self.settings_mgr
         set_language(sm.language)
+        if self.headless:
+            return
         flags = pygame.FULLSCREEN if sm.fullscreen else 0
         w, h = sm.resolution
         self.screen = pygame.display.set_mode((w, h), flags)
@@ -492,7 +624,7 @@ class Game:
     def _handle_settings_key(self, key):
         """Handle keyboard input while settings screen is open."""
         sm = self.settings_mgr
-        num_opts = 7
+        num_opts = SETTINGS_ROWS
         sel = self.ui.menu_ui._settings_sel
 
         if key in (pygame.K_ESCAPE, pygame.K_RETURN, pygame.K_KP_ENTER):
@@ -517,13 +649,15 @@ class Game:
                 self.apply_display_settings()
             elif sel == 3:  # music on/off
                 sm.toggle_music()
-                self.music_mgr.set_enabled(sm.music_enabled)
+                if self.music_mgr:
+                    self.music_mgr.set_enabled(sm.music_enabled)
             elif sel == 4:  # music volume
                 if key == pygame.K_LEFT:
                     sm.prev_volume()
                 else:
                     sm.next_volume()
-                self.music_mgr.set_volume(sm.music_volume)
+                if self.music_mgr:
+                    self.music_mgr.set_volume(sm.music_volume)
             elif sel == 5:  # show FPS
                 sm.toggle_fps()
             elif sel == 6:  # difficulty
@@ -531,6 +665,15 @@ class Game:
                     sm.prev_difficulty()
                 else:
                     sm.next_difficulty()
+            elif sel == 7:  # combat speed
+                if key == pygame.K_LEFT:
+                    sm.prev_combat_speed()
+                else:
+                    sm.next_combat_speed()
+            elif sel == 8:  # auto battle
+                sm.toggle_auto_battle()
+            elif sel == 9:  # seamless world
+                sm.toggle_seamless_world()
 
     def _handle_mouse_click(self, pos, button):
         """Route left-click to the appropriate UI handler."""
@@ -592,7 +735,7 @@ class Game:
         elif self.state == STATE_PAUSED:
             menu._pause_sel = (menu._pause_sel + step) % 3
         elif self.state == STATE_SETTINGS:
-            menu._settings_sel = (menu._settings_sel + step) % 7
+            menu._settings_sel = (menu._settings_sel + step) % SETTINGS_ROWS
         elif self.state == STATE_PLAYING:
             if self.ui.inventory_ui.active:
                 inv = self.entities.player.inventory if self.entities.player else None
@@ -610,12 +753,28 @@ class Game:
                 if max_idx >= 0:
                     shop.selected = max(0, min(max_idx, shop.selected + step))
 
-    def run(self):
-        log.info("Main loop started")
+    def step(self):
+        """Advance the simulation one frame: input → update (no drawing)."""
+        self.handle_events()
+        self.update()
+        self.input.end_frame(self)
+        self.frame += 1
+
+    def run(self, max_frames=None):
+        """Main loop.  Headless runs skip drawing and the frame cap.
+
+        Stops when the game quits, after *max_frames* frames, or when the
+        input source runs out (end of a replay).
+        """
+        log.info("Main loop started (seed %d%s)", self.seed,
+                 ", headless" if self.headless else "")
         while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            self.step()
+            if self.input.finished or (max_frames is not None and self.frame >= max_frames):
+                self.running = False
+            if not self.headless:
+                self.draw()
+                self.clock.tick(FPS)
+        self.input.close()
         pygame.quit()
-        log.info("Main loop ended")
+        log.info("Main loop ended after %d frames", self.frame)
@@ -0,0 +1,423 @@
+# ============================================================
+#  Input sources, compact input recording and frame-exact replay
+#
+#  The game reads input only through an InputSource: poll() is
+#  called once per frame and returns that frame's events, and
+#  movement() returns the held-direction bitmask.  A recording
+#  stores, per frame, one mask byte (+ any discrete events),
+#  zlib-compressed, plus periodic state keyframes so a replay
+#  can seek without re-simulating from frame 0.
+#
+#  File layout (little-endian):
+#    header   "MERP" u16 version u64 seed u32 keyframe_interval
+#             u16 len + JSON {"settings": gameplay settings (difficulty,
+#             combat speed, ...), "zone": procedural start zone id or null}
+#    frames   u32 len + zlib(frame records)
+#    keyframes lzma(JSON [[frame, offset, digest hex, snapshot], ...])
+#
+#  Keyframes are plain data: snapshots are JSON with tuples and
+#  bytes tagged ({"$t": [...]}, {"$b": "<base64>"}), and anything
+#  else is rejected on load, so opening a shared replay never runs
+#  code from it.  lzma rather than zlib: its window spans several
+#  keyframes, so state that hasn't changed between them (most RNG
+#  streams) costs next to nothing.
+#
+#  Frame record: u8 mask (bit 7 set = events follow), then
+#  u8 count and per event: u8 kind + payload (see _EV_*).
+# ============================================================
+import base64
+import hashlib
+import json
+import lzma
+import struct
+import zlib
+import pygame
+from core.settings import REPLAY_KEYFRAME_INTERVAL
+from core.logger import get_logger
+
+log = get_logger("replay")
+
+REPLAY_MAGIC = b"MERP"
+REPLAY_VERSION = 6
+
+# Movement bitmask
+MOVE_UP    = 0x01
+MOVE_DOWN  = 0x02
+MOVE_LEFT  = 0x04
+MOVE_RIGHT = 0x08
+_HAS_EVENTS = 0x80
+
+# Recorded event kinds
+_EV_KEYDOWN = 1   # u32 key
+_EV_TEXT    = 2   # u8 len + utf-8
+_EV_CLICK   = 3   # i16 x, i16 y, u8 button
+_EV_WHEEL   = 4   # i8 dy
+_EV_QUIT    = 5
+
+_HEADER = struct.Struct("<4sHQI")
+
+
+def movement_mask(keys):
+    """Collapse a pygame key-state array into a MOVE_* bitmask."""
+    mask = 0
+    if keys[pygame.K_w] or keys[pygame.K_UP]:
+        mask |= MOVE_UP
+    if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        mask |= MOVE_DOWN
+    if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        mask |= MOVE_LEFT
+    if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        mask |= MOVE_RIGHT
+    return mask
+
+
+# ============================================================
+#  Input sources
+# ============================================================
+class InputSource:
+    """Base input source: no events, no movement."""
+
+    finished = False
+    deterministic = False   # True when the run must replay frame-exactly
+
+    def __init__(self):
+        self._mask = 0
+
+    def poll(self):
+        """Advance one frame; return this frame's events."""
+        return []
+
+    def movement(self):
+        return self._mask
+
+    def end_frame(self, game):
+        """Called after Game.update for the frame poll() started."""
+
+    def close(self):
+        pass
+
+
+class KeyboardInput(InputSource):
+    """Live input from the pygame event queue and keyboard state."""
+
+    def poll(self):
+        events = pygame.event.get()
+        self._mask = movement_mask(pygame.key.get_pressed())
+        return events
+
+
+class ScriptedInput(InputSource):
+    """Input produced by a policy: policy(frame) -> mask or (mask, events).
+
+    Used by headless runs (bots, soak tests); frames=None runs forever.
+    """
+
+    def __init__(self, policy, frames=None):
+        super().__init__()
+        self.policy = policy
+        self.frames = frames
+        self.frame = 0
+
+    @property
+    def finished(self):
+        return self.frames is not None and self.frame >= self.frames
+
+    def poll(self):
+        out = self.policy(self.frame)
+        self.frame += 1
+        if isinstance(out, tuple):
+            self._mask, events = out
+            return list(events)
+        self._mask = out
+        return []
+
+
+def random_walk_policy(seed=0, hold=30):
+    """Policy that picks a random direction (or standing still) every *hold* frames."""
+    import random
+    rnd = random.Random(seed)
+    choices = (0, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT,
+               MOVE_UP | MOVE_LEFT, MOVE_UP | MOVE_RIGHT,
+               MOVE_DOWN | MOVE_LEFT, MOVE_DOWN | MOVE_RIGHT)
+    state = {"mask": 0}
+
+    def policy(frame):
+        if frame % hold == 0:
+            state["mask"] = rnd.choice(choices)
+        return state["mask"]
+    return policy
+
+
+# ============================================================
+#  Encoding helpers
+# ============================================================
+def _encode_events(events, out):
+    recs = []
+    for ev in events:
+        if ev.type == pygame.KEYDOWN:
+            recs.append(struct.pack("<BI", _EV_KEYDOWN, ev.key & 0xFFFFFFFF))
+        elif ev.type == pygame.TEXTINPUT:
+            raw = ev.text.encode("utf-8")[:255]
+            recs.append(struct.pack("<BB", _EV_TEXT, len(raw)) + raw)
+        elif ev.type == pygame.MOUSEBUTTONDOWN:
+            x, y = ev.pos
+            recs.append(struct.pack("<BhhB", _EV_CLICK, x, y, ev.button))
+        elif ev.type == pygame.MOUSEWHEEL:
+            recs.append(struct.pack("<Bb", _EV_WHEEL, max(-128, min(127, ev.y))))
+        elif ev.type == pygame.QUIT:
+            recs.append(struct.pack("<B", _EV_QUIT))
+    recs = recs[:255]
+    if recs:
+        out.append(len(recs))
+        for r in recs:
+            out.extend(r)
+    return bool(recs)
+
+
+def _decode_events(buf, pos):
+    count = buf[pos]
+    pos += 1
+    events = []
+    for _ in range(count):
+        kind = buf[pos]
+        pos += 1
+        if kind == _EV_KEYDOWN:
+            (key,) = struct.unpack_from("<I", buf, pos)
+            pos += 4
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0,
+                                             unicode="", scancode=0))
+        elif kind == _EV_TEXT:
+            n = buf[pos]
+            text = bytes(buf[pos + 1:pos + 1 + n]).decode("utf-8", "replace")
+            pos += 1 + n
+            events.append(pygame.event.Event(pygame.TEXTINPUT, text=text))
+        elif kind == _EV_CLICK:
+            x, y, button = struct.unpack_from("<hhB", buf, pos)
+            pos += 5
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN,
+                                             pos=(x, y), button=button))
+        elif kind == _EV_WHEEL:
+            (dy,) = struct.unpack_from("<b", buf, pos)
+            pos += 1
+            events.append(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=dy))
+        elif kind == _EV_QUIT:
+            events.append(pygame.event.Event(pygame.QUIT))
+        else:
+            raise ValueError(f"corrupt replay: unknown event kind {kind}")
+    return events, pos
+
+
+def _to_json(obj):
+    """Snapshot data -> JSON-compatible data (tuples and bytes tagged)."""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, list):
+        return [_to_json(v) for v in obj]
+    if isinstance(obj, tuple):
+        return {"$t": [_to_json(v) for v in obj]}
+    if isinstance(obj, (bytes, bytearray)):
+        return {"$b": base64.b64encode(obj).decode("ascii")}
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            if not isinstance(k, str) or k.startswith("$"):
+                raise ValueError(f"snapshot key {k!r} cannot be stored")
+            out[k] = _to_json(v)
+        return out
+    raise ValueError(f"snapshot value of type {type(obj).__name__} cannot be stored")
+
+
+def _from_json(obj):
+    """Inverse of _to_json; rejects anything it doesn't produce."""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, list):
+        return [_from_json(v) for v in obj]
+    if not isinstance(obj, dict):
+        raise ValueError("corrupt replay: unexpected keyframe data")
+    if any(k.startswith("$") for k in obj):
+        if len(obj) == 1 and isinstance(obj.get("$t"), list):
+            return tuple(_from_json(v) for v in obj["$t"])
+        if len(obj) == 1 and isinstance(obj.get("$b"), str):
+            return base64.b64decode(obj["$b"], validate=True)
+        raise ValueError("corrupt replay: unknown keyframe tag")
+    return {k: _from_json(v) for k, v in obj.items()}
+
+
+def _encode_keyframes(keyframes):
+    data = [[frame, offset, digest.hex(), _to_json(snap)]
+            for frame, offset, digest, snap in keyframes]
+    return lzma.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode_keyframes(blob):
+    try:
+        data = json.loads(lzma.decompress(blob).decode("utf-8"))
+    except (lzma.LZMAError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"corrupt replay: unreadable keyframes ({exc})") from None
+    if not isinstance(data, list):
+        raise ValueError("corrupt replay: unexpected keyframe data")
+    keyframes = []
+    for kf in data:
+        if not (isinstance(kf, list) and len(kf) == 4
+                and all(type(v) is int and v >= 0 for v in kf[:2])
+                and isinstance(kf[2], str) and isinstance(kf[3], dict)):
+            raise ValueError("corrupt replay: malformed keyframe")
+        try:
+            digest = bytes.fromhex(kf[2])
+        except ValueError:
+            raise ValueError("corrupt replay: malformed keyframe digest") from None
+        keyframes.append((kf[0], kf[1], digest, _from_json(kf[3])))
+    return keyframes
+
+
+def state_digest(snapshot):
+    """Short hash of a snapshot, used to detect replay desyncs.
+
+    Hashes a canonical JSON form, which doesn't depend on object
+    identity (string interning, shared references).
+    """
+    canon = json.dumps(snapshot, sort_keys=True, default=repr, separators=(",", ":"))
+    return hashlib.blake2b(canon.encode("utf-8"), digest_size=16).digest()
+
+
+# ============================================================
+#  Recorder
+# ============================================================
+class InputRecorder(InputSource):
+    """Wraps another source and records everything it produces."""
+
+    deterministic = True
+
+    def __init__(self, source, path, seed, settings=None,
+                 keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        super().__init__()
+        self.source = source
+        self.path = path
+        self.seed = seed
+        self.settings = dict(settings or {})   # SettingsManager.gameplay_settings()
+        self.zone = None              # procedural start zone id, set by the caller
+        self.keyframe_interval = keyframe_interval
+        self.frame = 0
+        self._buf = bytearray()
+        self._keyframes = []          # (frame, offset, digest, snapshot)
+        self._next_keyframe = keyframe_interval
+
+    @property
+    def finished(self):
+        return self.source.finished
+
+    def poll(self):
+        events = self.source.poll()
+        self._mask = self.source.movement()
+        at = len(self._buf)
+        self._buf.append(self._mask)
+        if _encode_events(events, self._buf):
+            self._buf[at] |= _HAS_EVENTS
+        self.frame += 1
+        return events
+
+    def end_frame(self, game):
+        self.source.end_frame(game)
+        if self.frame < self._next_keyframe:
+            return
+        from core.snapshot import can_snapshot, snapshot_game
+        if can_snapshot(game):
+            snap = snapshot_game(game, self.frame)
+            self._keyframes.append((self.frame, len(self._buf), state_digest(snap), snap))
+            self._next_keyframe = self.frame + self.keyframe_interval
+
+    def close(self):
+        self.source.close()
+        frames = zlib.compress(bytes(self._buf), 9)
+        meta = json.dumps({"settings": self.settings, "zone": self.zone},
+                          sort_keys=True).encode("utf-8")
+        with open(self.path, "wb") as f:
+            f.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION,
+                                 self.seed & 0xFFFFFFFFFFFFFFFF, self.keyframe_interval))
+            f.write(struct.pack("<H", len(meta)) + meta)
+            f.write(struct.pack("<I", len(frames)) + frames)
+            f.write(_encode_keyframes(self._keyframes))
+        log.info("Replay saved: %s (%d frames, %d keyframes, %d bytes of input)",
+                 self.path, self.frame, len(self._keyframes), len(frames))
+
+
+# ============================================================
+#  Player
+# ============================================================
+class ReplayInput(InputSource):
+    """Feeds a recording back into the game, frame by frame.
+
+    With verify=True every recorded keyframe is compared against the live
+    state when the replay reaches it; mismatching frames land in .desyncs.
+    """
+
+    deterministic = True
+
+    def __init__(self, path, verify=True):
+        super().__init__()
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed, self.keyframe_interval = _HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path}: not a version {REPLAY_VERSION} replay")
+        pos = _HEADER.size
+        (n,) = struct.unpack_from("<H", data, pos)
+        meta = json.loads(data[pos + 2:pos + 2 + n].decode("utf-8"))
+        self.settings = meta["settings"]
+        self.zone = meta["zone"]
+        pos += 2 + n
+        (flen,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        self._buf = zlib.decompress(data[pos:pos + flen])
+        self.keyframes = _decode_keyframes(data[pos + flen:])
+        self._by_frame = {kf[0]: kf for kf in self.keyframes}
+        self.verify = verify
+        self.desyncs = []
+        self.frame = 0
+        self._pos = 0
+
+    @property
+    def finished(self):
+        return self._pos >= len(self._buf)
+
+    def poll(self):
+        if self.finished:
+            self._mask = 0
+            return []
+        head = self._buf[self._pos]
+        self._pos += 1
+        self._mask = head & ~_HAS_EVENTS
+        events = []
+        if head & _HAS_EVENTS:
+            events, self._pos = _decode_events(self._buf, self._pos)
+        self.frame += 1
+        return events
+
+    def end_frame(self, game):
+        if not self.verify:
+            return
+        kf = self._by_frame.get(self.frame)
+        if kf is None:
+            return
+        from core.snapshot import snapshot_game
+        if state_digest(snapshot_game(game, self.frame)) != kf[2]:
+            self.desyncs.append(self.frame)
+            log.warning("Replay desync at frame %d", self.frame)
+
+    def seek(self, game, frame):
+        """Jump to *frame*: restore the nearest earlier keyframe, then simulate."""
+        kf = None
+        for cand in self.keyframes:
+            if cand[0] <= frame:
+                kf = cand
+        if kf is None:
+            raise ValueError(f"no keyframe at or before frame {frame}")
+        from core.snapshot import restore_game
+        if not game.scene_mgr:
+            game.load_level()
+        restore_game(game, kf[3])
+        self.frame, self._pos = kf[0], kf[1]
+        game.frame = kf[0]
+        while self.frame < frame and not self.finished:
+            game.step()
@@ -0,0 +1,76 @@
+# ============================================================
+#  Deterministic RNG streams
+#
+#  Every system draws from its own named random.Random stream
+#  instead of the global `random` module, so one system using
+#  more or fewer numbers (e.g. particles only drawn when a
+#  window exists) never shifts another system's sequence.
+#  All streams derive from one master seed; reseeding mutates
+#  the existing objects so module-level references stay valid.
+# ============================================================
+import hashlib
+import random
+
+# Known streams (others are created on first use)
+STREAM_NAMES = ("ai", "npc", "combat", "loot", "level", "fx")
+
+_streams = {}        # name -> random.Random
+_master_seed = None
+
+
+def _derive(seed, name):
+    """Stable per-stream seed from the master seed and the stream name."""
+    digest = hashlib.blake2b(f"{seed}:{name}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def stream(name):
+    """Return the named stream (created and seeded on first use)."""
+    rng = _streams.get(name)
+    if rng is None:
+        rng = _streams[name] = random.Random()
+        if _master_seed is not None:
+            rng.seed(_derive(_master_seed, name))
+    return rng
+
+
+def seed_all(seed=None):
+    """Reseed every stream from *seed* (None = fresh OS entropy); returns the seed."""
+    global _master_seed
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    _master_seed = seed
+    for name in STREAM_NAMES:
+        stream(name)
+    for name, rng in _streams.items():
+        rng.seed(_derive(seed, name))
+    return seed
+
+
+def master_seed():
+    return _master_seed
+
+
+def derived(name):
+    """A new, unregistered Random seeded from the master seed and *name*.
+
+    Unlike stream(), every call starts the same sequence again, so
+    content built from it (e.g. a zone rebuilt on demand) does not
+    depend on when or how often it is built.
+    """
+    if _master_seed is None:
+        return random.Random()
+    return random.Random(_derive(_master_seed, name))
+
+
+def get_state():
+    """Snapshot of every stream's internal state (for keyframes)."""
+    return {name: rng.getstate() for name, rng in _streams.items()}
+
+
+def set_state(state):
+    for name, st in state.items():
+        stream(name).setstate(st)
+
+
+seed_all()
@@ -10,7 +10,7 @@ log = get_logger("save")
 
 _BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SAVE_DIR   = os.path.join(_BASE, "saves")
-SAVE_VERSION = 3
+SAVE_VERSION = 4
 SLOT_COUNT = 10
 
 def slot_file(slot: int) -> str:
@@ -25,8 +25,7 @@ def _zone_display_name(game) -> str:
     active_id = game.scene_mgr.active_id
     try:
         from systems.i18n import t
-        from world.demo_level import ZONES
-        for z in ZONES:
+        for z in getattr(game, "zones", None) or ():
             if z["id"] == active_id:
                 return t(z["name_key"])
     except Exception:
@@ -51,6 +50,26 @@ def list_slots() -> list:
     return result
 
 
+def _dead_slots(game) -> dict:
+    """Dead spawn slots of every visited zone (built or evicted)."""
+    out = {}
+    sm = game.scene_mgr
+    if not sm:
+        return out
+    from core.snapshot import dead_slots
+    for zone_id, scene in sm.scenes.items():
+        spawner = scene.get("spawner")
+        if spawner:
+            dead = spawner.dead_slots(scene["enemies"])
+            if dead:
+                out[zone_id] = dead
+    for zone_id, compact in sm.evicted.items():
+        dead = dead_slots(compact)
+        if dead:
+            out[zone_id] = dead
+    return out
+
+
 def save(game, slot: int) -> bool:
     """Serialize current game state to saves/save_NN.json. Returns True on success."""
     player = game.entities.player
@@ -95,7 +114,8 @@ def save(game, slot: int) -> bool:
         },
         "current_scene": game.scene_mgr.active_id if game.scene_mgr else "hobbiton",
         "quests":       {},
-        "enemies_dead": [],
+        # zone_id -> [[spawn slot, frames until respawn or None], ...]
+        "dead_slots":   _dead_slots(game),
     }
 
     # Quest state
@@ -109,11 +129,6 @@ def save(game, slot: int) -> bool:
                 entry["discovered"] = list(q["discovered"])
             data["quests"][qid] = entry
 
-    # Dead enemies
-    for i, e in enumerate(game.entities.enemies):
-        if not e.active:
-            data["enemies_dead"].append(i)
-
     os.makedirs(SAVE_DIR, exist_ok=True)
     path = slot_file(slot)
     try:
@@ -140,7 +155,7 @@ def load(game, slot: int) -> bool:
         log.error("Load failed (slot %d, read error): %s", slot, exc)
         return False
 
-    if data.get("version") not in (SAVE_VERSION, 2):  # accept v2 (will be migrated)
+    if data.get("version") not in (SAVE_VERSION, 3, 2):  # accept v2/v3 (will be migrated)
         log.warning("Save version mismatch in slot %d (%s), ignoring", slot, data.get("version"))
         return False
 
@@ -149,7 +164,15 @@ def load(game, slot: int) -> bool:
 
     # Restore scene before applying positions / dead enemies
     saved_scene = data.get("current_scene", "hobbiton")
-    if saved_scene != "hobbiton" and game.scene_mgr:
+    if not game.scene_mgr.has_zone(saved_scene):
+        from world.procgen import parse_zone_id
+        proc = parse_zone_id(saved_scene)
+        if proc:
+            biome, seed, size = proc
+            game.load_procedural_zone(biome, seed, size)   # same seed -> same zone
+        else:
+            log.warning("Saved scene %s no longer exists", saved_scene)
+    elif saved_scene != "hobbiton" and game.scene_mgr:
         game._activate_scene(saved_scene, start_fade=False)
 
     player = game.entities.player
@@ -172,6 +195,8 @@ def load(game, slot: int) -> bool:
     stats.level       = sd["level"]
     stats.xp          = sd["xp"]
     stats.free_points = sd["free_points"]
+    stats.version    += 1
+    player.effects.clear()              # timed effects are not saved
 
     id_ = pd["inventory"]
     inv.gold     = id_["gold"]
@@ -195,11 +220,18 @@ def load(game, slot: int) -> bool:
             if "discovered" in qd:
                 q["discovered"] = qd["discovered"]
 
-    # Apply dead enemies to the restored scene
-    dead_set = set(data.get("enemies_dead", []))
-    for i, e in enumerate(game.entities.enemies):
-        if i in dead_set:
-            e.active = False
+    # Dead enemies, per spawn slot.  v2/v3 saves stored positions in the
+    # enemy list, which reaping and respawns shift, so they are dropped.
+    sm = game.scene_mgr
+    for zone_id, dead in data.get("dead_slots", {}).items():
+        if not sm.has_zone(zone_id):
+            continue
+        scene = sm.get(zone_id)
+        spawner = scene.get("spawner")
+        if spawner:
+            spawner.apply_dead_slots(scene["enemies"], dead)
+    sm.get(sm.active_id)   # most recently visited again
+    sm.trim()
 
     game.camera.snap(player.wx, player.wy)
     log.info("Game loaded ← slot %d (%s)", slot, path)
@@ -7,6 +7,12 @@ import os
 ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
 SPRITE_CONFIG = os.path.join(ASSETS_DIR, "config.json")
 
+# --- Data files ---
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+ITEMS_FILE = os.path.join(DATA_DIR, "items.json")
+LEVEL_FILE = os.path.join(DATA_DIR, "levels", "demo.json")   # compiled by world.level_compiler
+CACHE_DIR = os.path.join(os.path.dirname(DATA_DIR), "cache")   # compiled levels (regenerated)
+
 # --- Window ---
 WINDOW_TITLE = "Middle-earth: Shadows of Arda"
 SCREEN_WIDTH = 960
@@ -25,13 +31,69 @@ HALF_W = TILE_W // 2   # 16
 HALF_H = TILE_H // 2   # 8
 
 # --- Map ---
-MAP_COLS = 30    # each scene (zone) is 30×30 tiles
+MAP_COLS = 30    # default scene (zone) size; IsoMap takes any cols × rows
 MAP_ROWS = 30
+CHUNK_SIZE = 32        # tiles per side of a chunk in chunked world files
+CHUNK_CACHE_MAX = 64   # per-chunk walkability bitmaps kept by a ChunkedIsoMap
+TILE_DIRTY_CHUNK = 8   # tiles per side of an IsoMap dirty-tracking chunk
+TILE_JOURNAL_MAX = 256 # tile-change journal entries kept per map (IsoMap.changes_since)
+PROCGEN_ZONE_SIZE = 96        # default procedural zone size (tiles per side)
+PROCGEN_CHUNKS_PER_FRAME = 2  # streamed chunks pasted into the map per frame
+SCENE_PREFETCH_EDGE = 6       # tiles from a zone edge at which the neighbour is warmed
+SCENE_PREFETCH_BUDGET_MS = 4  # per-frame budget for warm-up work done on the game thread
+SCENE_RESIDENT_MAX = 6        # built scenes kept in memory; older ones are evicted
+SEAMLESS_CHUNK = 5            # seamless world: tiles per side of a streaming chunk
+SEAMLESS_LOAD_RADIUS = 3      # chunks around the player whose zones are built and drawn
+SEAMLESS_SIM_RADIUS = 2       # chunks around the player where neighbour-zone entities run
 
 # --- Player ---
 PLAYER_SPEED = 1.8       # world units per frame
 PLAYER_COLOR = (80, 180, 255)
 PLAYER_SIZE = (12, 12)   # collision radius approximation
+PLAYER_RADIUS = 0.3      # collision radius in world units (tiles)
+PLAYER_BASE_STATS = {"hp": 80, "mp": 40, "str_": 4, "dex": 3, "int_": 3, "def_": 3}
+
+# --- Entity collision ---
+NPC_RADIUS = 0.3
+ENEMY_RADIUS = 0.3       # default when an enemy template has no "radius"
+
+# --- Crowd steering (separation / local avoidance) ---
+CROWD_CELL_SIZE = 1.0           # neighbour grid cell size (tiles)
+CROWD_MAX_NEIGHBORS = 6         # neighbours considered per agent per frame
+CROWD_PERSONAL_SPACE = 0.15     # extra gap kept between two agents' radii
+CROWD_SEPARATION_WEIGHT = 1.5   # blend of separation into chase/follow heading
+CROWD_PUSH_SPEED = 0.02         # max overlap-resolution push per frame
+
+# --- Influence maps (world/influence.py) + the enemy tactics reading them ---
+INFLUENCE_CELL = 3              # tiles per side of an influence map cell
+INFLUENCE_MOMENTUM = 0.4        # share of the way a cell moves to its new value per update
+INFLUENCE_THREAT_DECAY = 0.8    # player threat kept per cell it spreads
+INFLUENCE_DENSITY_DECAY = 0.5   # enemy density kept per cell it spreads
+INFLUENCE_DANGER_DECAY = 0.7    # spawn-territory danger kept per cell it spreads
+INFLUENCE_DENSITY_FULL = 4      # enemies in one cell for full density
+INFLUENCE_EPSILON = 0.02        # values below this snap to 0 and stop being updated
+ENEMY_RETREAT_HP = 0.35         # wounded below this share of max HP ...
+ENEMY_RETREAT_THREAT = 0.3      # ... and this much threat at its cell: fall back
+ENEMY_FLANK_DENSITY = 0.2       # packmate density ahead at which a chaser swings wide
+ENEMY_FLANK_WEIGHT = 0.7        # sideways share of a flanking chaser's heading
+ENEMY_GROUP_WEIGHT = 4.0        # pull of a new wander heading towards packmates (grouping)
+
+# --- Replay ---
+REPLAY_KEYFRAME_INTERVAL = 600  # frames between state keyframes (10 s @ 60 FPS)
+
+# --- Bot / training environments (sim/) ---
+SIM_FRAME_SKIP = 4          # game frames per env.step()
+SIM_MAX_STEPS = 5000        # env steps before an episode is truncated
+SIM_OBS_GRID = 16           # downsampled walkability grid is GRID x GRID
+SIM_OBS_ENEMIES = 8         # nearest enemies in the observation
+SIM_OBS_NPCS = 4            # nearest NPCs in the observation
+SIM_OBS_QUESTS = 16         # quest slots (status + progress each)
+
+# --- Spawn director (respawns / population budget) ---
+SPAWN_RESPAWN_DELAY = 45 * 60   # frames a slot stays empty after its enemy dies
+SPAWN_MIN_INTERVAL = 60         # min frames between two spawns in one scene
+SPAWN_SCREEN_MARGIN = 32        # px outside the view a spawn must stay
+SPAWN_MIN_PLAYER_DIST = 6.0     # tiles; never respawn closer than this
 
 # --- Combat modes ---
 COMBAT_MELEE = 0
@@ -57,6 +119,11 @@ MAGIC_BASE_DMG = 10
 MAGIC_COST = 8
 MAGIC_SPEED = 2.5
 
+# Instant resolve ("instant" combat speed): encounters the player is sure
+# to win within this many turns, losing less than this fraction of HP
+COMBAT_INSTANT_MAX_TURNS = 2
+COMBAT_INSTANT_MAX_HP_LOSS = 0.2
+
 # --- Colors ---
 COLOR_BG = (18, 16, 20)
 COLOR_WHITE = (255, 255, 255)
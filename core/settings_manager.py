@@ -14,6 +14,18 @@ RESOLUTIONS = [
 # 0% to 100% in 10% steps
 VOLUME_STEPS = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
 DIFFICULTY_LEVELS = ["easy", "normal", "hard"]
+# normal: animated turns; turbo: turns resolve immediately;
+# instant: turbo + trivial encounters never open the combat scene
+COMBAT_SPEEDS = ["normal", "turbo", "instant"]
+GAMEPLAY_SETTINGS = ("difficulty", "combat_speed", "combat_turbo", "auto_battle",
+                     "seamless_world")
+GAMEPLAY_DEFAULTS = {
+    "difficulty": "normal",
+    "combat_speed": "normal",
+    "combat_turbo": False,     # in-fight T toggle; follows combat_speed when that changes
+    "auto_battle": False,
+    "seamless_world": False,   # stitch the zone grid into one open world
+}
 
 _CONFIG_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json"
@@ -28,7 +40,7 @@ class SettingsManager:
         self.music_enabled = True
         self.music_volume_idx = 5   # index into VOLUME_STEPS → 0.5 (50%)
         self.show_fps = False
-        self.difficulty = "normal"
+        self.apply_gameplay_settings(GAMEPLAY_DEFAULTS)
         self.load()
 
     @property
@@ -61,6 +73,12 @@ class SettingsManager:
             diff = data.get("difficulty", "normal")
             if diff in DIFFICULTY_LEVELS:
                 self.difficulty = diff
+            speed = data.get("combat_speed", "normal")
+            if speed in COMBAT_SPEEDS:
+                self.combat_speed = speed
+            self.combat_turbo = bool(data.get("combat_turbo", self.combat_speed != "normal"))
+            self.auto_battle = bool(data.get("auto_battle", False))
+            self.seamless_world = bool(data.get("seamless_world", False))
         except Exception:
             pass
 
@@ -73,6 +91,10 @@ class SettingsManager:
             "music_volume_idx": self.music_volume_idx,
             "show_fps": self.show_fps,
             "difficulty": self.difficulty,
+            "combat_speed": self.combat_speed,
+            "combat_turbo": self.combat_turbo,
+            "auto_battle": self.auto_battle,
+            "seamless_world": self.seamless_world,
         }
         try:
             with open(_CONFIG_PATH, "w", encoding="utf-8") as f:
@@ -111,3 +133,28 @@ class SettingsManager:
     def prev_difficulty(self):
         idx = DIFFICULTY_LEVELS.index(self.difficulty)
         self.difficulty = DIFFICULTY_LEVELS[(idx - 1) % len(DIFFICULTY_LEVELS)]
+
+    def next_combat_speed(self):
+        idx = COMBAT_SPEEDS.index(self.combat_speed)
+        self.combat_speed = COMBAT_SPEEDS[(idx + 1) % len(COMBAT_SPEEDS)]
+        self.combat_turbo = self.combat_speed != "normal"
+
+    def prev_combat_speed(self):
+        idx = COMBAT_SPEEDS.index(self.combat_speed)
+        self.combat_speed = COMBAT_SPEEDS[(idx - 1) % len(COMBAT_SPEEDS)]
+        self.combat_turbo = self.combat_speed != "normal"
+
+    def toggle_auto_battle(self):
+        self.auto_battle = not self.auto_battle
+
+    def toggle_seamless_world(self):
+        self.seamless_world = not self.seamless_world
+
+    def gameplay_settings(self):
+        """Settings that change simulation results (recorded in replays)."""
+        return {k: getattr(self, k) for k in GAMEPLAY_SETTINGS}
+
+    def apply_gameplay_settings(self, values):
+        for k in GAMEPLAY_SETTINGS:
+            if k in values:
+                setattr(self, k, values[k])
@@ -0,0 +1,236 @@
+# ============================================================
+#  Simulation snapshots: capture / restore the deterministic
+#  game state (RNG streams, player, quests, every scene's
+#  tiles, enemies, NPCs and spawner) as plain Python data.
+#
+#  Used by replay keyframes and by SceneManager, which keeps
+#  evicted scenes as compact snapshots.  Render-only state (sprites,
+#  fonts, music, UI widgets) is never captured; snapshots are
+#  only taken while no dialogue, overlay or combat is open.
+# ============================================================
+import copy
+from core import rng
+from core.settings import STATE_PLAYING
+from entities.enemy import Enemy
+from world.influence import InfluenceMaps
+from world.spawn_director import dead_slot_list
+
+_SKIP_SLOTS = {"sprites", "archetype", "stats", "_canvas_top_y"}
+_PLAYER_ATTRS = ("facing_angle", "facing_dx", "facing_dy", "moving", "messages")
+
+
+def _slot_names(obj):
+    names = []
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if name not in _SKIP_SLOTS:
+                names.append(name)
+    return names
+
+
+def _slots_state(obj):
+    state = {}
+    for name in _slot_names(obj):
+        try:
+            state[name] = copy.deepcopy(getattr(obj, name))
+        except AttributeError:   # slot never assigned
+            pass
+    return state
+
+
+def _apply_slots(obj, state):
+    names = set(_slot_names(obj))
+    for name, value in state.items():
+        if name not in names:
+            raise ValueError(f"snapshot: unknown field {type(obj).__name__}.{name}")
+        setattr(obj, name, copy.deepcopy(value))
+
+
+def can_snapshot(game):
+    """Snapshots are only consistent at calm points of the main loop."""
+    if game.state != STATE_PLAYING or not game.scene_mgr:
+        return False
+    if game.dialogue_manager and game.dialogue_manager.is_active:
+        return False
+    if game.entities.projectiles:
+        return False
+    if any(sc.get("projectiles") for sc in game.scene_mgr.scenes.values()):
+        return False    # seamless neighbours' in-flight projectiles aren't captured
+    if any("streamer" in sc for sc in game.scene_mgr.scenes.values()):
+        return False    # a procedural zone is still streaming in
+    return not game.ui.has_overlay
+
+
+# ------------------------------------------------------------------
+#  Scenes
+# ------------------------------------------------------------------
+def snapshot_scene(scene, base=None):
+    """Capture one scene's mutable state.
+
+    With *base* (the scene's freshly built tiles) only the changed tiles
+    are stored, as (index, tile) pairs: the compact form kept for
+    evicted scenes, which are restored onto a rebuilt scene.
+    """
+    m = scene["iso_map"]
+    enemies = scene["enemies"]
+    if base is None:
+        tiles = {"tiles": bytes(m.tiles)}
+    else:
+        tiles = {"tile_diff": [(i, t) for i, (t, b) in enumerate(zip(m.tiles, base))
+                               if t != b]}
+    snap = {
+        **tiles,
+        "enemies": [(e.enemy_type, _slots_state(e), _slots_state(e.stats))
+                    for e in enemies],
+        "npcs": [_slots_state(n) for n in scene["npcs"]],
+    }
+    if "influence" in scene and base is None:   # evicted scenes start afresh
+        snap["influence"] = scene["influence"].state()
+    spawner = scene.get("spawner")
+    if spawner:
+        slot_idx = {id(s): i for i, s in enumerate(spawner.slots)}
+        snap["spawner"] = {
+            "slots": len(spawner.slots),
+            "tick": spawner.tick,
+            "next_spawn_tick": spawner._next_spawn_tick,
+            "seq": spawner._seq,
+            "pending": [(due, seq, slot_idx[id(slot)])
+                        for due, seq, slot in spawner._pending],
+            "slot_of": [slot_idx[id(spawner._slot_of[id(e)])]
+                        if id(e) in spawner._slot_of else None
+                        for e in enemies],
+        }
+    return snap
+
+
+def dead_slots(snap):
+    """SpawnDirector.dead_slots() of the scene a snapshot_scene() result was taken from."""
+    sp = snap.get("spawner")
+    if not sp:
+        return []
+    live = [i for (_, state, _), i in zip(snap["enemies"], sp["slot_of"])
+            if i is not None and state.get("active")]
+    return dead_slot_list(sp["slots"], live, sp["tick"],
+                          [(due, i) for due, _, i in sp["pending"]])
+
+
+def restore_scene(scene, snap):
+    """Apply a snapshot from snapshot_scene() onto the same scene."""
+    m = scene["iso_map"]
+    if "tiles" in snap:
+        m.set_tiles(snap["tiles"])   # no-op when unchanged
+    else:
+        tiles = bytearray(m.tiles)
+        for i, t in snap["tile_diff"]:
+            tiles[i] = t
+        m.set_tiles(tiles)
+
+    # Reuse existing Enemy objects of the right type, create the rest
+    spares = {}
+    for e in scene["enemies"]:
+        spares.setdefault(e.enemy_type, []).append(e)
+    enemies = []
+    for enemy_type, state, stats_state in snap["enemies"]:
+        pool = spares.get(enemy_type)
+        e = pool.pop() if pool else Enemy(0.0, 0.0, enemy_type)
+        _apply_slots(e, state)
+        _apply_slots(e.stats, stats_state)
+        enemies.append(e)
+    scene["enemies"][:] = enemies        # keep list identity (EntityManager shares it)
+
+    for npc, state in zip(scene["npcs"], snap["npcs"]):
+        _apply_slots(npc, state)
+
+    if "influence" in snap:
+        InfluenceMaps.for_scene(scene).restore(snap["influence"])
+    elif "influence" in scene:
+        scene["influence"].reset()   # created after the snapshot
+
+    spawner = scene.get("spawner")
+    sp = snap.get("spawner")
+    if spawner and sp:
+        slots = spawner.slots
+        spawner.tick = sp["tick"]
+        spawner._next_spawn_tick = sp["next_spawn_tick"]
+        spawner._seq = sp["seq"]
+        spawner._pending = [(due, seq, slots[i]) for due, seq, i in sp["pending"]]
+        spawner._slot_of = {id(e): slots[i] for e, i in zip(enemies, sp["slot_of"])
+                            if i is not None}
+        spawner.pool._free.clear()     # pooled objects may now be live again
+
+
+# ------------------------------------------------------------------
+#  Whole game
+# ------------------------------------------------------------------
+def snapshot_game(game, frame=0):
+    """Capture the full simulation state (call only when can_snapshot())."""
+    p = game.entities.player
+    inv = p.inventory
+    return {
+        "frame": frame,
+        "rng": rng.get_state(),
+        "active_scene": game.scene_mgr.active_id,
+        "fade_alpha": game.scene_mgr.fade_alpha,
+        "camera": (game.camera.offset_x, game.camera.offset_y),
+        "zone": (game._current_zone_id, game._zone_banner_timer),
+        "player": {
+            "slots": _slots_state(p),
+            "attrs": {k: copy.deepcopy(getattr(p, k)) for k in _PLAYER_ATTRS},
+            "stats": _slots_state(p.stats),
+            "items": copy.deepcopy(inv.items),
+            "equipped": dict(inv.equipped),
+            "gold": inv.gold,
+            "effects": copy.deepcopy(vars(p.effects)),
+        },
+        "quests": {qid: {k: copy.deepcopy(v) for k, v in q.items()
+                         if k in ("status", "progress", "discovered", "_timer")}
+                   for qid, q in game.quest_manager.quests.items()},
+        # unbuilt zones are still pristine, so only built scenes are captured
+        "scenes": {zid: snapshot_scene(sc) for zid, sc in game.scene_mgr.scenes.items()},
+        # evicted scenes are already compact snapshots; the visit order
+        # decides what is evicted next
+        "evicted": dict(game.scene_mgr.evicted),
+        "scene_lru": list(game.scene_mgr.lru),
+        # prefetched zones are skipped by warm(), so they don't count as visits
+        "prefetched": sorted(game.scene_mgr._prefetched),
+    }
+
+
+def restore_game(game, snap):
+    """Restore a snapshot_game() result onto a game built from the same level."""
+    scene_mgr = game.scene_mgr
+    for zid in list(scene_mgr.scenes):
+        if zid not in snap["scenes"]:
+            scene_mgr.unload(zid)          # built after the snapshot: back to pristine
+    scene_mgr.evicted = dict(snap["evicted"])
+    for zid, sc_snap in snap["scenes"].items():
+        restore_scene(scene_mgr.get(zid), sc_snap)
+    if game.scene_mgr.active_id != snap["active_scene"]:
+        game._activate_scene(snap["active_scene"], start_fade=False)
+    scene_mgr.lru = list(snap["scene_lru"])   # after get()/activation touched it
+    scene_mgr._prefetched = set(snap["prefetched"])
+    game.scene_mgr.fade_alpha = snap["fade_alpha"]
+    game.camera.offset_x, game.camera.offset_y = snap["camera"]
+    game._current_zone_id, game._zone_banner_timer = snap["zone"]
+
+    p = game.entities.player
+    ps = snap["player"]
+    _apply_slots(p, ps["slots"])
+    for k in _PLAYER_ATTRS:
+        setattr(p, k, copy.deepcopy(ps["attrs"][k]))
+    _apply_slots(p.stats, ps["stats"])
+    p.inventory.items = copy.deepcopy(ps["items"])
+    p.inventory.equipped = dict(ps["equipped"])   # also invalidates DerivedStats
+    p.inventory.gold = ps["gold"]
+    if set(ps["effects"]) - set(vars(p.effects)):
+        raise ValueError("snapshot: unknown status effect fields")
+    p.effects.__dict__.update(copy.deepcopy(ps["effects"]))
+    p.effects._mods_cache = None
+
+    for qid, fields in snap["quests"].items():
+        q = game.quest_manager.quests.get(qid)
+        if q is not None:
+            q.update(copy.deepcopy(fields))
+    game.entities.projectiles = []
+    game.state = STATE_PLAYING
+    rng.set_state(snap["rng"])
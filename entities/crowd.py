@@ -0,0 +1,126 @@
+# ============================================================
+#  Crowd steering: uniform-grid neighbour queries, separation
+#  and local avoidance for enemies and moving NPCs
+#
+#  The grid is rebuilt from EntityManager's lists once per frame
+#  (O(n)); each agent then looks at a capped number of nearby
+#  agents, so the whole pass stays linear in the crowd size.
+# ============================================================
+import math
+from core.settings import (
+    CROWD_CELL_SIZE, CROWD_MAX_NEIGHBORS, CROWD_PERSONAL_SPACE,
+    CROWD_PUSH_SPEED,
+)
+
+_GOLDEN_ANGLE = 2.399963   # spreads exactly-stacked agents deterministically
+
+
+class SpatialGrid:
+    """Uniform grid bucketing entities by the cell their position falls in."""
+
+    def __init__(self, cell_size=CROWD_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}   # (cx, cy) -> [entity, ...]
+
+    def clear(self):
+        self.cells.clear()
+
+    def insert(self, ent):
+        key = (int(ent.wx // self.cell_size), int(ent.wy // self.cell_size))
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [ent]
+        else:
+            bucket.append(ent)
+
+    def query(self, wx, wy, radius, limit=CROWD_MAX_NEIGHBORS, exclude=None):
+        """Return up to *limit* entities within *radius* of (wx, wy)."""
+        cs = self.cell_size
+        r2 = radius * radius
+        found = []
+        for cx in range(int((wx - radius) // cs), int((wx + radius) // cs) + 1):
+            for cy in range(int((wy - radius) // cs), int((wy + radius) // cs) + 1):
+                for ent in self.cells.get((cx, cy), ()):
+                    if ent is exclude:
+                        continue
+                    dx = ent.wx - wx
+                    dy = ent.wy - wy
+                    if dx * dx + dy * dy <= r2:
+                        found.append(ent)
+                        if len(found) >= limit:
+                            return found
+        return found
+
+
+class CrowdSteering:
+    """Computes a per-agent separation vector (steer_dx, steer_dy) each frame.
+
+    Movers (alive enemies, non-idle NPCs) are steered and gently pushed
+    apart; the player and idle NPCs only act as obstacles.
+    """
+
+    def __init__(self):
+        self.grid = SpatialGrid()
+        self._max_radius = 0.0
+
+    def update(self, entities, iso_map):
+        grid = self.grid
+        grid.clear()
+        movers = []
+        max_r = 0.0
+
+        player = entities.player
+        if player and player.active:
+            grid.insert(player)
+            max_r = player.radius
+        for e in entities.enemies:
+            if e.active and e.stats.alive:
+                grid.insert(e)
+                movers.append(e)
+                max_r = max(max_r, e.radius)
+        for n in entities.npcs:
+            if n.active:
+                grid.insert(n)
+                if n.behavior != "idle":
+                    movers.append(n)
+                max_r = max(max_r, n.radius)
+        self._max_radius = max_r
+
+        for i, agent in enumerate(movers):
+            sx, sy = self._separation(agent, i)
+            agent.steer_dx = sx
+            agent.steer_dy = sy
+            if (sx or sy) and iso_map:
+                self._push(agent, sx, sy, iso_map)
+
+    def _separation(self, agent, order):
+        """Sum of away-vectors from overlapping neighbours, weighted by depth."""
+        reach_max = agent.radius + self._max_radius + CROWD_PERSONAL_SPACE
+        sx = sy = 0.0
+        for other in self.grid.query(agent.wx, agent.wy, reach_max, exclude=agent):
+            reach = agent.radius + other.radius + CROWD_PERSONAL_SPACE
+            dx = agent.wx - other.wx
+            dy = agent.wy - other.wy
+            d2 = dx * dx + dy * dy
+            if d2 >= reach * reach:
+                continue
+            d = math.sqrt(d2)
+            if d < 0.0001:
+                angle = order * _GOLDEN_ANGLE
+                dx, dy, d = math.cos(angle), math.sin(angle), 1.0
+            w = (reach - d) / reach
+            sx += dx / d * w
+            sy += dy / d * w
+        return sx, sy
+
+    @staticmethod
+    def _push(agent, sx, sy, iso_map):
+        """Resolve overlap directly (per-axis, respecting walls)."""
+        mag = math.sqrt(sx * sx + sy * sy)
+        step = min(mag, 1.0) * CROWD_PUSH_SPEED / mag
+        new_wx = agent.wx + sx * step
+        new_wy = agent.wy + sy * step
+        if iso_map.can_occupy(new_wx, agent.wy, agent.radius):
+            agent.wx = new_wx
+        if iso_map.can_occupy(agent.wx, new_wy, agent.radius):
+            agent.wy = new_wy
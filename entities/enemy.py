@@ -1,36 +1,63 @@
 # ============================================================
-#  Enemy: AI state machine (idle/wander/chase/attack)
+#  Enemy: AI state machine (idle/wander/chase/attack/retreat)
+#
+#  Tactics come from the scene's shared influence maps
+#  (world/influence.py, game.influence): wanderers drift towards
+#  packmates, chasers swing wide of a crowded approach, and wounded
+#  enemies under threat fall back towards their territory.
 # ============================================================
 import math
-import random
 import pygame
 from entities.entity import Entity
 from systems.stats import Stats
+from types import MappingProxyType
+from core.settings import (
+    ENEMY_RADIUS, CROWD_SEPARATION_WEIGHT, ENEMY_RETREAT_HP, ENEMY_RETREAT_THREAT,
+    ENEMY_FLANK_DENSITY, ENEMY_FLANK_WEIGHT, ENEMY_GROUP_WEIGHT,
+)
 from core.utils import distance, normalize
+from core.rng import stream
 from assets.sprite_manager import load_entity_sprites
 
 
+_rng = stream("ai")
+
 # AI states
 AI_IDLE = "idle"
 AI_WANDER = "wander"
 AI_CHASE = "chase"
 AI_ATTACK = "attack"
+AI_RETREAT = "retreat"
 
 
 class Enemy(Entity):
+    # Template data (max_hp, drops, color, ...) is NOT stored per instance:
+    # it is read through properties from the shared EnemyArchetype.
+    __slots__ = (
+        "enemy_type", "archetype", "spawn_wx", "spawn_wy", "stats",
+        "ai_state", "ai_timer", "wander_dx", "wander_dy",
+        "attack_cooldown", "hit_flash", "combat_cooldown", "sprites",
+    )
+
     def __init__(self, wx, wy, enemy_type="orc", **kwargs):
         super().__init__(wx, wy)
         self.enemy_type = enemy_type
         self.spawn_wx = wx
         self.spawn_wy = wy
 
-        # Default attributes, can be overridden via kwargs
-        defaults = ENEMY_TEMPLATES.get(enemy_type, ENEMY_TEMPLATES["orc"])
-        for k, v in defaults.items():
-            setattr(self, k, v)
-        for k, v in kwargs.items():
-            setattr(self, k, v)
+        # Shared per-type data; kwargs overrides get a private archetype
+        self.archetype = get_archetype(enemy_type)
+        if kwargs:
+            self.archetype = self.archetype.derive(**kwargs)
+        self.radius = self.archetype.radius
+
+        self._init_runtime()
+
+        # Sprites
+        self.sprites = load_entity_sprites(f"enemies/{self.enemy_type}")
 
+    def _init_runtime(self):
+        """Fresh stats and AI state (shared by __init__ and reset)."""
         self.stats = Stats(
             hp=self.max_hp, mp=0,
             str_=self.str_val, dex=self.dex_val,
@@ -39,15 +66,23 @@ class Enemy(Entity):
 
         # AI
         self.ai_state = AI_IDLE
-        self.ai_timer = random.randint(30, 120)
+        self.ai_timer = _rng.randint(30, 120)
         self.wander_dx = 0.0
         self.wander_dy = 0.0
         self.attack_cooldown = 0
         self.hit_flash = 0
         self.combat_cooldown = 0  # Post-combat cooldown to prevent immediate re-trigger
 
-        # Sprites
-        self.sprites = load_entity_sprites(f"enemies/{self.enemy_type}")
+    def reset(self, wx, wy):
+        """Revive a pooled enemy at (wx, wy); sprites and template are kept."""
+        self.wx = float(wx)
+        self.wy = float(wy)
+        self.spawn_wx = self.wx
+        self.spawn_wy = self.wy
+        self.active = True
+        self.steer_dx = 0.0
+        self.steer_dy = 0.0
+        self._init_runtime()
 
     def update(self, game):
         if not self.stats.alive:
@@ -72,40 +107,68 @@ class Enemy(Entity):
 
         # Advance sprite animation
         if self.sprites:
-            state = "walk" if self.ai_state in (AI_WANDER, AI_CHASE) else "idle"
+            state = "walk" if self.ai_state in (AI_WANDER, AI_CHASE, AI_RETREAT) else "idle"
             self.sprites.update(state)
 
         # AI state machine
         if self.ai_state == AI_IDLE:
-            self._ai_idle(dist_to_player)
+            self._ai_idle(game, player, dist_to_player)
         elif self.ai_state == AI_WANDER:
-            self._ai_wander(game, dist_to_player)
+            self._ai_wander(game, player, dist_to_player)
         elif self.ai_state == AI_CHASE:
             self._ai_chase(game, player, dist_to_player)
         elif self.ai_state == AI_ATTACK:
             self._ai_attack(game, player, dist_to_player)
+        elif self.ai_state == AI_RETREAT:
+            self._ai_retreat(game, player, dist_to_player)
+
+    def _detects(self, game, player, dist_to_player):
+        """Player is inside detect range AND visible (LOS only tested in range)."""
+        if dist_to_player >= self.detect_range:
+            return False
+        return game.iso_map.has_line_of_sight(self.wx, self.wy, player.wx, player.wy)
+
+    def _should_retreat(self, game):
+        """Wounded and inside the player's threat: fall back instead of engaging."""
+        inf = game.influence
+        return (inf is not None and self.stats.hp < self.stats.max_hp * ENEMY_RETREAT_HP
+                and inf.sample("threat", self.wx, self.wy) > ENEMY_RETREAT_THREAT)
+
+    def _engage(self, game):
+        """Player spotted: chase, or retreat when wounded."""
+        if self._should_retreat(game):
+            self.ai_state = AI_RETREAT
+            self.ai_timer = 180
+        else:
+            self.ai_state = AI_CHASE
 
-    def _ai_idle(self, dist_to_player):
+    def _ai_idle(self, game, player, dist_to_player):
         self.ai_timer -= 1
-        if dist_to_player < self.detect_range:
-            self.ai_state = AI_CHASE
+        if self._detects(game, player, dist_to_player):
+            self._engage(game)
             return
         if self.ai_timer <= 0:
             self.ai_state = AI_WANDER
-            angle = random.uniform(0, math.pi * 2)
+            angle = _rng.uniform(0, math.pi * 2)
             self.wander_dx = math.cos(angle)
             self.wander_dy = math.sin(angle)
-            self.ai_timer = random.randint(60, 180)
-
-    def _ai_wander(self, game, dist_to_player):
-        if dist_to_player < self.detect_range:
-            self.ai_state = AI_CHASE
+            self.ai_timer = _rng.randint(60, 180)
+            inf = game.influence
+            if inf:   # group up: bias the heading up the density gradient, towards packmates
+                gx, gy = inf.gradient("density", self.wx, self.wy)
+                self.wander_dx, self.wander_dy = normalize(
+                    self.wander_dx + gx * ENEMY_GROUP_WEIGHT,
+                    self.wander_dy + gy * ENEMY_GROUP_WEIGHT)
+
+    def _ai_wander(self, game, player, dist_to_player):
+        if self._detects(game, player, dist_to_player):
+            self._engage(game)
             return
 
         self.ai_timer -= 1
         if self.ai_timer <= 0:
             self.ai_state = AI_IDLE
-            self.ai_timer = random.randint(30, 120)
+            self.ai_timer = _rng.randint(30, 120)
             return
 
         speed = self.move_speed / 60.0 * 0.5
@@ -115,17 +178,17 @@ class Enemy(Entity):
         # Don't wander too far from spawn point
         if distance(new_wx, new_wy, self.spawn_wx, self.spawn_wy) > self.wander_range:
             self.ai_state = AI_IDLE
-            self.ai_timer = random.randint(30, 60)
+            self.ai_timer = _rng.randint(30, 60)
             return
 
-        if game.iso_map.is_walkable(new_wx, new_wy):
+        if game.iso_map.can_occupy(new_wx, new_wy, self.radius):
             self.wx = new_wx
             self.wy = new_wy
 
     def _ai_chase(self, game, player, dist_to_player):
         if dist_to_player > self.detect_range * 1.5:
             self.ai_state = AI_IDLE
-            self.ai_timer = random.randint(30, 60)
+            self.ai_timer = _rng.randint(30, 60)
             return
 
         # Trigger turn-based combat when within attack range
@@ -135,18 +198,57 @@ class Enemy(Entity):
                 game.start_combat(self)
             return
 
-        # Move toward player
-        dx = player.wx - self.wx
-        dy = player.wy - self.wy
-        dx, dy = normalize(dx, dy)
-        speed = self.move_speed / 60.0
+        if self._should_retreat(game):
+            self.ai_state = AI_RETREAT
+            self.ai_timer = 180
+            return
+
+        # Move toward player; swing wide when packmates already crowd the approach
+        dx, dy = normalize(player.wx - self.wx, player.wy - self.wy)
+        inf = game.influence
+        if inf and dist_to_player > inf.cell:
+            c = inf.cell
+            if inf.sample("density", self.wx + dx * c, self.wy + dy * c) > ENEMY_FLANK_DENSITY:
+                left = inf.sample("density", self.wx + (dx + dy) * c, self.wy + (dy - dx) * c)
+                right = inf.sample("density", self.wx + (dx - dy) * c, self.wy + (dy + dx) * c)
+                side = ENEMY_FLANK_WEIGHT if left <= right else -ENEMY_FLANK_WEIGHT
+                dx, dy = normalize(dx + dy * side, dy - dx * side)
+        self._step(game, dx, dy, self.move_speed / 60.0)
+
+    def _ai_retreat(self, game, player, dist_to_player):
+        """Fall back down the player's threat, towards the home territory."""
+        inf = game.influence
+        self.ai_timer -= 1
+        if (self.ai_timer <= 0 or inf is None
+                or inf.sample("threat", self.wx, self.wy) < ENEMY_RETREAT_THREAT * 0.5):
+            self.ai_state = AI_IDLE
+            self.ai_timer = _rng.randint(30, 60)
+            return
 
+        # Cornered: fight back
+        if dist_to_player < self.attack_range and self.combat_cooldown <= 0:
+            from core.settings import STATE_COMBAT
+            if game.state != STATE_COMBAT:
+                game.start_combat(self)
+            return
+
+        tx, ty = inf.gradient("threat", self.wx, self.wy)
+        hx, hy = inf.gradient("danger", self.wx, self.wy)
+        dx, dy = normalize(hx - tx, hy - ty)
+        if dx == 0.0 and dy == 0.0:
+            dx, dy = normalize(self.wx - player.wx, self.wy - player.wy)
+        self._step(game, dx, dy, self.move_speed / 60.0)
+
+    def _step(self, game, dx, dy, speed):
+        """Move along (dx, dy), steering around packmates (per-axis collision)."""
+        dx, dy = normalize(dx + self.steer_dx * CROWD_SEPARATION_WEIGHT,
+                           dy + self.steer_dy * CROWD_SEPARATION_WEIGHT)
         new_wx = self.wx + dx * speed
         new_wy = self.wy + dy * speed
 
-        if game.iso_map.is_walkable(new_wx, self.wy):
+        if game.iso_map.can_occupy(new_wx, self.wy, self.radius):
             self.wx = new_wx
-        if game.iso_map.is_walkable(self.wx, new_wy):
+        if game.iso_map.can_occupy(self.wx, new_wy, self.radius):
             self.wy = new_wy
 
     def _ai_attack(self, game, player, dist_to_player):
@@ -157,7 +259,7 @@ class Enemy(Entity):
                 game.start_combat(self)
         else:
             self.ai_state = AI_IDLE
-            self.ai_timer = random.randint(30, 60)
+            self.ai_timer = _rng.randint(30, 60)
 
     def draw(self, surface, camera):
         if not self.active:
@@ -237,7 +339,7 @@ ENEMY_TEMPLATES = {
         "detect_range": 4.0, "move_speed": 1.2, "wander_range": 3.5,
         "xp_reward": 10, "gold_reward": 5, "drops": ["goblin_ear"],
         "color": (70, 90, 50), "draw_size": (3, 2),
-        "ranged": False, "is_boss": False,
+        "radius": 0.25, "ranged": False, "is_boss": False,
     },
     "wolf": {
         "max_hp": 20, "str_val": 3, "dex_val": 2, "int_val": 0, "def_val": 1,
@@ -245,7 +347,7 @@ ENEMY_TEMPLATES = {
         "detect_range": 5.0, "move_speed": 1.5, "wander_range": 5.0,
         "xp_reward": 15, "gold_reward": 8, "drops": [],
         "color": (100, 90, 80), "draw_size": (4, 3),
-        "ranged": False, "is_boss": False,
+        "radius": 0.3, "ranged": False, "is_boss": False,
     },
     # ★★ Medium
     "spider": {
@@ -254,7 +356,8 @@ ENEMY_TEMPLATES = {
         "detect_range": 5.5, "move_speed": 1.3, "wander_range": 4.0,
         "xp_reward": 20, "gold_reward": 10, "drops": ["spider_silk"],
         "color": (40, 35, 55), "draw_size": (4, 3),
-        "ranged": False, "is_boss": False,
+        "radius": 0.3, "ranged": False, "is_boss": False,
+        "inflicts": {"poison": 0.3},
     },
     "undead": {
         "max_hp": 35, "str_val": 3, "dex_val": 1, "int_val": 2, "def_val": 3,
@@ -262,7 +365,7 @@ ENEMY_TEMPLATES = {
         "detect_range": 5.0, "move_speed": 0.9, "wander_range": 4.0,
         "xp_reward": 30, "gold_reward": 15, "drops": ["morgul_shard"],
         "color": (130, 140, 160), "draw_size": (4, 3),
-        "ranged": False, "is_boss": False,
+        "radius": 0.3, "ranged": False, "is_boss": False,
     },
     # ★★★ Hard
     "uruk_berserker": {
@@ -271,7 +374,7 @@ ENEMY_TEMPLATES = {
         "detect_range": 6.0, "move_speed": 1.1, "wander_range": 4.0,
         "xp_reward": 60, "gold_reward": 35, "drops": ["uruk_shield"],
         "color": (110, 75, 45), "draw_size": (5, 4),
-        "ranged": False, "is_boss": False,
+        "radius": 0.35, "ranged": False, "is_boss": False,
     },
     # ★★★★ Very Hard
     "nazgul": {
@@ -280,7 +383,7 @@ ENEMY_TEMPLATES = {
         "detect_range": 8.0, "move_speed": 0.9, "wander_range": 6.0,
         "xp_reward": 120, "gold_reward": 80, "drops": ["morgul_blade"],
         "color": (30, 25, 40), "draw_size": (5, 5),
-        "ranged": False, "is_boss": False,
+        "radius": 0.35, "ranged": False, "is_boss": False,
     },
     # ★★★★★ Boss
     "balrog": {
@@ -289,7 +392,7 @@ ENEMY_TEMPLATES = {
         "detect_range": 8.0, "move_speed": 0.7, "wander_range": 4.0,
         "xp_reward": 1000, "gold_reward": 500, "drops": ["one_ring"],
         "color": (200, 60, 10), "draw_size": (8, 8),
-        "ranged": False, "is_boss": True,
+        "radius": 0.45, "ranged": False, "is_boss": True,
     },
     "orc": {
         "max_hp": 25, "str_val": 2, "dex_val": 1, "int_val": 0, "def_val": 1,
@@ -297,7 +400,7 @@ ENEMY_TEMPLATES = {
         "detect_range": 5.0, "move_speed": 1.0, "wander_range": 4.0,
         "xp_reward": 20, "gold_reward": 10, "drops": ["orc_blood"],
         "color": (80, 100, 60), "draw_size": (4, 3),
-        "ranged": False, "is_boss": False,
+        "radius": 0.3, "ranged": False, "is_boss": False,
     },
     "wight": {
         "max_hp": 40, "str_val": 4, "dex_val": 2, "int_val": 0, "def_val": 3,
@@ -305,7 +408,7 @@ ENEMY_TEMPLATES = {
         "detect_range": 6.0, "move_speed": 1.2, "wander_range": 5.0,
         "xp_reward": 35, "gold_reward": 18, "drops": ["morgul_shard"],
         "color": (160, 170, 180), "draw_size": (4, 4),
-        "ranged": False, "is_boss": False,
+        "radius": 0.3, "ranged": False, "is_boss": False,
     },
     "uruk_archer": {
         "max_hp": 30, "str_val": 2, "dex_val": 5, "int_val": 0, "def_val": 2,
@@ -313,7 +416,7 @@ ENEMY_TEMPLATES = {
         "detect_range": 7.0, "move_speed": 1.3, "wander_range": 4.0,
         "xp_reward": 30, "gold_reward": 15, "drops": [],
         "color": (90, 70, 50), "draw_size": (4, 4),
-        "ranged": True, "is_boss": False,
+        "radius": 0.3, "ranged": True, "is_boss": False,
     },
     "cave_troll": {
         "max_hp": 200, "str_val": 8, "dex_val": 1, "int_val": 0, "def_val": 8,
@@ -321,6 +424,71 @@ ENEMY_TEMPLATES = {
         "detect_range": 6.0, "move_speed": 0.6, "wander_range": 3.0,
         "xp_reward": 300, "gold_reward": 150, "drops": ["mithril_coat"],
         "color": (120, 100, 80), "draw_size": (6, 6),
-        "ranged": False, "is_boss": True,
+        "radius": 0.45, "ranged": False, "is_boss": True,
     },
 }
+
+
+# ============================================================
+#  Flyweight archetypes: one immutable object per enemy type
+# ============================================================
+ARCHETYPE_FIELDS = (
+    "max_hp", "str_val", "dex_val", "int_val", "def_val",
+    "atk_damage", "attack_range", "attack_cd",
+    "detect_range", "move_speed", "wander_range",
+    "xp_reward", "gold_reward", "drops", "inflicts",
+    "color", "draw_size", "radius", "ranged", "is_boss",
+)
+
+_ARCHETYPE_DEFAULTS = {"inflicts": {}, "radius": ENEMY_RADIUS}
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return MappingProxyType(dict(value))
+    return value
+
+
+class EnemyArchetype:
+    """Immutable template data shared by every enemy of one type."""
+
+    __slots__ = ARCHETYPE_FIELDS + ("enemy_type",)
+
+    def __init__(self, enemy_type, template):
+        object.__setattr__(self, "enemy_type", enemy_type)
+        for name in ARCHETYPE_FIELDS:
+            value = template.get(name, _ARCHETYPE_DEFAULTS.get(name))
+            object.__setattr__(self, name, _freeze(value))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"EnemyArchetype is immutable (tried to set {name!r})")
+
+    def derive(self, **overrides):
+        """New archetype with some fields replaced (for one-off variants)."""
+        template = {name: getattr(self, name) for name in ARCHETYPE_FIELDS}
+        template.update(overrides)
+        return EnemyArchetype(self.enemy_type, template)
+
+
+_ARCHETYPES = {}   # enemy_type -> EnemyArchetype
+
+
+def get_archetype(enemy_type):
+    """Shared archetype for an enemy type (unknown types fall back to orc)."""
+    arch = _ARCHETYPES.get(enemy_type)
+    if arch is None:
+        template = ENEMY_TEMPLATES.get(enemy_type, ENEMY_TEMPLATES["orc"])
+        arch = _ARCHETYPES[enemy_type] = EnemyArchetype(enemy_type, template)
+    return arch
+
+
+def _archetype_property(name):
+    return property(lambda self: getattr(self.archetype, name),
+                    doc=f"{name} from the shared EnemyArchetype")
+
+
+for _name in ARCHETYPE_FIELDS:
+    if _name != "radius":          # radius is a per-instance Entity slot
+        setattr(Enemy, _name, _archetype_property(_name))
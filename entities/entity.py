@@ -3,15 +3,22 @@
 # ============================================================
 import pygame
 from core.utils import world_to_screen
+from entities.crowd import CrowdSteering
 
 
 class Entity:
     """Base class for all game entities."""
 
+    __slots__ = ("wx", "wy", "active", "radius", "steer_dx", "steer_dy")
+
     def __init__(self, wx, wy):
         self.wx = float(wx)
         self.wy = float(wy)
         self.active = True
+        self.radius = 0.0   # collision radius (0 = point)
+        # Separation vector written by CrowdSteering each frame
+        self.steer_dx = 0.0
+        self.steer_dy = 0.0
 
     @property
     def sort_key(self):
@@ -37,6 +44,7 @@ class EntityManager:
         self.enemies = []
         self.npcs = []
         self.projectiles = []
+        self.crowd = CrowdSteering()
 
     def all_entities(self):
         """Return list of all active entities (for depth-sorted drawing)."""
@@ -49,6 +57,9 @@ class EntityManager:
         return entities
 
     def update(self, game):
+        self.crowd.update(self, game.iso_map)
+        if game.influence:
+            game.influence.update(self)
         if self.player:
             self.player.update(game)
         for e in self.enemies:
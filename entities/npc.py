@@ -2,15 +2,27 @@
 #  NPC: dialogue/shop/quest triggers + speech bubble + follow behavior
 # ============================================================
 import math
-import random as rnd
 import pygame
 from entities.entity import Entity
-from core.settings import COLOR_NPC
+from core.settings import COLOR_NPC, NPC_RADIUS, CROWD_SEPARATION_WEIGHT
+from core.utils import normalize
 from assets.sprite_manager import load_entity_sprites
 from systems.i18n import t, tf
+from core.rng import stream
+
+rnd = stream("npc")
 
 
 class NPC(Entity):
+    __slots__ = (
+        "name", "npc_type", "dialogue_id", "shop_id", "quest_ids", "color",
+        "sprites", "_icon", "_icon_bob", "_canvas_top_y",
+        "behavior", "_saved_behavior", "home_wx", "home_wy",
+        "patrol_points", "_patrol_index", "wander_radius", "_move_target",
+        "_move_speed", "_follow_speed", "_wait_timer", "_moving",
+        "idle_lines", "_bubble_text", "_bubble_timer", "_bubble_cooldown",
+    )
+
     def __init__(self, wx, wy, name="NPC", npc_type="talk",
                  dialogue_id=None, shop_id=None, quest_ids=None,
                  color=None, behavior="idle", patrol_points=None,
@@ -22,6 +34,7 @@ class NPC(Entity):
         self.shop_id = shop_id
         self.quest_ids = quest_ids or []
         self.color = color or COLOR_NPC
+        self.radius = NPC_RADIUS
         self.sprites = load_entity_sprites(f"npcs/{self.name.lower()}")
 
         # Overhead icon
@@ -163,14 +176,14 @@ class NPC(Entity):
         new_wx = self.wx + dx * self._move_speed
         new_wy = self.wy + dy * self._move_speed
 
-        if game.iso_map and game.iso_map.is_walkable(new_wx, new_wy):
+        if game.iso_map and game.iso_map.can_occupy(new_wx, new_wy, self.radius):
             self.wx = new_wx
             self.wy = new_wy
             self._moving = True
-        elif game.iso_map and game.iso_map.is_walkable(new_wx, self.wy):
+        elif game.iso_map and game.iso_map.can_occupy(new_wx, self.wy, self.radius):
             self.wx = new_wx
             self._moving = True
-        elif game.iso_map and game.iso_map.is_walkable(self.wx, new_wy):
+        elif game.iso_map and game.iso_map.can_occupy(self.wx, new_wy, self.radius):
             self.wy = new_wy
             self._moving = True
         else:
@@ -201,19 +214,19 @@ class NPC(Entity):
             self._moving = False
             return
 
-        dx /= dist
-        dy /= dist
+        dx, dy = normalize(dx / dist + self.steer_dx * CROWD_SEPARATION_WEIGHT,
+                           dy / dist + self.steer_dy * CROWD_SEPARATION_WEIGHT)
         new_wx = self.wx + dx * self._follow_speed
         new_wy = self.wy + dy * self._follow_speed
 
-        if game.iso_map and game.iso_map.is_walkable(new_wx, new_wy):
+        if game.iso_map and game.iso_map.can_occupy(new_wx, new_wy, self.radius):
             self.wx = new_wx
             self.wy = new_wy
             self._moving = True
-        elif game.iso_map and game.iso_map.is_walkable(new_wx, self.wy):
+        elif game.iso_map and game.iso_map.can_occupy(new_wx, self.wy, self.radius):
             self.wx = new_wx
             self._moving = True
-        elif game.iso_map and game.iso_map.is_walkable(self.wx, new_wy):
+        elif game.iso_map and game.iso_map.can_occupy(self.wx, new_wy, self.radius):
             self.wy = new_wy
             self._moving = True
         else:
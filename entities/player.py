@@ -4,10 +4,14 @@
 import math
 import pygame
 from entities.entity import Entity
-from systems.stats import Stats
+from systems.stats import Stats, DerivedStats
 from systems.inventory import Inventory
-from core.settings import PLAYER_SPEED, PLAYER_COLOR, HALF_W, HALF_H
+from systems.status_effects import StatusEffects, EFFECTS
+from core.settings import (
+    PLAYER_SPEED, PLAYER_COLOR, PLAYER_RADIUS, PLAYER_BASE_STATS, HALF_W, HALF_H,
+)
 from core.utils import normalize
+from core.replay import MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT
 from assets.sprite_manager import load_entity_sprites
 from systems.i18n import t, tf, get_item_name
 
@@ -24,9 +28,11 @@ DIR_MAP = {
 class Player(Entity):
     def __init__(self, wx, wy):
         super().__init__(wx, wy)
-        self.stats = Stats(hp=80, mp=40, str_=4, dex=3, int_=3, def_=3, level=1)
+        self.stats = Stats(**PLAYER_BASE_STATS)
         self.inventory = Inventory()
         self.inventory.gold = 50
+        self.effects = StatusEffects()
+        self.derived = DerivedStats(self.stats, self.inventory, self.effects)
 
         # Facing direction (may be used for combat animations)
         self.facing_angle = 0.0
@@ -35,6 +41,7 @@ class Player(Entity):
 
         # Movement
         self.speed = PLAYER_SPEED / 60.0  # Convert to per-frame movement
+        self.radius = PLAYER_RADIUS
 
         # Interaction
         self.interact_target = None  # Nearby interactable NPC
@@ -50,6 +57,10 @@ class Player(Entity):
         # Message timer
         self.messages = [(t, c - 1) for t, c in self.messages if c > 1]
 
+        # Buffs / debuffs: only events that are due are processed
+        for name in self.effects.update(self.stats):
+            self.add_message(tf("effect_expired", name=t(EFFECTS[name]["name_key"])))
+
         self._handle_movement(game)
         self._check_interact(game)
 
@@ -67,19 +78,19 @@ class Player(Entity):
             self.sprites.update(state)
 
     def _handle_movement(self, game):
-        keys = pygame.key.get_pressed()
+        mask = game.input.movement()
         dx, dy = 0.0, 0.0
 
-        if keys[pygame.K_w] or keys[pygame.K_UP]:
+        if mask & MOVE_UP:
             dx += DIR_MAP["W"][0]
             dy += DIR_MAP["W"][1]
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        if mask & MOVE_DOWN:
             dx += DIR_MAP["S"][0]
             dy += DIR_MAP["S"][1]
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        if mask & MOVE_LEFT:
             dx += DIR_MAP["A"][0]
             dy += DIR_MAP["A"][1]
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        if mask & MOVE_RIGHT:
             dx += DIR_MAP["D"][0]
             dy += DIR_MAP["D"][1]
 
@@ -90,8 +101,9 @@ class Player(Entity):
             self.facing_dy = dy
             self.facing_angle = math.degrees(math.atan2(dy, dx))
 
-            new_wx = self.wx + dx * self.speed
-            new_wy = self.wy + dy * self.speed
+            speed = self.speed * self.derived.get("speed_mul", 1.0)
+            new_wx = self.wx + dx * speed
+            new_wy = self.wy + dy * speed
 
             if game.iso_map:
                 cols = game.iso_map.cols
@@ -111,10 +123,10 @@ class Player(Entity):
                     if game.try_scene_transition("south", self.wx):
                         return
 
-            # Collision detection: per-axis
-            if game.iso_map.is_walkable(new_wx, self.wy):
+            # Collision detection: per-axis, radius-aware
+            if game.iso_map.can_occupy(new_wx, self.wy, self.radius):
                 self.wx = new_wx
-            if game.iso_map.is_walkable(self.wx, new_wy):
+            if game.iso_map.can_occupy(self.wx, new_wy, self.radius):
                 self.wy = new_wy
         else:
             self.moving = False
@@ -133,9 +145,11 @@ class Player(Entity):
                 self.interact_target.interact(game)
 
     def _on_enemy_kill(self, enemy, game):
-        """Callback when an enemy is killed."""
+        """Callback when an enemy is killed; returns the rolled LootResult."""
+        from systems.loot import roll_enemy_loot
+        loot = roll_enemy_loot(enemy, self._loot_context(game))
         xp = enemy.xp_reward
-        gold = enemy.gold_reward
+        gold = loot.gold
         leveled = self.stats.add_xp(xp)
         self.inventory.gold += gold
         self.add_message(f"+{xp}XP +{gold}G")
@@ -147,13 +161,25 @@ class Player(Entity):
             game.quest_manager.on_enemy_kill(enemy.enemy_type)
 
         # Drop items
-        for item_id in enemy.drops:
-            self.inventory.add_item(item_id)
+        for item_id in loot.items:
+            if not self.inventory.add_item(item_id):
+                continue
             name = get_item_name(item_id)
             self.add_message(tf("got_item", name=name))
             # Notify collect quest
             if game.quest_manager:
                 game.quest_manager.on_collect(item_id)
+        return loot
+
+    def _loot_context(self, game):
+        """Facts conditional loot drops can test (see systems.loot._matches)."""
+        ctx = {"level": self.stats.level}
+        if game.quest_manager:
+            ctx["active_quests"] = {qid for qid, q in game.quest_manager.quests.items()
+                                    if q["status"] == "active"}
+        if getattr(game, "settings_mgr", None):
+            ctx["difficulty"] = game.settings_mgr.difficulty
+        return ctx
 
     def on_projectile_hit(self, enemy, damage, game):
         """Callback when a projectile hits an enemy."""
@@ -9,6 +9,11 @@ from assets.sprite_manager import load_single_sprite
 
 
 class Projectile(Entity):
+    __slots__ = (
+        "angle", "speed", "damage", "max_range", "color", "owner",
+        "start_wx", "start_wy", "dx", "dy", "trail", "sprites",
+    )
+
     def __init__(self, wx, wy, angle_deg, speed, damage, max_range,
                  color, owner="player"):
         super().__init__(wx, wy)
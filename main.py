@@ -1,18 +1,86 @@
 # ============================================================
 #  Entry point
+#
+#    python main.py                      normal windowed game
+#    python main.py --record run.rep     play and record input
+#    python main.py --replay run.rep     watch a recording
+#    python main.py --headless --frames 20000 [--seed N]
+#                                        simulate without display/audio
+#                                        (random-walk bot unless --replay)
+#    python main.py --procgen forest     start in a generated zone
 # ============================================================
+import argparse
+import time
 from core.logger import setup_logging, get_logger
 from core.game import Game
 
 log = get_logger("main")
 
 
-def main():
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Middle-earth isometric RPG")
+    ap.add_argument("--headless", action="store_true",
+                    help="run the simulation without a window or audio")
+    ap.add_argument("--frames", type=int, default=None,
+                    help="stop after this many frames")
+    ap.add_argument("--seed", type=int, default=None,
+                    help="master RNG seed (default: random)")
+    ap.add_argument("--record", metavar="PATH",
+                    help="record input to a replay file")
+    ap.add_argument("--replay", metavar="PATH",
+                    help="play back a replay file")
+    ap.add_argument("--procgen", metavar="BIOME",
+                    help="start in a procedurally generated zone "
+                         "(meadow, forest, marsh, mountains, wastes)")
+    return ap.parse_args(argv)
+
+
+def _make_game(args):
+    from core.replay import (KeyboardInput, InputRecorder, ReplayInput,
+                             ScriptedInput, random_walk_policy)
+    if args.replay:
+        source = ReplayInput(args.replay)
+        game = Game(source, seed=source.seed, headless=args.headless)
+        game.settings_mgr.apply_gameplay_settings(source.settings)
+    elif args.headless:
+        game = Game(None, seed=args.seed, headless=True)
+        game.input = ScriptedInput(random_walk_policy(game.seed))
+    else:
+        game = Game(KeyboardInput(), seed=args.seed)
+        if args.record:
+            game.input = InputRecorder(game.input, args.record, game.seed,
+                                       game.settings_mgr.gameplay_settings())
+    # Recordings, replays and headless runs all start from a fresh game,
+    # so they never depend on the local save slots.
+    if args.headless or args.record or args.replay or args.procgen:
+        game.new_game()
+    if args.replay:
+        if game.input.zone:               # recorded in a procedural zone
+            from world.procgen import parse_zone_id
+            game.load_procedural_zone(*parse_zone_id(game.input.zone))
+    elif args.procgen:
+        zone_id = game.load_procedural_zone(args.procgen)
+        if args.record:
+            game.input.zone = zone_id
+    return game
+
+
+def main(argv=None):
+    args = parse_args(argv)
     setup_logging()
     log.info("Game starting")
     try:
-        game = Game()
-        game.run()
+        game = _make_game(args)
+        t0 = time.perf_counter()
+        game.run(max_frames=args.frames)
+        if args.headless:
+            elapsed = time.perf_counter() - t0
+            summary = (f"Headless run: {game.frame} frames in {elapsed:.2f}s "
+                       f"({game.frame / max(elapsed, 1e-9):.0f} fps), state={game.state}")
+            log.info(summary)
+            print(summary)
+        if args.replay and game.input.desyncs:
+            log.warning("Replay desynced at frames %s", game.input.desyncs)
     except Exception:
         log.exception("Unhandled exception — game crashed")
         raise
@@ -0,0 +1,487 @@
+# ============================================================
+#  Monte Carlo combat balance simulator
+#
+#    python -m sim.balance --battles 5000 --difficulty normal hard
+#    python -m sim.balance --zones --build warrior_5
+#
+#  Replays CombatScene's turn rules (systems.combat formulas:
+#  attack / skills / crits / defend / flee / consumables / enemy
+#  defend and on-hit effects) without rendering, for thousands
+#  of battles per (player build, enemy type, difficulty).
+#
+#  Two engines produce the same distribution:
+#    numpy  — all battles of a job advance one turn at a time as
+#             arrays (used when NumPy is installed)
+#    python — one battle at a time (fallback, and the reference)
+#  Jobs are spread across cores with a process pool.
+# ============================================================
+import argparse
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:      # optional: the pure-Python engine is used instead
+    np = None
+
+from core.settings import (
+    COMBAT_MELEE, COMBAT_RANGED, COMBAT_MAGIC, MAGIC_COST,
+    DIFFICULTY_LEVELS, PLAYER_BASE_STATS,
+)
+from systems.combat import (
+    crit_chance, turn_base_damage, scale_player_damage, turn_enemy_damage,
+    FLEE_CHANCE, ENEMY_DEFEND_HP_RATIO, ENEMY_DEFEND_CHANCE, AUTO_HEAL_AT, hp_loss,
+)
+from systems.inventory import Inventory, ITEMS
+from systems.stats import Stats, DerivedStats
+from systems.status_effects import StatusEffects
+from entities.enemy import ENEMY_TEMPLATES, get_archetype
+
+# Battle outcomes
+WIN, LOSS, FLED, TIMEOUT = 0, 1, 2, 3
+OUTCOME_NAMES = ("win", "loss", "fled", "timeout")
+MAX_TURNS = 200
+
+# Player actions chosen by the policy
+_ATTACK, _MAGIC, _HEAL, _MANA, _DEFEND, _FLEE = range(6)
+
+# Scripted player policy (hp thresholds are fractions of max HP)
+DEFAULT_POLICY = {
+    "heal_at": AUTO_HEAL_AT,  # drink the strongest healing item at or below this
+    "flee_at": None,          # try to flee at or below this (never vs bosses)
+    "defend_at": None,        # defend at or below this when no potion is left
+    "use_magic": True,        # cast magic when it beats the best free attack
+}
+
+
+# ============================================================
+#  Builds
+# ============================================================
+class Build:
+    """A player configuration: level, stat point allocation, gear, consumables."""
+
+    __slots__ = ("name", "level", "alloc", "equipment", "consumables")
+
+    def __init__(self, name, level=1, alloc=("str",), equipment=("sting",),
+                 consumables=None):
+        self.name = name
+        self.level = level
+        self.alloc = tuple(alloc)          # free points cycle through these
+        self.equipment = tuple(equipment)
+        self.consumables = dict(consumables or {})
+
+    def profile(self):
+        """Plain-data summary (picklable) built with the real Stats/Inventory code."""
+        stats = Stats(**PLAYER_BASE_STATS)
+        while stats.level < self.level:
+            stats.add_xp(stats.xp_needed() - stats.xp)
+        i = 0
+        while stats.free_points > 0:
+            stats.assign_point(self.alloc[i % len(self.alloc)])
+            i += 1
+        inv = Inventory()
+        for item_id in self.equipment:
+            if not (inv.add_item(item_id) and inv.equip(item_id)):
+                raise ValueError(f"build {self.name}: cannot equip {item_id!r}")
+        derived = dict(DerivedStats(stats, inv, StatusEffects()).totals())
+        items = []
+        for item_id, count in self.consumables.items():
+            data = ITEMS.get(item_id)
+            if not data or data.get("type") != "consumable":
+                raise ValueError(f"build {self.name}: {item_id!r} is not a consumable")
+            items.append((item_id, count, data.get("heal", 0), data.get("restore_mp", 0)))
+        return {"name": self.name, "level": stats.level,
+                "max_hp": stats.max_hp, "max_mp": stats.max_mp,
+                "dex": stats.dex, "derived": derived, "consumables": items}
+
+
+BUILDS = {
+    "starter": Build("starter", 1, ("str",), ("sting",), {"miruvor": 2}),
+    "warrior_5": Build("warrior_5", 5, ("str", "str", "def"),
+                       ("dark_blade", "chain_mail", "iron_helm", "iron_boots"),
+                       {"miruvor": 3, "athelas": 1}),
+    "ranger_5": Build("ranger_5", 5, ("dex",),
+                      ("elven_longbow", "ranger_cloak", "ranger_boots", "rangers_hood"),
+                      {"miruvor": 3}),
+    "mage_5": Build("mage_5", 5, ("int",),
+                    ("wizards_staff", "elven_robe", "elven_circlet"),
+                    {"miruvor": 2, "ent_draught": 3}),
+    "hero_10": Build("hero_10", 10, ("str", "def"),
+                     ("anduril", "mithril_coat", "mithril_helm", "ring_barahir",
+                      "necklace_moria", "iron_boots"),
+                     {"athelas": 3, "lembas_bread": 2}),
+}
+
+
+# ============================================================
+#  Battle plan: everything deterministic, precomputed once per job
+# ============================================================
+def enemy_profile(enemy_type):
+    a = get_archetype(enemy_type)
+    return {"type": enemy_type, "max_hp": a.max_hp, "def_": a.def_val,
+            "atk": a.atk_damage, "boss": a.is_boss, "inflicts": dict(a.inflicts)}
+
+
+def make_plan(profile, enemy, difficulty, policy=None):
+    """Fold build, enemy, difficulty and policy into per-turn constants."""
+    policy = dict(DEFAULT_POLICY, **(policy or {}))
+    derived = profile["derived"]
+    edef = enemy["def_"]
+
+    def losses(mode):
+        base = turn_base_damage(mode, derived, edef)
+        # CombatScene passes the already-reduced damage through
+        # Stats.take_damage, which subtracts the enemy's DEF a second time
+        return (hp_loss(scale_player_damage(base, False, difficulty), edef),
+                hp_loss(scale_player_damage(base, True, difficulty), edef))
+
+    melee, ranged, magic = losses(COMBAT_MELEE), losses(COMBAT_RANGED), losses(COMBAT_MAGIC)
+    free = max(melee, ranged)
+    pdef = derived["def_"]
+    consumables = profile["consumables"]
+    heal_items = sorted((i for i, c in enumerate(consumables) if c[2] > 0),
+                        key=lambda i: -consumables[i][2])
+    mana_items = sorted((i for i, c in enumerate(consumables) if c[3] > 0 and c[2] == 0),
+                        key=lambda i: -consumables[i][3])
+    return {
+        "max_hp": profile["max_hp"], "max_mp": profile["max_mp"],
+        "enemy_hp": enemy["max_hp"], "boss": enemy["boss"],
+        "crit_p": crit_chance(profile["dex"], derived["crit"]),
+        "free": free, "magic": magic,
+        "use_magic": policy["use_magic"] and magic[0] > free[0],
+        "hit": turn_enemy_damage(enemy["atk"], pdef, False, difficulty),
+        "hit_defending": turn_enemy_damage(enemy["atk"], pdef, True, difficulty),
+        "inflicts": sorted(enemy["inflicts"].items()),
+        "items": [(c[0], c[1], c[2], c[3]) for c in consumables],
+        "heal_items": heal_items, "mana_items": mana_items,
+        "heal_at": policy["heal_at"] * profile["max_hp"],
+        "flee_at": (None if policy["flee_at"] is None or enemy["boss"]
+                    else policy["flee_at"] * profile["max_hp"]),
+        "defend_at": (None if policy["defend_at"] is None
+                      else policy["defend_at"] * profile["max_hp"]),
+    }
+
+
+# ============================================================
+#  Pure-Python engine (reference)
+# ============================================================
+def _choose(plan, hp, mp, counts):
+    """Policy decision for one turn: (action, item index or None)."""
+    if hp <= plan["heal_at"]:
+        for i in plan["heal_items"]:
+            if counts[i] > 0:
+                return _HEAL, i
+    if plan["flee_at"] is not None and hp <= plan["flee_at"]:
+        return _FLEE, None
+    if plan["defend_at"] is not None and hp <= plan["defend_at"]:
+        return _DEFEND, None
+    if plan["use_magic"]:
+        if mp >= MAGIC_COST:
+            return _MAGIC, None
+        for i in plan["mana_items"]:
+            if counts[i] > 0:
+                return _MANA, i
+    return _ATTACK, None
+
+
+def simulate_battle(plan, rng):
+    """One battle; returns (outcome, turns, hp_lost, mp_spent, items_used, effects)."""
+    max_hp, max_mp = plan["max_hp"], plan["max_mp"]
+    hp, mp, ehp = max_hp, max_mp, plan["enemy_hp"]
+    items = plan["items"]
+    counts = [c[1] for c in items]
+    used = [0] * len(items)
+    crit_p = plan["crit_p"]
+    mp_spent = effects = 0
+    outcome = TIMEOUT
+    turns = 0
+    while turns < MAX_TURNS:
+        turns += 1
+        defending = False
+        action, idx = _choose(plan, hp, mp, counts)
+        if action in (_HEAL, _MANA):
+            _, _, heal, restore = items[idx]
+            hp = min(max_hp, hp + heal)
+            mp = min(max_mp, mp + restore)
+            counts[idx] -= 1
+            used[idx] += 1
+        elif action == _FLEE:
+            if rng.random() < FLEE_CHANCE:
+                outcome = FLED
+                break
+        elif action == _DEFEND:
+            defending = True
+        else:
+            if action == _MAGIC:
+                mp -= MAGIC_COST
+                mp_spent += MAGIC_COST
+                loss = plan["magic"]
+            else:
+                loss = plan["free"]
+            ehp -= loss[1] if rng.random() < crit_p else loss[0]
+            if ehp <= 0:
+                outcome = WIN
+                break
+
+        # Enemy turn
+        if ehp / plan["enemy_hp"] < ENEMY_DEFEND_HP_RATIO and rng.random() < ENEMY_DEFEND_CHANCE:
+            continue
+        hp = max(0, hp - (plan["hit_defending"] if defending else plan["hit"]))
+        for _, chance in plan["inflicts"]:
+            if rng.random() < chance:
+                effects += 1
+        if hp <= 0:
+            outcome = LOSS
+            break
+    return outcome, turns, max_hp - hp, mp_spent, used, effects
+
+
+def _run_python(plan, n, seed):
+    rng = random.Random(seed)
+    outcomes, turns, hp_lost, mp_spent, effects = [], [], [], [], []
+    used = [0] * len(plan["items"])
+    for _ in range(n):
+        o, t, h, m, u, e = simulate_battle(plan, rng)
+        outcomes.append(o)
+        turns.append(t)
+        hp_lost.append(h)
+        mp_spent.append(m)
+        effects.append(e)
+        for i, k in enumerate(u):
+            used[i] += k
+    return outcomes, turns, hp_lost, mp_spent, used, effects
+
+
+# ============================================================
+#  NumPy engine: every battle of the job advances one turn per pass
+# ============================================================
+def _run_numpy(plan, n, seed):
+    rng = np.random.default_rng(seed)
+    max_hp, max_mp = plan["max_hp"], plan["max_mp"]
+    hp = np.full(n, max_hp, dtype=np.int64)
+    mp = np.full(n, max_mp, dtype=np.int64)
+    ehp = np.full(n, plan["enemy_hp"], dtype=np.int64)
+    items = plan["items"]
+    counts = np.array([[c[1] for c in items]] * n, dtype=np.int64).reshape(n, len(items))
+    used = np.zeros(len(items), dtype=np.int64)
+    mp_spent = np.zeros(n, dtype=np.int64)
+    effects = np.zeros(n, dtype=np.int64)
+    turns = np.zeros(n, dtype=np.int64)
+    outcome = np.full(n, TIMEOUT, dtype=np.int8)
+    active = np.ones(n, dtype=bool)
+    crit_p = plan["crit_p"]
+
+    for _ in range(MAX_TURNS):
+        if not active.any():
+            break
+        turns[active] += 1
+        chosen = ~active                     # finished battles take no action
+        defending = np.zeros(n, dtype=bool)
+
+        def use_item(i, mask):
+            _, _, heal, restore = items[i]
+            np.minimum(hp + heal, max_hp, out=hp, where=mask)
+            np.minimum(mp + restore, max_mp, out=mp, where=mask)
+            counts[mask, i] -= 1
+            used[i] += int(mask.sum())
+
+        low = hp <= plan["heal_at"]
+        for i in plan["heal_items"]:
+            m = low & ~chosen & (counts[:, i] > 0)
+            use_item(i, m)
+            chosen |= m
+
+        if plan["flee_at"] is not None:
+            m = ~chosen & (hp <= plan["flee_at"])
+            fled = m & (rng.random(n) < FLEE_CHANCE)
+            outcome[fled] = FLED
+            active &= ~fled
+            chosen |= m
+
+        if plan["defend_at"] is not None:
+            m = ~chosen & (hp <= plan["defend_at"])
+            defending |= m
+            chosen |= m
+
+        crit = rng.random(n) < crit_p
+        if plan["use_magic"]:
+            m = ~chosen & (mp >= MAGIC_COST)
+            mp[m] -= MAGIC_COST
+            mp_spent[m] += MAGIC_COST
+            ehp[m] -= np.where(crit, plan["magic"][1], plan["magic"][0])[m]
+            chosen |= m
+            for i in plan["mana_items"]:
+                m = ~chosen & (counts[:, i] > 0)
+                use_item(i, m)
+                chosen |= m
+
+        m = ~chosen
+        ehp[m] -= np.where(crit, plan["free"][1], plan["free"][0])[m]
+
+        won = active & (ehp <= 0)
+        outcome[won] = WIN
+        active &= ~won
+
+        # Enemy turn
+        enemy_defends = ((ehp / plan["enemy_hp"] < ENEMY_DEFEND_HP_RATIO)
+                         & (rng.random(n) < ENEMY_DEFEND_CHANCE))
+        hit = active & ~enemy_defends
+        dmg = np.where(defending, plan["hit_defending"], plan["hit"])
+        np.maximum(hp - dmg, 0, out=hp, where=hit)
+        for _, chance in plan["inflicts"]:
+            effects += hit & (rng.random(n) < chance)
+        lost = active & (hp <= 0)
+        outcome[lost] = LOSS
+        active &= ~lost
+
+    return (outcome.tolist(), turns.tolist(), (max_hp - hp).tolist(),
+            mp_spent.tolist(), used.tolist(), effects.tolist())
+
+
+# ============================================================
+#  Jobs and reports
+# ============================================================
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+
+def summarize(raw, plan, n):
+    outcomes, turns, hp_lost, mp_spent, used, effects = raw
+    counts = Counter(outcomes)
+    turns_sorted = sorted(turns)
+    return {
+        "battles": n,
+        "win_rate": counts[WIN] / n,
+        "loss_rate": counts[LOSS] / n,
+        "flee_rate": counts[FLED] / n,
+        "timeout_rate": counts[TIMEOUT] / n,
+        "turns_mean": sum(turns) / n,
+        "turns_p50": _percentile(turns_sorted, 0.5),
+        "turns_p90": _percentile(turns_sorted, 0.9),
+        "turns_hist": dict(sorted(Counter(turns).items())),
+        "hp_lost_mean": sum(hp_lost) / n,
+        "mp_spent_mean": sum(mp_spent) / n,
+        "items_used_mean": {item[0]: k / n for item, k in zip(plan["items"], used) if k},
+        "effects_mean": sum(effects) / n,
+    }
+
+
+def run_job(job):
+    """Simulate one (build, enemy, difficulty) cell; top-level so pools can pickle it."""
+    profile, enemy_type, difficulty, policy, n, seed, engine = job
+    plan = make_plan(profile, enemy_profile(enemy_type), difficulty, policy)
+    use_numpy = engine == "numpy" or (engine == "auto" and np is not None)
+    if use_numpy and np is None:
+        raise RuntimeError("engine='numpy' requested but NumPy is not installed")
+    raw = _run_numpy(plan, n, seed) if use_numpy else _run_python(plan, n, seed)
+    result = summarize(raw, plan, n)
+    result.update(build=profile["name"], enemy=enemy_type, difficulty=difficulty)
+    return result
+
+
+def run_matrix(builds, enemy_types=None, difficulties=("normal",), battles=2000,
+               policy=None, workers=None, seed=0, engine="auto"):
+    """Simulate every build x enemy type x difficulty; returns one dict per cell."""
+    enemy_types = list(enemy_types or ENEMY_TEMPLATES)
+    profiles = [b.profile() for b in builds]
+    jobs = [(prof, et, diff, policy, battles, seed * 1_000_003 + i, engine)
+            for i, (prof, et, diff) in enumerate(
+                (p, e, d) for p in profiles for e in enemy_types for d in difficulties)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        return [run_job(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def zone_enemy_counts():
+    """{zone_id: Counter(enemy_type)} for the demo level's initial population."""
+    from world.demo_level import build_demo_level
+    scene_mgr = build_demo_level()["scene_mgr"]
+    return {zid: Counter(e.enemy_type for e in scene["enemies"])
+            for zid, scene in scene_mgr.build_all().items()}
+
+
+def zone_report(results, zones):
+    """Expected cost of clearing each zone once, fight by fight at full HP.
+
+    *results* come from run_matrix() for a single build and difficulty.
+    Enemy types with no result are listed under "missing"; a row with any
+    missing covers only the simulated fights, so its totals are a bound.
+    """
+    by_enemy = {r["enemy"]: r for r in results}
+    rows = []
+    for zid, enemies in zones.items():
+        p_clear, hp, turns, items = 1.0, 0.0, 0.0, Counter()
+        missing = []
+        for enemy_type, count in enemies.items():
+            r = by_enemy.get(enemy_type)
+            if r is None:
+                missing.append(enemy_type)
+                continue
+            p_clear *= r["win_rate"] ** count
+            hp += r["hp_lost_mean"] * count
+            turns += r["turns_mean"] * count
+            for item_id, k in r["items_used_mean"].items():
+                items[item_id] += k * count
+        rows.append({"zone": zid, "enemies": sum(enemies.values()),
+                     "p_clear": p_clear, "hp_lost": hp, "turns": turns,
+                     "items_used": dict(items), "missing": sorted(missing)})
+    return rows
+
+
+# ============================================================
+#  Command line
+# ============================================================
+def _print_results(results):
+    print(f"{'build':<10} {'enemy':<15} {'diff':<6} {'win%':>6} {'loss%':>6} "
+          f"{'turns':>6} {'p90':>4} {'hp lost':>8} {'mp':>6}  items")
+    for r in results:
+        items = ", ".join(f"{k} {v:.2f}" for k, v in r["items_used_mean"].items())
+        print(f"{r['build']:<10} {r['enemy']:<15} {r['difficulty']:<6} "
+              f"{100 * r['win_rate']:6.1f} {100 * r['loss_rate']:6.1f} "
+              f"{r['turns_mean']:6.1f} {r['turns_p90']:4d} {r['hp_lost_mean']:8.1f} "
+              f"{r['mp_spent_mean']:6.1f}  {items}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Monte Carlo combat balance simulator")
+    ap.add_argument("--battles", type=int, default=2000)
+    ap.add_argument("--build", nargs="+", default=list(BUILDS), choices=list(BUILDS))
+    ap.add_argument("--enemy", nargs="+", default=None, choices=list(ENEMY_TEMPLATES))
+    ap.add_argument("--difficulty", nargs="+", default=["normal"], choices=DIFFICULTY_LEVELS)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--engine", choices=("auto", "numpy", "python"), default="auto")
+    ap.add_argument("--flee-at", type=float, default=None)
+    ap.add_argument("--zones", action="store_true", help="also print per-zone totals")
+    args = ap.parse_args(argv)
+
+    policy = {"flee_at": args.flee_at}
+    builds = [BUILDS[name] for name in args.build]
+    results = run_matrix(builds, args.enemy, args.difficulty, args.battles,
+                         policy, args.workers, args.seed, args.engine)
+    _print_results(results)
+
+    if args.zones:
+        zones = zone_enemy_counts()
+        for build in builds:
+            for diff in args.difficulty:
+                cell = [r for r in results
+                        if r["build"] == build.name and r["difficulty"] == diff]
+                print(f"\n{build.name} / {diff}: clearing each zone once")
+                print(f"{'zone':<14} {'enemies':>7} {'p(clear)':>9} {'hp lost':>8} {'turns':>6}  items")
+                for row in zone_report(cell, zones):
+                    items = ", ".join(f"{k} {v:.1f}" for k, v in row["items_used"].items())
+                    if row["missing"]:
+                        items += f"  [incomplete, not simulated: {', '.join(row['missing'])}]"
+                    print(f"{row['zone']:<14} {row['enemies']:7d} {row['p_clear']:9.3f} "
+                          f"{row['hp_lost']:8.1f} {row['turns']:6.1f}  {items}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# ============================================================
+#  Gym-style environment over a headless Game
+#
+#    env = GameEnv(seed=1)
+#    obs = env.reset()
+#    obs, reward, done, info = env.step(action)
+#
+#  Actions are indices into ACTIONS (8 directions + idle, then
+#  interact / confirm / menu up / menu down); each step
+#  holds the action for SIM_FRAME_SKIP frames.  Observations are
+#  flat float32 vectors (array('f')) of length OBS_SIZE, built
+#  from the player, nearest enemies / NPCs, the quest log and a
+#  downsampled walkability grid of the current scene.
+#  Gameplay settings (difficulty, combat speed, ...) default to
+#  GAMEPLAY_DEFAULTS rather than the local config.json.
+#
+#  RNG streams are process-global (core.rng), so run one env per
+#  process when episodes must be reproducible (see sim.vec_env).
+# ============================================================
+from array import array
+import pygame
+from core import rng
+from core.game import Game
+from core.replay import InputSource, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT
+from core.settings import (
+    STATE_COMBAT, STATE_GAME_OVER,
+    SIM_FRAME_SKIP, SIM_MAX_STEPS, SIM_OBS_GRID,
+    SIM_OBS_ENEMIES, SIM_OBS_NPCS, SIM_OBS_QUESTS,
+)
+from core.settings_manager import GAMEPLAY_DEFAULTS
+from entities.enemy import ENEMY_TEMPLATES
+
+# (movement mask, key pressed on the first frame of the step or None)
+ACTIONS = (
+    (0, None),
+    (MOVE_UP, None),
+    (MOVE_DOWN, None),
+    (MOVE_LEFT, None),
+    (MOVE_RIGHT, None),
+    (MOVE_UP | MOVE_LEFT, None),
+    (MOVE_UP | MOVE_RIGHT, None),
+    (MOVE_DOWN | MOVE_LEFT, None),
+    (MOVE_DOWN | MOVE_RIGHT, None),
+    (0, pygame.K_e),          # interact / advance dialogue
+    (0, pygame.K_RETURN),     # confirm (combat menu, dialogue option)
+    (0, pygame.K_UP),         # menu cursor up
+    (0, pygame.K_DOWN),       # menu cursor down
+)
+N_ACTIONS = len(ACTIONS)
+
+# Observation layout
+PLAYER_FEATURES = 13
+ENEMY_FEATURES = 5      # dx, dy, hp fraction, type, present
+NPC_FEATURES = 3        # dx, dy, present
+QUEST_FEATURES = 2      # status code, progress fraction
+OBS_SIZE = (PLAYER_FEATURES
+            + SIM_OBS_ENEMIES * ENEMY_FEATURES
+            + SIM_OBS_NPCS * NPC_FEATURES
+            + SIM_OBS_QUESTS * QUEST_FEATURES
+            + SIM_OBS_GRID * SIM_OBS_GRID)
+
+_ENEMY_TYPE_CODE = {name: (i + 1) / len(ENEMY_TEMPLATES)
+                    for i, name in enumerate(sorted(ENEMY_TEMPLATES))}
+_QUEST_STATUS_CODE = {"available": 0.0, "active": 0.25, "completable": 0.5,
+                      "completed": 1.0, "failed": -1.0}
+
+# Reward shaping
+REWARD_XP = 0.01            # per XP point
+REWARD_QUEST_PROGRESS = 0.1
+REWARD_QUEST_COMPLETE = 1.0
+REWARD_DEATH = -1.0
+
+
+class _ActionInput(InputSource):
+    """InputSource fed by the env: one mask held, one key on the first frame."""
+
+    def __init__(self):
+        super().__init__()
+        self._events = []
+
+    def set(self, mask, key=None):
+        self._mask = mask
+        self._events = [] if key is None else [
+            pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)]
+
+    def poll(self):
+        events, self._events = self._events, []
+        return events
+
+
+def downsample_grid(iso_map, size=SIM_OBS_GRID):
+    """Walkable fraction of each cell of a size x size partition of the map."""
+    out = array("f", bytes(4 * size * size))
+    for gy in range(size):
+        r0 = gy * iso_map.rows // size
+        r1 = max(r0 + 1, (gy + 1) * iso_map.rows // size)
+        for gx in range(size):
+            c0 = gx * iso_map.cols // size
+            c1 = max(c0 + 1, (gx + 1) * iso_map.cols // size)
+            walk = iso_map.count_walkable(c0, r0, c1, r1)
+            out[gy * size + gx] = walk / ((r1 - r0) * (c1 - c0))
+    return out
+
+
+class GameEnv:
+    """step(action) -> (observation, reward, done, info) over a headless Game."""
+
+    action_count = N_ACTIONS
+    observation_size = OBS_SIZE
+
+    def __init__(self, seed=None, frame_skip=SIM_FRAME_SKIP, max_steps=SIM_MAX_STEPS,
+                 settings=None):
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self._input = _ActionInput()
+        self.game = Game(self._input, seed=seed, headless=True)
+        # Fixed gameplay settings, not the local config.json, so episodes
+        # are the same on every machine; *settings* overrides some of them
+        self.game.settings_mgr.apply_gameplay_settings({**GAMEPLAY_DEFAULTS, **(settings or {})})
+        self.seed = self.game.seed
+        self.steps = 0
+        self._grid_cache = {}     # id(iso_map) -> (iso_map, downsampled grid)
+        self._last = None
+
+    # ── Episode control ────────────────────────────────────────────────────
+
+    def reset(self, seed=None, out=None):
+        """Start a new episode; returns the first observation."""
+        if seed is not None:
+            self.seed = seed
+        self.game.seed = rng.seed_all(self.seed)
+        self.game.new_game()
+        self.game.frame = 0
+        self.steps = 0
+        self._grid_cache.clear()   # a new level builds new maps
+        self._last = self._progress()
+        return self.observe(out)
+
+    def step(self, action, out=None):
+        mask, key = ACTIONS[action]
+        game = self.game
+        for i in range(self.frame_skip):
+            self._input.set(mask, key if i == 0 else None)
+            game.step()
+            if game.state == STATE_GAME_OVER or not game.running:
+                break
+        self.steps += 1
+
+        progress = self._progress()
+        reward = self._reward(self._last, progress)
+        self._last = progress
+        died = game.state == STATE_GAME_OVER
+        done = died or not game.running or self.steps >= self.max_steps
+        info = {"frame": game.frame, "state": game.state,
+                "scene": game.scene_mgr.active_id if game.scene_mgr else None,
+                "truncated": not died and self.steps >= self.max_steps}
+        return self.observe(out), reward, done, info
+
+    def close(self):
+        pygame.quit()
+
+    # ── Reward ─────────────────────────────────────────────────────────────
+
+    def _progress(self):
+        """Counters the reward is computed from (differences per step)."""
+        game = self.game
+        p = game.entities.player
+        xp = completed = prog = 0
+        if p:
+            xp = p.stats.total_xp()
+        if game.quest_manager:
+            for q in game.quest_manager.quests.values():
+                prog += q.get("progress", 0)
+                if q["status"] == "completed":
+                    completed += 1
+        return xp, prog, completed, game.state == STATE_GAME_OVER
+
+    @staticmethod
+    def _reward(before, after):
+        reward = (after[0] - before[0]) * REWARD_XP
+        reward += (after[1] - before[1]) * REWARD_QUEST_PROGRESS
+        reward += (after[2] - before[2]) * REWARD_QUEST_COMPLETE
+        if after[3] and not before[3]:
+            reward += REWARD_DEATH
+        return reward
+
+    # ── Observation ────────────────────────────────────────────────────────
+
+    def _grid(self, iso_map):
+        cached = self._grid_cache.get(id(iso_map))
+        if cached is None or cached[0] is not iso_map:
+            cached = self._grid_cache[id(iso_map)] = (iso_map, downsample_grid(iso_map))
+        return cached[1]
+
+    def observe(self, out=None):
+        """Write the observation into *out* (any float sequence of OBS_SIZE) or a new array."""
+        if out is None:
+            out = array("f", bytes(4 * OBS_SIZE))
+        game = self.game
+        p = game.entities.player
+        iso_map = game.iso_map
+        if p is None or iso_map is None:
+            for i in range(OBS_SIZE):
+                out[i] = 0.0
+            return out
+
+        st = p.stats
+        scenes = game.scene_mgr.zone_ids if game.scene_mgr else []
+        scene_code = ((scenes.index(game.scene_mgr.active_id) + 1) / len(scenes)
+                      if scenes else 0.0)
+        dialogue = game.dialogue_manager is not None and game.dialogue_manager.is_active
+        out[0:PLAYER_FEATURES] = array("f", (
+            p.wx / iso_map.cols, p.wy / iso_map.rows,
+            st.hp / max(1, st.max_hp), st.mp / max(1, st.max_mp),
+            st.level, st.xp / max(1, st.xp_needed()),
+            p.inventory.gold, scene_code,
+            p.facing_dx, p.facing_dy,
+            float(game.state == STATE_COMBAT), float(dialogue),
+            float(game.state == STATE_GAME_OVER),
+        ))
+        i = PLAYER_FEATURES
+
+        # Nearest enemies / NPCs, relative position in tiles
+        px, py = p.wx, p.wy
+        enemies = sorted((e for e in game.entities.enemies if e.active),
+                         key=lambda e: (e.wx - px) ** 2 + (e.wy - py) ** 2)
+        for k in range(SIM_OBS_ENEMIES):
+            if k < len(enemies):
+                e = enemies[k]
+                out[i:i + ENEMY_FEATURES] = array("f", (
+                    e.wx - px, e.wy - py, e.stats.hp / max(1, e.stats.max_hp),
+                    _ENEMY_TYPE_CODE.get(e.enemy_type, 0.0), 1.0))
+            else:
+                out[i:i + ENEMY_FEATURES] = array("f", bytes(4 * ENEMY_FEATURES))
+            i += ENEMY_FEATURES
+
+        npcs = sorted(game.entities.npcs,
+                      key=lambda n: (n.wx - px) ** 2 + (n.wy - py) ** 2)
+        for k in range(SIM_OBS_NPCS):
+            if k < len(npcs):
+                n = npcs[k]
+                out[i:i + NPC_FEATURES] = array("f", (n.wx - px, n.wy - py, 1.0))
+            else:
+                out[i:i + NPC_FEATURES] = array("f", bytes(4 * NPC_FEATURES))
+            i += NPC_FEATURES
+
+        # Quest log in registration order (stable for a given level)
+        quests = list(game.quest_manager.quests.values()) if game.quest_manager else []
+        for k in range(SIM_OBS_QUESTS):
+            if k < len(quests):
+                q = quests[k]
+                out[i] = _QUEST_STATUS_CODE.get(q["status"], 0.0)
+                out[i + 1] = q.get("progress", 0) / max(1, q.get("required", 1))
+            else:
+                out[i] = out[i + 1] = 0.0
+            i += QUEST_FEATURES
+
+        out[i:i + SIM_OBS_GRID * SIM_OBS_GRID] = self._grid(iso_map)
+        return out
+
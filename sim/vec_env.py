@@ -0,0 +1,153 @@
+# ============================================================
+#  Vectorized GameEnv: N headless games in worker processes
+#
+#    with VecGameEnv(8, seed=100) as venv:
+#        obs = venv.reset()                 # flat float32 view, N * OBS_SIZE
+#        obs, rewards, dones, infos = venv.step(actions)
+#
+#  Each worker owns one GameEnv (so its RNG streams are its own)
+#  and writes observations straight into one shared-memory block;
+#  only actions, rewards and small info dicts cross the pipes.
+#  Finished episodes reset automatically, with a new seed, and
+#  the terminal observation is returned in info["final_observation"].
+# ============================================================
+import multiprocessing as mp
+from array import array
+from multiprocessing import shared_memory
+from core.logger import get_logger
+from sim.env import GameEnv, OBS_SIZE, N_ACTIONS
+
+log = get_logger("vec_env")
+
+_FLOAT = 4   # bytes per float32
+
+
+def _worker(conn, shm_name, index, seed, seed_stride, env_kwargs):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    out = shm.buf[index * OBS_SIZE * _FLOAT:(index + 1) * OBS_SIZE * _FLOAT].cast("f")
+    env = None
+    try:
+        env = GameEnv(seed=seed, **env_kwargs)
+        episode_seed = seed
+        while True:
+            cmd, arg = conn.recv()
+            if cmd == "step":
+                _, reward, done, info = env.step(arg, out=out)
+                if done:
+                    info["final_observation"] = array("f", out)
+                    episode_seed += seed_stride
+                    env.reset(episode_seed, out=out)
+                conn.send((reward, done, info))
+            elif cmd == "reset":
+                if arg is not None:
+                    episode_seed = arg
+                env.reset(episode_seed, out=out)
+                conn.send(None)
+            elif cmd == "close":
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        out.release()
+        shm.close()
+        if env:
+            env.close()
+        conn.close()
+
+
+class VecGameEnv:
+    """Batched step() over *n* GameEnv instances in a process pool."""
+
+    action_count = N_ACTIONS
+    observation_size = OBS_SIZE
+
+    def __init__(self, n, seed=0, start_method="spawn", **env_kwargs):
+        self.n = n
+        ctx = mp.get_context(start_method)
+        self._shm = shared_memory.SharedMemory(create=True, size=n * OBS_SIZE * _FLOAT)
+        self.obs = self._shm.buf.cast("f")   # env i at [i*OBS_SIZE, (i+1)*OBS_SIZE)
+        self._conns = []
+        self._procs = []
+        for i in range(n):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, daemon=True,
+                               args=(child, self._shm.name, i, seed + i, n, env_kwargs))
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self._waiting = False
+        self.closed = False
+        log.info("VecGameEnv started: %d workers, %d floats per observation", n, OBS_SIZE)
+
+    def row(self, i):
+        """Observation of env *i* (a view into shared memory)."""
+        return self.obs[i * OBS_SIZE:(i + 1) * OBS_SIZE]
+
+    def as_numpy(self):
+        """(n, OBS_SIZE) float32 array over the shared buffer (needs NumPy).
+
+        Drop the array before close(): shared memory can't be released
+        while a view of it is still alive.
+        """
+        import numpy as np
+        return np.ndarray((self.n, OBS_SIZE), dtype=np.float32, buffer=self._shm.buf)
+
+    def reset(self, seeds=None):
+        for i, conn in enumerate(self._conns):
+            conn.send(("reset", None if seeds is None else seeds[i]))
+        for conn in self._conns:
+            conn.recv()
+        return self.obs
+
+    def step_async(self, actions):
+        if len(actions) != self.n:
+            raise ValueError(f"expected {self.n} actions, got {len(actions)}")
+        for conn, action in zip(self._conns, actions):
+            conn.send(("step", int(action)))
+        self._waiting = True
+
+    def step_wait(self):
+        results = [conn.recv() for conn in self._conns]
+        self._waiting = False
+        rewards = [r[0] for r in results]
+        dones = [r[1] for r in results]
+        infos = [r[2] for r in results]
+        return self.obs, rewards, dones, infos
+
+    def step(self, actions):
+        """Step every env once; observations are updated in place in self.obs."""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._waiting:
+            for conn in self._conns:
+                conn.recv()
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self.obs.release()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -2,14 +2,34 @@
 #  Combat system: damage formulas, crits, arc detection
 # ============================================================
 import math
-import random
 from core.settings import (
     COMBAT_MELEE, COMBAT_RANGED, COMBAT_MAGIC,
     MELEE_RANGE, MELEE_ARC, MELEE_COOLDOWN, MELEE_BASE_DMG,
     RANGED_RANGE, RANGED_COOLDOWN, RANGED_BASE_DMG,
     MAGIC_RANGE, MAGIC_COOLDOWN, MAGIC_BASE_DMG, MAGIC_COST,
+    DIFFICULTY_MULTIPLIERS, COMBAT_INSTANT_MAX_TURNS, COMBAT_INSTANT_MAX_HP_LOSS,
 )
 from core.utils import distance, angle_between, angle_diff
+from core.rng import stream
+
+_rng = stream("combat")
+
+# Turn-based combat rules (shared by CombatScene and sim.balance)
+FLEE_CHANCE = 0.5             # chance a flee attempt succeeds (never vs bosses)
+ENEMY_DEFEND_HP_RATIO = 0.3   # below this HP fraction the enemy may defend…
+ENEMY_DEFEND_CHANCE = 0.5     # …with this chance instead of attacking
+CRIT_MULTIPLIER = 1.5
+
+# Auto-battle policy (CombatScene auto mode; sim.balance's default policy)
+AUTO_HEAL_AT = 0.35           # drink the strongest healing item at or below this HP fraction
+AUTO_FLEE_AT = 0.20           # try to flee at or below this when no healing is left
+
+# mode -> (base damage, derived stat scaling it)
+TURN_ATTACKS = {
+    COMBAT_MELEE: (MELEE_BASE_DMG, "str"),
+    COMBAT_RANGED: (RANGED_BASE_DMG, "dex"),
+    COMBAT_MAGIC: (MAGIC_BASE_DMG, "int"),
+}
 
 
 COMBAT_NAMES = {
@@ -32,10 +52,54 @@ def calc_damage(base_dmg, stat_bonus, weapon_bonus, target_def):
     return reduced
 
 
-def check_crit(dex, crit_bonus=0):
+def crit_chance(dex, crit_bonus=0):
+    """Base 5% + DEX*1% + crit_bonus% (from equipment)."""
+    return 0.05 + dex * 0.01 + crit_bonus * 0.01
+
+
+def check_crit(dex, crit_bonus=0, rng=None):
     """Crit check: base 5% + DEX*1% + crit_bonus% (from equipment)."""
-    crit_chance = 0.05 + dex * 0.01 + crit_bonus * 0.01
-    return random.random() < crit_chance
+    return (rng or _rng).random() < crit_chance(dex, crit_bonus)
+
+
+def difficulty_mul(difficulty, key):
+    """DIFFICULTY_MULTIPLIERS lookup ("player_dmg" / "enemy_dmg"); 1.0 if unknown."""
+    return DIFFICULTY_MULTIPLIERS.get(difficulty, {}).get(key, 1.0)
+
+
+def turn_base_damage(mode, derived, target_def):
+    """Turn-based attack damage before crit and difficulty."""
+    base, stat = TURN_ATTACKS[mode]
+    return calc_damage(base, derived[stat] * 2, derived["atk"], target_def)
+
+
+def scale_player_damage(dmg, is_crit, difficulty=None):
+    """Apply crit and the difficulty multiplier to player-dealt damage."""
+    if is_crit:
+        dmg = int(dmg * CRIT_MULTIPLIER)
+    if difficulty is not None:
+        dmg = max(1, int(dmg * difficulty_mul(difficulty, "player_dmg")))
+    return dmg
+
+
+def turn_player_damage(mode, derived, base_dex, target_def, difficulty=None, rng=None):
+    """One turn-based player attack: (damage, is_crit).
+
+    Crit chance uses the *base* DEX plus the equipment crit bonus.
+    """
+    dmg = turn_base_damage(mode, derived, target_def)
+    is_crit = check_crit(base_dex, derived["crit"], rng)
+    return scale_player_damage(dmg, is_crit, difficulty), is_crit
+
+
+def turn_enemy_damage(atk_damage, player_def, defending=False, difficulty=None):
+    """Damage an enemy's turn-based attack deals to the player."""
+    raw = atk_damage
+    if defending:
+        raw = max(1, raw // 2)
+    if difficulty is not None:
+        raw = max(1, int(raw * difficulty_mul(difficulty, "enemy_dmg")))
+    return max(1, raw - int(player_def * 0.8))
 
 
 def get_combat_params(mode):
@@ -79,19 +143,19 @@ def perform_melee_attack(player, entities):
     params = get_combat_params(COMBAT_MELEE)
     hit_enemies = []
 
-    total_eq = player.inventory.get_total_stats()
-    weapon_bonus = total_eq.get("atk", 0)
-    crit_bonus   = total_eq.get("crit", 0)
+    derived = player.derived.totals()
+    weapon_bonus = derived["atk"]
+    crit_bonus   = derived["crit"]
+    stat_bonus   = derived["str"] * 2
 
     for enemy in entities.get_enemies_in_range(player.wx, player.wy, MELEE_RANGE):
         if melee_arc_hit(player.wx, player.wy, player.facing_angle,
                          enemy.wx, enemy.wy):
-            stat_bonus = (player.stats.str + total_eq.get("str", 0)) * 2
             dmg = calc_damage(params["base_dmg"], stat_bonus, weapon_bonus,
                               enemy.stats.def_)
             is_crit = check_crit(player.stats.dex, crit_bonus)
             if is_crit:
-                dmg = int(dmg * 1.5)
+                dmg = int(dmg * CRIT_MULTIPLIER)
             enemy.stats.take_damage(dmg)
             hit_enemies.append((enemy, dmg, is_crit))
     return hit_enemies
@@ -102,9 +166,9 @@ def perform_ranged_attack(player, entities):
     from entities.projectile import Projectile
     from core.settings import ARROW_SPEED, COLOR_ARROW
 
-    total_eq = player.inventory.get_total_stats()
-    weapon_bonus = total_eq.get("atk", 0)
-    stat_bonus = (player.stats.dex + total_eq.get("dex", 0)) * 2
+    derived = player.derived.totals()
+    weapon_bonus = derived["atk"]
+    stat_bonus = derived["dex"] * 2
     base_dmg = RANGED_BASE_DMG + stat_bonus + weapon_bonus
 
     proj = Projectile(
@@ -128,9 +192,9 @@ def perform_magic_attack(player, entities):
     from entities.projectile import Projectile
     from core.settings import MAGIC_SPEED, COLOR_MAGIC_BOLT
 
-    total_eq = player.inventory.get_total_stats()
-    weapon_bonus = total_eq.get("atk", 0)
-    stat_bonus = (player.stats.int + total_eq.get("int", 0)) * 2
+    derived = player.derived.totals()
+    weapon_bonus = derived["atk"]
+    stat_bonus = derived["int"] * 2
     base_dmg = MAGIC_BASE_DMG + stat_bonus + weapon_bonus
 
     proj = Projectile(
@@ -144,3 +208,40 @@ def perform_magic_attack(player, entities):
     )
     entities.add_projectile(proj)
     return proj
+
+
+def hp_loss(dmg, target_def):
+    """HP a target loses from a turn-based hit (Stats.take_damage applies DEF again)."""
+    return max(1, dmg - int(target_def * 0.8))
+
+
+def best_free_mode(derived, target_def):
+    """Melee or ranged, whichever hits *target_def* harder (neither costs MP)."""
+    melee = turn_base_damage(COMBAT_MELEE, derived, target_def)
+    ranged = turn_base_damage(COMBAT_RANGED, derived, target_def)
+    return COMBAT_RANGED if ranged > melee else COMBAT_MELEE
+
+
+def is_trivial_encounter(player, enemy, difficulty=None):
+    """True if the player surely wins fast and nearly unhurt (instant resolve).
+
+    Worst case without crits: the kill takes at most COMBAT_INSTANT_MAX_TURNS
+    turns and the enemy's hits in between cost less than
+    COMBAT_INSTANT_MAX_HP_LOSS of the player's current HP.  Bosses never qualify,
+    and neither does a player at or below AUTO_HEAL_AT (the scene would heal or flee).
+    """
+    if getattr(enemy, "is_boss", False):
+        return False
+    if player.stats.hp <= AUTO_HEAL_AT * player.stats.max_hp:
+        return False
+    derived = player.derived.totals()
+    edef = enemy.stats.def_
+    mode = best_free_mode(derived, edef)
+    loss = hp_loss(scale_player_damage(turn_base_damage(mode, derived, edef), False,
+                                       difficulty), edef)
+    turns = -(-enemy.stats.hp // loss)
+    if turns > COMBAT_INSTANT_MAX_TURNS:
+        return False
+    worst = (turns - 1) * turn_enemy_damage(enemy.atk_damage, derived["def_"],
+                                            False, difficulty)
+    return worst < COMBAT_INSTANT_MAX_HP_LOSS * player.stats.hp
@@ -2,21 +2,28 @@
 #  Turn-based combat scene manager
 # ============================================================
 import math
-import random
 import pygame
 from core.settings import (
     SCREEN_WIDTH, SCREEN_HEIGHT,
     COLOR_BG, COLOR_HP, COLOR_MP, COLOR_UI, COLOR_ACCENT, COLOR_GOLD,
     COMBAT_MELEE, COMBAT_RANGED, COMBAT_MAGIC,
-    MELEE_BASE_DMG, RANGED_BASE_DMG, MAGIC_BASE_DMG, MAGIC_COST,
-    DIFFICULTY_MULTIPLIERS,
+    MAGIC_COST,
+)
+from systems.combat import (
+    turn_player_damage, turn_enemy_damage, turn_base_damage, best_free_mode,
+    FLEE_CHANCE, ENEMY_DEFEND_HP_RATIO, ENEMY_DEFEND_CHANCE,
+    AUTO_HEAL_AT, AUTO_FLEE_AT,
 )
-from systems.combat import calc_damage, check_crit
 from systems.inventory import ITEMS
+from systems.status_effects import EFFECTS
+from core.rng import stream
 from systems.i18n import t, tf, get_item_name
 from core.utils import draw_bar, draw_text, get_font, ui, FONT_UI_SM, FONT_UI_MD, FONT_UI_LG
 
 
+_rng = stream("combat")   # outcome rolls (flee, enemy AI, effects)
+_fx = stream("fx")        # cosmetic only: particles
+
 # --- Combat phases ---
 PHASE_INTRO = "intro"            # Combat start animation
 PHASE_PLAYER_CHOOSE = "player_choose"  # Player chooses action
@@ -77,6 +84,12 @@ class CombatScene:
         self.combat_finished = False
         self.result = None  # "win", "lose", "flee"
 
+        # Speed modes: turbo collapses every animation phase to one frame
+        # and skips particles / damage floats; auto_battle picks actions
+        self.turbo = False
+        self.auto_battle = False
+        self.instant = False   # resolve_instantly(): auto-battle only attacks
+
         # Visual state
         self._tick = 0
         self._player_lunge = 0.0
@@ -108,6 +121,11 @@ class CombatScene:
         self.combat_finished = False
         self.result = None
 
+        sm = getattr(game, "settings_mgr", None)
+        self.turbo = bool(sm and sm.combat_turbo)
+        self.auto_battle = bool(sm and sm.auto_battle)
+        self.instant = False
+
         self._tick = 0
         self._player_lunge = 0.0
         self._enemy_lunge = 0.0
@@ -126,6 +144,12 @@ class CombatScene:
             self.handle_key(pygame.K_RETURN)
 
     def handle_key(self, key):
+        if key == pygame.K_t:
+            self._set_modes(turbo=not self.turbo)
+            return
+        if key == pygame.K_b:
+            self._set_modes(auto_battle=not self.auto_battle)
+            return
         if self.phase == PHASE_PLAYER_CHOOSE:
             self._handle_menu_key(key)
         elif self.phase == PHASE_WIN:
@@ -181,6 +205,21 @@ class CombatScene:
                 self.menu_level = MENU_MAIN
                 self.cursor = 3
 
+    def _set_modes(self, turbo=None, auto_battle=None):
+        """Toggle turbo / auto-battle mid-fight and remember them in the settings.
+
+        Turbo is kept apart from combat_speed so toggling it never loses "instant".
+        """
+        sm = getattr(self.game, "settings_mgr", None)
+        if turbo is not None:
+            self.turbo = turbo
+            if sm:
+                sm.combat_turbo = turbo
+        if auto_battle is not None:
+            self.auto_battle = auto_battle
+            if sm:
+                sm.auto_battle = auto_battle
+
     def _select_main_option(self):
         opt = MAIN_OPT_IDS[self.cursor]
         if opt == "Attack":
@@ -277,7 +316,8 @@ class CombatScene:
         if not self.item_list:
             return
         item = self.item_list[self.item_cursor]
-        used = self.player.inventory.use_item(item["id"], self.player.stats)
+        used = self.player.inventory.use_item(item["id"], self.player.stats,
+                                              self.player.effects)
         if used:
             desc_parts = []
             if "heal" in item["data"]:
@@ -299,7 +339,7 @@ class CombatScene:
             self.log.append((t("cannot_flee_boss"), COLOR_ACCENT))
             return
 
-        if random.random() < 0.5:
+        if _rng.random() < FLEE_CHANCE:
             self.log.append((t("fled_success"), (100, 255, 100)))
             self.phase = PHASE_FLEE
             self.anim_timer = 40
@@ -308,34 +348,61 @@ class CombatScene:
             self.phase = PHASE_PLAYER_ACT
             self.anim_timer = 20
 
+    def _difficulty(self):
+        if self.game and hasattr(self.game, "settings_mgr"):
+            return self.game.settings_mgr.difficulty
+        return None
+
     def _calc_player_damage(self, mode):
+        # Formula lives in systems.combat so sim.balance reproduces it exactly
         p = self.player
-        total_eq = p.inventory.get_total_stats()
-        weapon_bonus = total_eq.get("atk", 0)
-        crit_bonus   = total_eq.get("crit", 0)
-
-        if mode == COMBAT_MELEE:
-            base = MELEE_BASE_DMG
-            stat_bonus = (p.stats.str + total_eq.get("str", 0)) * 2
-        elif mode == COMBAT_RANGED:
-            base = RANGED_BASE_DMG
-            stat_bonus = (p.stats.dex + total_eq.get("dex", 0)) * 2
-        else:
-            base = MAGIC_BASE_DMG
-            stat_bonus = (p.stats.int + total_eq.get("int", 0)) * 2
+        return turn_player_damage(mode, p.derived.totals(), p.stats.dex,
+                                  self.enemy.stats.def_, self._difficulty())
 
-        dmg = calc_damage(base, stat_bonus, weapon_bonus, self.enemy.stats.def_)
-        is_crit = check_crit(p.stats.dex, crit_bonus)
-        if is_crit:
-            dmg = int(dmg * 1.5)
+    # ---- Auto battle ----
 
-        # Apply difficulty multiplier to player-dealt damage
-        if self.game and hasattr(self.game, "settings_mgr"):
-            diff = self.game.settings_mgr.difficulty
-            mul = DIFFICULTY_MULTIPLIERS.get(diff, {}).get("player_dmg", 1.0)
-            dmg = max(1, int(dmg * mul))
+    def _auto_act(self):
+        """Rule-based turn: heal when low, flee if hopeless, else the hardest hit.
 
-        return dmg, is_crit
+        Instant fights only attack: they are meant to cost no items, and a
+        flee would leave a half-fought encounter behind.
+        """
+        p = self.player
+        st = p.stats
+        if not self.instant and st.hp <= AUTO_HEAL_AT * st.max_hp:
+            self._build_item_list()
+            heals = [i for i, it in enumerate(self.item_list)
+                     if it["data"].get("heal", 0) > 0]
+            if heals:
+                self.item_cursor = max(heals, key=lambda i: self.item_list[i]["data"]["heal"])
+                self._select_item()
+                return
+            if st.hp <= AUTO_FLEE_AT * st.max_hp and not getattr(self.enemy, "is_boss", False):
+                self._do_flee()
+                return
+
+        derived = p.derived.totals()
+        edef = self.enemy.stats.def_
+        mode = best_free_mode(derived, edef)
+        if (st.mp >= MAGIC_COST and turn_base_damage(COMBAT_MAGIC, derived, edef)
+                > turn_base_damage(mode, derived, edef)):
+            mode = COMBAT_MAGIC
+        self.menu_level = MENU_SKILL
+        self.cursor = next(i for i, sk in enumerate(SKILL_DEFS) if sk["mode"] == mode)
+        self._select_skill()
+
+    def resolve_instantly(self, player, enemy, game, max_frames=10000):
+        """Fight a whole battle synchronously (turbo + auto); return the result."""
+        self.start(player, enemy, game)
+        self.turbo = True
+        self.auto_battle = True
+        self.instant = True
+        for _ in range(max_frames):
+            self.update()
+            if self.combat_finished or self.phase == PHASE_LOSE:
+                break
+        self.active = False
+        return "lose" if self.phase == PHASE_LOSE else self.result
 
     # ---- Enemy AI ----
 
@@ -345,20 +412,11 @@ class CombatScene:
             return
 
         hp_ratio = e.stats.hp / e.stats.max_hp
-        if hp_ratio < 0.3 and random.random() < 0.5:
+        if hp_ratio < ENEMY_DEFEND_HP_RATIO and _rng.random() < ENEMY_DEFEND_CHANCE:
             self.log.append((tf("enemy_defend", name=self._enemy_name()), (200, 200, 255)))
         else:
-            raw_dmg = e.atk_damage
-            if self.player_defending:
-                raw_dmg = max(1, raw_dmg // 2)
-            # Apply difficulty multiplier to enemy-dealt damage
-            if self.game and hasattr(self.game, "settings_mgr"):
-                diff = self.game.settings_mgr.difficulty
-                mul = DIFFICULTY_MULTIPLIERS.get(diff, {}).get("enemy_dmg", 1.0)
-                raw_dmg = max(1, int(raw_dmg * mul))
-            equip_def = self.player.inventory.get_total_defense()
-            total_def = self.player.stats.def_ + equip_def
-            actual = max(1, raw_dmg - int(total_def * 0.8))
+            actual = turn_enemy_damage(e.atk_damage, self.player.derived.get("def_"),
+                                       self.player_defending, self._difficulty())
             self.player.stats.hp = max(0, self.player.stats.hp - actual)
             self.player_flash = 15
             self._pending_floats.append((str(actual), "player", (255, 120, 120)))
@@ -368,6 +426,13 @@ class CombatScene:
             self.log.append((tf("enemy_attacks", name=self._enemy_name(), dmg=actual),
                              (255, 150, 150)))
 
+            # On-hit status effects, e.g. {"poison": 0.3}
+            for effect, chance in getattr(e, "inflicts", {}).items():
+                if _rng.random() < chance and self.player.effects.apply(effect):
+                    self.log.append((tf("effect_inflicted",
+                                        name=t(EFFECTS[effect]["name_key"])),
+                                     (180, 255, 120)))
+
     def _enemy_name(self):
         return getattr(self.enemy, 'enemy_type', 'enemy').replace('_', ' ').title()
 
@@ -382,6 +447,16 @@ class CombatScene:
         if self.enemy_flash > 0:
             self.enemy_flash -= 1
 
+        if self.turbo:
+            self.phase_timer = min(self.phase_timer, 1)
+            self.anim_timer = min(self.anim_timer, 1)
+        if self.auto_battle:
+            if self.phase == PHASE_PLAYER_CHOOSE:
+                self._auto_act()
+            elif self.phase == PHASE_WIN:
+                self.combat_finished = True
+                self.result = "win"
+
         if self.phase == PHASE_INTRO:
             self.phase_timer -= 1
             if self.phase_timer <= 0:
@@ -429,6 +504,12 @@ class CombatScene:
                 self.result = "flee"
 
         self._tick += 1
+        if self.turbo:
+            self._player_lunge = self._enemy_lunge = 0.0
+            self._particles.clear()
+            self._damage_floats.clear()
+            self._shake = [0, 0]
+            return
         # Lunge animation fractions
         if self.phase == PHASE_PLAYER_ACT and self.anim_timer > 0:
             r = self.anim_timer / 30.0
@@ -454,9 +535,9 @@ class CombatScene:
         self._shake[1] = int(self._shake[1] * 0.60)
 
     def _grant_rewards(self):
-        self.player._on_enemy_kill(self.enemy, self.game)
+        loot = self.player._on_enemy_kill(self.enemy, self.game)
         xp = self.enemy.xp_reward
-        gold = self.enemy.gold_reward
+        gold = loot.gold
         self.log.append((tf("xp_gold_reward", xp=xp, gold=gold), COLOR_GOLD))
 
     # ---- Draw ---------------------------------------------------------------
@@ -482,6 +563,9 @@ class CombatScene:
         e_draw_cx = enemy_cx - e_lunge_dx
 
         # Consume pending effects (now we know screen positions)
+        if self.turbo:
+            self._pending_floats.clear()
+            self._pending_hits.clear()
         for text, target, color in self._pending_floats:
             x = e_draw_cx if target == "enemy" else p_draw_cx
             y = (enemy_cy - s * 8) if target == "enemy" else (player_cy - s * 8)
@@ -888,16 +972,16 @@ class CombatScene:
         cols = colors.get(etype, colors["melee"])
         count = 10 if etype == "magic" else 8
         for _ in range(count):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2.5, 7.0)
-            color = random.choice(cols)
+            angle = _fx.uniform(0, 2 * math.pi)
+            speed = _fx.uniform(2.5, 7.0)
+            color = _fx.choice(cols)
             self._particles.append({
                 "x": float(cx), "y": float(cy),
                 "vx": math.cos(angle) * speed,
                 "vy": math.sin(angle) * speed - 2.0,
-                "life": random.randint(14, 28),
+                "life": _fx.randint(14, 28),
                 "color": color,
-                "r": random.randint(2, 5),
+                "r": _fx.randint(2, 5),
             })
 
     def _draw_particles_layer(self, surf, ox, oy):
@@ -942,8 +1026,13 @@ class CombatScene:
         mx = ui(10)
         my = panel_y + ui(4)
 
-        # Section header
+        # Section header + speed mode toggles
         draw_text(surf, t("actions_label"), mx, my, font_sm, (120, 110, 160))
+        on, off = t("settings_on"), t("settings_off")
+        modes = tf("combat_modes_hint", turbo=on if self.turbo else off,
+                   auto=on if self.auto_battle else off)
+        mw = font_sm.size(modes)[0]
+        draw_text(surf, modes, sw // 2 - ui(8) - mw, my, font_sm, (120, 110, 160))
         my += ui(6)
 
         if self.menu_level == MENU_MAIN:
@@ -448,6 +448,26 @@ LANG = {
         "en": "Level Up! Lv{level}",
         "zh": "升级了！Lv{level}",
     },
+    "effect_expired": {
+        "en": "{name} wore off",
+        "zh": "{name}效果消失了",
+    },
+    "effect_inflicted": {
+        "en": "You are afflicted with {name}!",
+        "zh": "你陷入了{name}状态！",
+    },
+    "effect_poison": {
+        "en": "Poison",
+        "zh": "中毒",
+    },
+    "effect_regen": {
+        "en": "Regeneration",
+        "zh": "再生",
+    },
+    "effect_haste": {
+        "en": "Haste",
+        "zh": "迅捷",
+    },
     "quest_complete_msg": {
         "en": "Quest Complete! +{xp}XP +{gold}G",
         "zh": "任务完成！+{xp}经验 +{gold}金币",
@@ -508,6 +528,14 @@ LANG = {
         "en": "Magic",
         "zh": "魔法",
     },
+    "combat_modes_hint": {
+        "en": "[T] Turbo: {turbo}   [B] Auto: {auto}",
+        "zh": "[T] 加速: {turbo}   [B] 自动: {auto}",
+    },
+    "combat_instant_win": {
+        "en": "Defeated {name} in a quick skirmish.",
+        "zh": "速战速决，击败了 {name}。",
+    },
 
     # ========================
     #  Quest hints (HUD bottom)
@@ -1264,6 +1292,11 @@ LANG = {
     # ========================
     #  Difficulty labels
     # ========================
+    "biome_meadow": {"en": "Wild Meadows", "zh": "荒野草甸"},
+    "biome_forest": {"en": "Wild Forest", "zh": "荒野森林"},
+    "biome_marsh": {"en": "Wild Marshes", "zh": "荒野沼泽"},
+    "biome_mountains": {"en": "Wild Highlands", "zh": "荒野高地"},
+    "biome_wastes": {"en": "Wild Wastes", "zh": "荒野废土"},
     "zone_enter": {"en": "{name}  [{diff}]", "zh": "{name}  [{diff}]"},
 
     # ========================
@@ -1462,6 +1495,46 @@ LANG = {
         "en": "Hard",
         "zh": "困难",
     },
+    "diff_safe": {
+        "en": "Safe",
+        "zh": "安全",
+    },
+    "diff_medium": {
+        "en": "Medium",
+        "zh": "中等",
+    },
+    "diff_very_hard": {
+        "en": "Very Hard",
+        "zh": "极难",
+    },
+    "diff_boss": {
+        "en": "Boss",
+        "zh": "首领",
+    },
+    "settings_combat_speed": {
+        "en": "Combat Speed",
+        "zh": "战斗速度",
+    },
+    "settings_auto_battle": {
+        "en": "Auto Battle",
+        "zh": "自动战斗",
+    },
+    "settings_seamless_world": {
+        "en": "Seamless World",
+        "zh": "无缝世界",
+    },
+    "combat_speed_normal": {
+        "en": "Normal",
+        "zh": "普通",
+    },
+    "combat_speed_turbo": {
+        "en": "Turbo",
+        "zh": "加速",
+    },
+    "combat_speed_instant": {
+        "en": "Instant",
+        "zh": "瞬间",
+    },
     "settings_nav_hint": {
         "en": "[UP/DOWN] Select   [LEFT/RIGHT] Change   [ESC] Back",
         "zh": "[上/下] 选择   [左/右] 更改   [ESC] 返回",
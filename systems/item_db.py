@@ -0,0 +1,111 @@
+# ============================================================
+#  Item database: file-backed catalog with secondary indexes
+#
+#  Items live in data/items.json ({"format": 1, "items": {id: {...}}}).
+#  Records are stored once in a flat list; lookups go through an
+#  id → row dict and the slot / type / subtype / rarity indexes
+#  hold row numbers, so queries never scan the catalog.
+#  Content packs are further JSON files in the same format that
+#  add or override items.
+# ============================================================
+import json
+import os
+from collections.abc import Mapping
+
+ITEM_DB_FORMAT = 1
+INDEXED_FIELDS = ("slot", "type", "subtype", "rarity")
+
+
+class ItemDB(Mapping):
+    """Read-only mapping item_id -> item dict, plus indexed queries.
+
+    Behaves like the old ITEMS dict (get / [] / in / iteration), so
+    existing callers keep working unchanged.
+    """
+
+    def __init__(self):
+        self._rows = []       # [item dict, ...]
+        self._ids = []        # row -> item_id
+        self._row_of = {}     # item_id -> row
+        self._index = {f: {} for f in INDEXED_FIELDS}   # field -> value -> [row, ...]
+        self.version = 0      # bumped on every load; lets caches revalidate
+        self.packs = []       # paths loaded, in order
+
+    # ── Loading ────────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_file(cls, path):
+        db = cls()
+        db.load(path)
+        return db
+
+    def load(self, path):
+        """Load an item file (base catalog or content pack); return item count."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        fmt = data.get("format")
+        if fmt != ITEM_DB_FORMAT:
+            raise ValueError(f"{path}: unsupported item file format {fmt!r}")
+        items = data.get("items", {})
+        self.add_items(items)
+        self.packs.append(os.path.abspath(path))
+        return len(items)
+
+    def add_items(self, items):
+        """Insert or replace items from a {item_id: data} dict."""
+        for item_id, item_data in items.items():
+            row = self._row_of.get(item_id)
+            if row is None:
+                self._row_of[item_id] = len(self._rows)
+                self._rows.append(item_data)
+                self._ids.append(item_id)
+            else:
+                self._rows[row] = item_data
+        self._rebuild_indexes()
+        self.version += 1
+
+    def _rebuild_indexes(self):
+        index = {f: {} for f in INDEXED_FIELDS}
+        for row, item_data in enumerate(self._rows):
+            for field in INDEXED_FIELDS:
+                value = item_data.get(field)
+                if value is not None:
+                    index[field].setdefault(value, []).append(row)
+        self._index = index
+
+    # ── Mapping protocol ───────────────────────────────────────────────────
+
+    def __getitem__(self, item_id):
+        return self._rows[self._row_of[item_id]]
+
+    def __contains__(self, item_id):
+        return item_id in self._row_of
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, item_id, default=None):
+        row = self._row_of.get(item_id)
+        return default if row is None else self._rows[row]
+
+    # ── Indexed queries ────────────────────────────────────────────────────
+
+    def ids_where(self, field, value):
+        """Item ids whose *field* equals *value* (field in INDEXED_FIELDS)."""
+        ids = self._ids
+        return [ids[row] for row in self._index[field].get(value, ())]
+
+    def by_slot(self, slot):
+        return self.ids_where("slot", slot)
+
+    def by_type(self, type_):
+        return self.ids_where("type", type_)
+
+    def by_subtype(self, subtype):
+        return self.ids_where("subtype", subtype)
+
+    def by_rarity(self, rarity):
+        return self.ids_where("rarity", rarity)
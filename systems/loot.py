@@ -0,0 +1,343 @@
+# ============================================================
+#  Loot tables: weighted drops, rarity tiers, conditional
+#  drops and gold ranges, sampled with Vose alias tables
+#
+#  Each table is compiled once: a tier alias table (including
+#  an empty "nothing" outcome) and one alias table per tier,
+#  so a roll costs O(1) regardless of the number of entries.
+# ============================================================
+from collections import Counter
+from systems.inventory import ITEMS
+from core.rng import stream
+
+# Default relative weight of each rarity tier (tables may override)
+TIER_WEIGHTS = {
+    "common":    60,
+    "uncommon":  25,
+    "rare":      10,
+    "epic":       4,
+    "legendary":  1,
+}
+
+_NOTHING = None   # tier-table outcome meaning "this roll drops nothing"
+
+# enemy_type → table spec
+#   gold        : (min, max) inclusive
+#   rolls       : independent weighted rolls per kill
+#   nothing     : weight of an empty roll (same scale as tier weights)
+#   tiers       : optional tier-weight overrides
+#   entries     : [{"item", "weight", "tier"?}] — tier defaults to the item's rarity
+#   guaranteed  : items that always drop
+#   conditional : [{"item", "chance", "when": {...}}] — see _matches()
+LOOT_TABLES = {
+    "goblin": {
+        "gold": (3, 7), "rolls": 1, "nothing": 20,
+        "entries": [
+            {"item": "goblin_ear", "weight": 80},
+            {"item": "wood_sword", "weight": 10},
+            {"item": "leather_cap", "weight": 10},
+            {"item": "copper_ring", "weight": 10},
+        ],
+    },
+    "wolf": {
+        "gold": (5, 11), "rolls": 1, "nothing": 50,
+        "entries": [
+            {"item": "wolf_pelt", "weight": 100},
+            {"item": "worn_boots", "weight": 20},
+        ],
+    },
+    "spider": {
+        "gold": (6, 14), "rolls": 1, "nothing": 20,
+        "entries": [
+            {"item": "spider_silk", "weight": 100},
+            {"item": "athelas", "weight": 20, "tier": "uncommon"},
+        ],
+    },
+    "orc": {
+        "gold": (7, 14), "rolls": 1, "nothing": 30,
+        "entries": [
+            {"item": "orc_blood", "weight": 70},
+            {"item": "orc_scimitar", "weight": 20},
+            {"item": "leather_vest", "weight": 10},
+            {"item": "chain_mail", "weight": 10},
+        ],
+        "conditional": [
+            {"item": "orc_blood", "chance": 0.5, "when": {"quest_active": "quest_collect"}},
+        ],
+    },
+    "undead": {
+        "gold": (10, 20), "rolls": 1, "nothing": 25,
+        "entries": [
+            {"item": "morgul_shard", "weight": 80},
+            {"item": "stone_pendant", "weight": 20},
+            {"item": "necklace_moria", "weight": 20},
+            {"item": "elven_brooch", "weight": 10},
+        ],
+    },
+    "wight": {
+        "gold": (12, 24), "rolls": 1, "nothing": 25,
+        "entries": [
+            {"item": "morgul_shard", "weight": 80},
+            {"item": "silver_ring", "weight": 20},
+            {"item": "ring_of_shadow", "weight": 10},
+        ],
+    },
+    "uruk_archer": {
+        "gold": (10, 20), "rolls": 1, "nothing": 30,
+        "entries": [
+            {"item": "orc_blood", "weight": 60},
+            {"item": "short_bow", "weight": 30},
+            {"item": "hunting_bow", "weight": 20},
+            {"item": "swift_steps", "weight": 10},
+        ],
+    },
+    "uruk_berserker": {
+        "gold": (25, 45), "rolls": 2, "nothing": 30,
+        "entries": [
+            {"item": "orc_blood", "weight": 40},
+            {"item": "iron_helm", "weight": 30},
+            {"item": "iron_boots", "weight": 30},
+            {"item": "uruk_shield", "weight": 60},
+            {"item": "dark_blade", "weight": 40},
+            {"item": "gondor_plate", "weight": 10},
+        ],
+    },
+    "nazgul": {
+        "gold": (90, 150), "rolls": 2, "nothing": 10,
+        "tiers": {"common": 20, "uncommon": 30, "rare": 30, "epic": 15, "legendary": 5},
+        "guaranteed": ["morgul_blade"],
+        "entries": [
+            {"item": "morgul_shard", "weight": 100},
+            {"item": "ring_of_shadow", "weight": 50},
+            {"item": "shadow_boots", "weight": 30},
+            {"item": "ring_barahir", "weight": 10},
+        ],
+    },
+    "cave_troll": {
+        "gold": (110, 190), "rolls": 2, "nothing": 10,
+        "tiers": {"common": 30, "uncommon": 30, "rare": 25, "epic": 10, "legendary": 5},
+        "guaranteed": ["mithril_coat"],
+        "entries": [
+            {"item": "dwarf_cap", "weight": 40},
+            {"item": "necklace_moria", "weight": 40},
+            {"item": "mithril_helm", "weight": 30},
+            {"item": "crown_of_gondor", "weight": 10},
+        ],
+        "conditional": [
+            {"item": "elixir_of_power", "chance": 0.5, "when": {"min_level": 5}},
+        ],
+    },
+    "balrog": {
+        "gold": (400, 600), "rolls": 3, "nothing": 0,
+        "tiers": {"rare": 50, "epic": 35, "legendary": 15},
+        "guaranteed": ["one_ring"],
+        "entries": [
+            {"item": "elven_circlet", "weight": 30},
+            {"item": "evenstar", "weight": 20},
+            {"item": "wizards_staff", "weight": 20},
+            {"item": "anduril", "weight": 10},
+        ],
+        "conditional": [
+            {"item": "phial_galadriel", "chance": 1.0, "when": {"difficulty": "hard"}},
+        ],
+    },
+}
+
+
+# ============================================================
+#  Vose alias method
+# ============================================================
+class AliasTable:
+    """O(1) sampling from a fixed discrete distribution (Vose, 1991)."""
+
+    __slots__ = ("prob", "alias", "n")
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("alias table needs at least one positive weight")
+        self.n = n
+        prob = [0.0] * n
+        alias = [0] * n
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:   # leftovers are 1.0 up to rounding error
+            prob[i] = 1.0
+        self.prob = prob
+        self.alias = alias
+
+    def sample(self, rng):
+        i = int(rng.random() * self.n)
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+# ============================================================
+#  Compiled tables
+# ============================================================
+class LootResult:
+    __slots__ = ("gold", "items")
+
+    def __init__(self, gold=0, items=None):
+        self.gold = gold
+        self.items = items if items is not None else []
+
+
+def _matches(when, ctx):
+    """Evaluate a conditional-drop predicate against the kill context.
+
+    Supported keys: min_level, max_level, quest_active, difficulty.
+    """
+    if "min_level" in when and ctx.get("level", 1) < when["min_level"]:
+        return False
+    if "max_level" in when and ctx.get("level", 1) > when["max_level"]:
+        return False
+    if "quest_active" in when and when["quest_active"] not in ctx.get("active_quests", ()):
+        return False
+    if "difficulty" in when and ctx.get("difficulty") != when["difficulty"]:
+        return False
+    return True
+
+
+class LootTable:
+    """A compiled loot table: tier alias → per-tier item alias."""
+
+    def __init__(self, spec):
+        self.gold_min, self.gold_max = spec.get("gold", (0, 0))
+        self.rolls = spec.get("rolls", 1)
+        self.guaranteed = list(spec.get("guaranteed", ()))
+        self.conditional = list(spec.get("conditional", ()))
+
+        by_tier = {}
+        for entry in spec.get("entries", ()):
+            tier = entry.get("tier") or ITEMS.get(entry["item"], {}).get("rarity", "common")
+            by_tier.setdefault(tier, []).append(entry)
+
+        tier_weights = spec.get("tiers", TIER_WEIGHTS)
+        outcomes, weights = [], []
+        self._tier_items = []       # parallel to outcomes: ([item_id, ...], AliasTable)
+        for tier, entries in by_tier.items():
+            w = tier_weights.get(tier, 0)
+            if w <= 0:
+                continue
+            outcomes.append(tier)
+            weights.append(w)
+            self._tier_items.append((
+                [e["item"] for e in entries],
+                AliasTable([e.get("weight", 1) for e in entries]),
+            ))
+        nothing = spec.get("nothing", 0)
+        if nothing > 0:
+            outcomes.append(_NOTHING)
+            weights.append(nothing)
+            self._tier_items.append(None)
+        self._tiers = outcomes
+        self._tier_alias = AliasTable(weights) if weights else None
+
+    def _roll_item(self, rng):
+        """One weighted roll: item_id or None."""
+        if self._tier_alias is None:
+            return None
+        pick = self._tier_items[self._tier_alias.sample(rng)]
+        if pick is None:
+            return None
+        ids, alias = pick
+        return ids[alias.sample(rng)]
+
+    def roll(self, rng=None, ctx=None):
+        """Roll one kill; return a LootResult."""
+        rng = rng or LOOT_RNG
+        ctx = ctx or {}
+        items = list(self.guaranteed)
+        for _ in range(self.rolls):
+            item_id = self._roll_item(rng)
+            if item_id:
+                items.append(item_id)
+        for cond in self.conditional:
+            if _matches(cond.get("when", {}), ctx) and rng.random() < cond["chance"]:
+                items.append(cond["item"])
+        gold = rng.randint(self.gold_min, self.gold_max) if self.gold_max else 0
+        return LootResult(gold, items)
+
+    def roll_many(self, n, rng=None, ctx=None):
+        """Roll *n* kills at once; return (total_gold, Counter(item_id → count))."""
+        rng = rng or LOOT_RNG
+        ctx = ctx or {}
+        counts = Counter()
+        if self.guaranteed:
+            for item_id in self.guaranteed:
+                counts[item_id] += n
+
+        # Hot loop: alias sampling inlined with locals bound once
+        rand = rng.random
+        tier_alias = self._tier_alias
+        tier_items = self._tier_items
+        if tier_alias is not None:
+            t_prob, t_alias, t_n = tier_alias.prob, tier_alias.alias, tier_alias.n
+            drops = []
+            for _ in range(n * self.rolls):
+                i = int(rand() * t_n)
+                if rand() >= t_prob[i]:
+                    i = t_alias[i]
+                pick = tier_items[i]
+                if pick is None:
+                    continue
+                ids, alias = pick
+                j = int(rand() * alias.n)
+                if rand() >= alias.prob[j]:
+                    j = alias.alias[j]
+                drops.append(ids[j])
+            counts.update(drops)
+
+        for cond in self.conditional:
+            if _matches(cond.get("when", {}), ctx):
+                chance = cond["chance"]
+                hits = sum(1 for _ in range(n) if rand() < chance)
+                if hits:
+                    counts[cond["item"]] += hits
+
+        gold = 0
+        if self.gold_max:
+            lo, span = self.gold_min, self.gold_max - self.gold_min + 1
+            gold = sum(lo + int(rand() * span) for _ in range(n))
+        return gold, counts
+
+
+# ============================================================
+#  Registry
+# ============================================================
+LOOT_RNG = stream("loot")      # reseed via seed_loot() or core.rng.seed_all()
+
+_compiled = {}                 # enemy_type -> LootTable
+
+
+def seed_loot(seed):
+    LOOT_RNG.seed(seed)
+
+
+def get_loot_table(enemy_type):
+    """Return the compiled LootTable for an enemy type, or None."""
+    table = _compiled.get(enemy_type)
+    if table is None and enemy_type in LOOT_TABLES:
+        table = _compiled[enemy_type] = LootTable(LOOT_TABLES[enemy_type])
+    return table
+
+
+def roll_enemy_loot(enemy, ctx=None, rng=None):
+    """Roll loot for one killed enemy.
+
+    Enemy types without a table fall back to the template's fixed
+    gold_reward and drops list.
+    """
+    table = get_loot_table(enemy.enemy_type)
+    if table is None:
+        return LootResult(enemy.gold_reward, list(enemy.drops))
+    return table.roll(rng, ctx)
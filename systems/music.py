@@ -15,6 +15,7 @@
 import math
 import os
 import random as _rnd
+import threading
 import wave
 import array as _arr
 
@@ -44,6 +45,8 @@ ZONE_TRACKS = {
     "mount_doom":   "bgm_mordor",
 }
 
+_gen_lock = threading.Lock()   # scene prefetch may generate tracks off-thread
+
 _TRACK_FILES = {k: os.path.join(_ASSETS_DIR, f"{k}.wav") for k in [
     "bgm_shire", "bgm_elven", "bgm_wilderness",
     "bgm_moria", "bgm_rohan", "bgm_mordor", "bgm_combat",
@@ -200,11 +203,13 @@ def _compose_and_write(path, seq, bpm, harmonics, drone_specs,
         ap(max(-32767, min(32767, v)))
 
     os.makedirs(_ASSETS_DIR, exist_ok=True)
-    with wave.open(path, "w") as wf:
+    tmp = path + ".tmp"   # written aside so a half-done file is never loaded
+    with wave.open(tmp, "w") as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(_RATE)
         wf.writeframes(mixed.tobytes())
+    os.replace(tmp, path)
 
 
 # ── Individual track generators ────────────────────────────────────────────
@@ -367,8 +372,11 @@ class MusicManager:
         path = _TRACK_FILES.get(track_name)
         if not path:
             return
-        if os.path.exists(path):
-            return
+        with _gen_lock:
+            if not os.path.exists(path):
+                self._generate(track_name, path)
+
+    def _generate(self, track_name, path):
         try:
             from core.logger import get_logger
             get_logger("music").info("Generating %s …", track_name)
@@ -411,6 +419,11 @@ class MusicManager:
         self._zone_track = track
         self._switch_to(track)
 
+    def preload_zone(self, zone_id: str):
+        """Make sure the zone's track exists on disk (safe off the main thread)."""
+        if self._ready:
+            self._ensure_generated(ZONE_TRACKS.get(zone_id, "bgm_shire"))
+
     def play_combat(self):
         """Switch to the aggressive combat track."""
         self._switch_to("bgm_combat")
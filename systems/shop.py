@@ -17,22 +17,31 @@ class ShopManager:
         """
         self.shops[shop_id] = {
             "items": item_ids,
+            "listing": None,         # projected rows, built on first use
+            "listing_version": -1,   # ITEMS.version the listing was built from
         }
 
     def get_shop(self, shop_id):
         return self.shops.get(shop_id)
 
     def get_shop_items(self, shop_id):
-        """Get shop item list [{id, name, price, ...}]."""
+        """Get shop item list [{id, name, price, ...}].
+
+        The projection is built once and reused every frame until the item
+        database changes (e.g. a content pack is loaded); treat it as read-only.
+        """
         shop = self.shops.get(shop_id)
         if not shop:
             return []
-        result = []
-        for item_id in shop["items"]:
-            item_data = ITEMS.get(item_id)
-            if item_data:
-                result.append({"id": item_id, **item_data})
-        return result
+        if shop["listing_version"] != ITEMS.version:
+            result = []
+            for item_id in shop["items"]:
+                item_data = ITEMS.get(item_id)
+                if item_data:
+                    result.append({"id": item_id, **item_data})
+            shop["listing"] = result
+            shop["listing_version"] = ITEMS.version
+        return shop["listing"]
 
     def buy_item(self, shop_id, item_id, player):
         """Buy item; return (success, message)."""
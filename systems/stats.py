@@ -7,6 +7,11 @@ import math
 class Stats:
     """RPG stats: STR/DEX/INT/DEF + level/XP."""
 
+    __slots__ = (
+        "max_hp", "hp", "max_mp", "mp", "str", "dex", "int", "def_",
+        "level", "xp", "free_points", "version",
+    )
+
     def __init__(self, hp=50, mp=30, str_=3, dex=3, int_=3, def_=2, level=1):
         self.max_hp = hp
         self.hp = hp
@@ -21,10 +26,20 @@ class Stats:
         self.level = level
         self.xp = 0
         self.free_points = 0
+        self.version = 0     # bumped when attributes change (level-up, points)
+
+    @staticmethod
+    def level_xp(level):
+        """XP required to go from *level* to the next one."""
+        return int(100 * (1.5 ** (level - 1)))
 
     def xp_needed(self):
         """XP required to reach the next level."""
-        return int(100 * (1.5 ** (self.level - 1)))
+        return self.level_xp(self.level)
+
+    def total_xp(self):
+        """XP earned since level 1 (xp itself resets on every level-up)."""
+        return self.xp + sum(self.level_xp(lv) for lv in range(1, self.level))
 
     def add_xp(self, amount):
         """Add XP and auto-level up as needed."""
@@ -39,6 +54,8 @@ class Stats:
             self.hp = self.max_hp
             self.mp = self.max_mp
             leveled = True
+        if leveled:
+            self.version += 1
         return leveled
 
     def assign_point(self, stat_name):
@@ -56,6 +73,7 @@ class Stats:
         else:
             return False
         self.free_points -= 1
+        self.version += 1
         return True
 
     def take_damage(self, raw_damage):
@@ -79,3 +97,38 @@ class Stats:
     @property
     def alive(self):
         return self.hp > 0
+
+
+class DerivedStats:
+    """Effective attributes: base Stats + equipment totals + effect modifiers.
+
+    Recomputed only when one of the three sources reports a new version.
+    """
+
+    __slots__ = ("stats", "inventory", "effects", "_key", "_totals")
+
+    def __init__(self, stats, inventory, effects):
+        self.stats = stats
+        self.inventory = inventory
+        self.effects = effects
+        self._key = None
+        self._totals = {}
+
+    def totals(self):
+        """Return {"atk", "def_", "str", "dex", "int", "crit", "speed_mul"}."""
+        key = (self.stats.version, self.inventory.version, self.effects.version)
+        if key != self._key:
+            s = self.stats
+            eq = self.inventory.get_total_stats()
+            mods = self.effects.modifiers()
+            base = {"atk": 0, "def_": s.def_, "str": s.str, "dex": s.dex,
+                    "int": s.int, "crit": 0}
+            self._totals = {
+                k: v + eq.get(k, 0) + mods.get(k, 0) for k, v in base.items()
+            }
+            self._totals["speed_mul"] = mods["speed_mul"]
+            self._key = key
+        return self._totals
+
+    def get(self, name, default=0):
+        return self.totals().get(name, default)
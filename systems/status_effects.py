@@ -0,0 +1,124 @@
+# ============================================================
+#  Timed buffs / debuffs (poison, regen, haste)
+#
+#  Effects never scan per frame: applying one pushes its
+#  periodic ticks and its expiry onto a heap keyed by frame
+#  number, and update() only pops events that are due.
+# ============================================================
+import heapq
+
+# name → definition
+#   duration : frames the effect lasts
+#   period   : frames between HP ticks (0 = no ticks)
+#   hp       : HP change per tick (negative = damage)
+#   mods     : flat stat modifiers while active
+#   speed_mul: movement speed multiplier while active
+EFFECTS = {
+    "poison": {
+        "name_key": "effect_poison", "duration": 600, "period": 60,
+        "hp": -3, "mods": {}, "speed_mul": 1.0, "debuff": True,
+    },
+    "regen": {
+        "name_key": "effect_regen", "duration": 600, "period": 60,
+        "hp": 4, "mods": {}, "speed_mul": 1.0, "debuff": False,
+    },
+    "haste": {
+        "name_key": "effect_haste", "duration": 900, "period": 0,
+        "hp": 0, "mods": {"dex": 3}, "speed_mul": 1.4, "debuff": False,
+    },
+}
+
+_EV_TICK = 0
+_EV_EXPIRE = 1
+
+
+class StatusEffects:
+    """Active effects on one character plus their scheduled events."""
+
+    def __init__(self):
+        self.now = 0
+        self.active = {}        # name -> expiry frame
+        self.version = 0        # bumped whenever the set of effects changes
+        self._gen = {}          # name -> generation (stale heap events are skipped)
+        self._events = []       # heap of (frame, seq, kind, name, gen)
+        self._seq = 0
+        self._mods_cache = None
+
+    def _push(self, frame, kind, name):
+        self._seq += 1
+        heapq.heappush(self._events, (frame, self._seq, kind, name, self._gen[name]))
+
+    def apply(self, name, duration=None):
+        """Start (or refresh) an effect; return False for unknown names."""
+        data = EFFECTS.get(name)
+        if not data:
+            return False
+        duration = duration or data["duration"]
+        self._gen[name] = self._gen.get(name, 0) + 1   # invalidates old events
+        self.active[name] = self.now + duration
+        if data["period"]:
+            self._push(self.now + data["period"], _EV_TICK, name)
+        self._push(self.now + duration, _EV_EXPIRE, name)   # after a same-frame tick
+        self._changed()
+        return True
+
+    def remove(self, name):
+        if name not in self.active:
+            return False
+        del self.active[name]
+        self._gen[name] = self._gen.get(name, 0) + 1
+        self._changed()
+        return True
+
+    def clear(self):
+        for name in list(self.active):
+            self.remove(name)
+
+    def has(self, name):
+        return name in self.active
+
+    def remaining(self, name):
+        return max(0, self.active.get(name, self.now) - self.now)
+
+    def update(self, stats):
+        """Advance one frame; return names of effects that expired."""
+        self.now += 1
+        expired = []
+        events = self._events
+        while events and events[0][0] <= self.now:
+            _, _, kind, name, gen = heapq.heappop(events)
+            if gen != self._gen.get(name):
+                continue
+            data = EFFECTS[name]
+            if kind == _EV_TICK:
+                hp = data["hp"]
+                if hp > 0:
+                    stats.heal(hp)
+                elif hp < 0:
+                    # Damage-over-time never finishes the character off
+                    stats.hp = max(min(stats.hp, 1), stats.hp + hp)
+                if self.now + data["period"] <= self.active[name]:
+                    self._push(self.now + data["period"], _EV_TICK, name)
+            else:
+                self.remove(name)
+                expired.append(name)
+        return expired
+
+    def _changed(self):
+        self.version += 1
+        self._mods_cache = None
+
+    # ------------------------------------------------------------------
+    #  Aggregates (cached until the effect set changes)
+    # ------------------------------------------------------------------
+    def modifiers(self):
+        """Return {"stat": total, ..., "speed_mul": product} for active effects."""
+        if self._mods_cache is None:
+            mods = {"speed_mul": 1.0}
+            for name in self.active:
+                data = EFFECTS[name]
+                for stat, val in data["mods"].items():
+                    mods[stat] = mods.get(stat, 0) + val
+                mods["speed_mul"] *= data["speed_mul"]
+            self._mods_cache = mods
+        return self._mods_cache
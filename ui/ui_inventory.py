@@ -441,6 +441,6 @@ class InventoryUI:
         slot      = inv.items[idx]
         item_data = ITEMS.get(slot["id"], {})
         if item_data.get("type") == "consumable":
-            inv.use_item(slot["id"], player.stats)
+            inv.use_item(slot["id"], player.stats, player.effects)
         elif item_data.get("slot") in EQUIP_SLOTS:
             inv.equip(slot["id"])
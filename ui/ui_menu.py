@@ -10,6 +10,15 @@ from core.utils import draw_text, get_font, FONT_UI_SM, FONT_UI_MD, FONT_UI_LG
 
 _PAUSE_ITEMS = ["menu_resume", "menu_settings", "menu_main_menu"]
 
+SETTINGS_ROWS = 10  # resolution .. seamless world (see draw_settings)
+
+
+def _settings_layout(sh):
+    """(first row y, row height) of the settings list, shrunk to fit short windows."""
+    row_start = sh // 4 + 100
+    row_h = max(28, min(48, (sh - 60 - row_start) // SETTINGS_ROWS))
+    return row_start, row_h
+
 
 class MenuUI:
     def __init__(self):
@@ -82,15 +91,13 @@ class MenuUI:
         return -1
 
     def hittest_settings_row(self, pos) -> int:
-        """Settings: return row index 0-6 if clicked, else -1."""
+        """Settings: return row index 0..SETTINGS_ROWS-1 if clicked, else -1."""
         sw, sh = pygame.display.get_surface().get_size()
         cx = sw // 2
-        cy = sh // 4
-        row_start = cy + 100
-        row_h     = 48
+        row_start, row_h = _settings_layout(sh)
         box_x = cx - 260
         box_w = 520
-        for i in range(7):
+        for i in range(SETTINGS_ROWS):
             y = row_start + i * row_h
             if box_x <= pos[0] <= box_x + box_w and y - 8 <= pos[1] <= y + row_h - 8:
                 return i
@@ -224,6 +231,9 @@ class MenuUI:
             "settings_volume",
             "settings_fps",
             "settings_difficulty",
+            "settings_combat_speed",
+            "settings_auto_battle",
+            "settings_seamless_world",
         ]
 
         def get_value(idx):
@@ -240,11 +250,16 @@ class MenuUI:
                 return f"{int(settings_mgr.music_volume * 100)}%"
             elif idx == 5:
                 return t("settings_on") if settings_mgr.show_fps else t("settings_off")
-            else:
+            elif idx == 6:
                 return t(f"diff_{settings_mgr.difficulty}")
+            elif idx == 7:
+                return t(f"combat_speed_{settings_mgr.combat_speed}")
+            elif idx == 8:
+                return t("settings_on") if settings_mgr.auto_battle else t("settings_off")
+            else:
+                return t("settings_on") if settings_mgr.seamless_world else t("settings_off")
 
-        row_start = cy + 100
-        row_h     = 48
+        row_start, row_h = _settings_layout(sh)
         box_pad   = 16
 
         box_rect = pygame.Rect(
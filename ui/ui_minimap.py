@@ -5,34 +5,66 @@ import pygame
 from world.iso_map import TILE_COLORS
 from core.utils import get_font, FONT_UI_SM
 
-TILE_PX = 2        # screen pixels per map tile
+TILE_PX = 2        # screen pixels per map tile (small maps)
+MAX_PX  = 160      # larger maps are scaled down to fit this many pixels
 BORDER  = 2        # frame border width
 PAD     = 8        # distance from screen edge
 
+# tile id -> minimap colour, as an 8-bit surface palette
+_PALETTE = [TILE_COLORS.get(i) or (15, 15, 15) for i in range(256)]
+
 
 class MinimapUI:
     def __init__(self):
         self.visible = True
-        self._map_surf = None   # pre-rendered tile colors (rebuilt on load)
+        self._map = None        # IsoMap shown (its tile changes repaint the minimap)
+        self._raw = None        # one palette pixel per tile
+        self._map_surf = None   # _raw scaled to the minimap size
+        self._scale = TILE_PX   # minimap pixels per map tile
 
     # ------------------------------------------------------------------
     #  Build (call once after the map loads)
     # ------------------------------------------------------------------
-    def build(self, iso_map):
-        """Pre-render all tile colours into a static surface."""
-        w = iso_map.cols * TILE_PX
-        h = iso_map.rows * TILE_PX
-        surf = pygame.Surface((w, h))
-        surf.fill((15, 15, 15))
-        for row in range(iso_map.rows):
-            for col in range(iso_map.cols):
-                color = TILE_COLORS.get(iso_map.grid[row][col])
-                if color:
-                    surf.set_at((col * TILE_PX,     row * TILE_PX),     color)
-                    surf.set_at((col * TILE_PX + 1, row * TILE_PX),     color)
-                    surf.set_at((col * TILE_PX,     row * TILE_PX + 1), color)
-                    surf.set_at((col * TILE_PX + 1, row * TILE_PX + 1), color)
-        self._map_surf = surf
+    def build(self, iso_map, baked=None):
+        """Pre-render all tile colours into a static surface.
+
+        *baked* is a render() result made ahead of time (scene prefetch);
+        it is used as-is unless the map changed since.
+        """
+        if baked is None or baked[0] != iso_map.revision:
+            baked = self.render(iso_map)
+        _, self._raw, self._map_surf, self._scale = baked
+        if self._map is not None:
+            self._map.unsubscribe(self._on_tiles_changed)
+        self._map = iso_map
+        iso_map.subscribe(self._on_tiles_changed)
+
+    @staticmethod
+    def _palette_image(tiles, size):
+        image = pygame.image.frombuffer(bytearray(tiles), size, "P")
+        image.set_palette(_PALETTE)
+        return image
+
+    @staticmethod
+    def render(iso_map):
+        """(revision, raw, surface, scale) for *iso_map*; touches no UI state.
+
+        The tile bytes are used directly as palette indices, then the
+        one-pixel-per-tile image is scaled to the minimap size.
+        """
+        revision = iso_map.revision
+        cols, rows = iso_map.cols, iso_map.rows
+        scale = min(TILE_PX, MAX_PX / max(cols, rows))
+        raw = MinimapUI._palette_image(iso_map.tiles, (cols, rows))
+        size = (max(1, round(cols * scale)), max(1, round(rows * scale)))
+        return revision, raw, pygame.transform.scale(raw, size), scale
+
+    def _on_tiles_changed(self, iso_map, rects):
+        """IsoMap subscriber: repaint only the changed tiles, then rescale."""
+        for c1, r1, c2, r2 in rects:
+            patch = self._palette_image(iso_map.region(c1, r1, c2, r2), (c2 - c1, r2 - r1))
+            self._raw.blit(patch, (c1, r1))
+        self._map_surf = pygame.transform.scale(self._raw, self._map_surf.get_size())
 
     def toggle(self):
         self.visible = not self.visible
@@ -68,24 +100,25 @@ class MinimapUI:
         surface.blit(self._map_surf, (mx, my))
 
         # Enemy dots (red)
+        k = self._scale
         for e in entities.enemies:
             if e.active:
-                ex = int(e.wx) * TILE_PX
-                ey = int(e.wy) * TILE_PX
+                ex = int(int(e.wx) * k)
+                ey = int(int(e.wy) * k)
                 pygame.draw.rect(surface, (220, 60, 60),
                                  (mx + ex, my + ey, TILE_PX, TILE_PX))
 
         # NPC dots (yellow)
         for n in entities.npcs:
             if n.active:
-                nx = int(n.wx) * TILE_PX
-                ny = int(n.wy) * TILE_PX
+                nx = int(int(n.wx) * k)
+                ny = int(int(n.wy) * k)
                 pygame.draw.rect(surface, (220, 200, 60),
                                  (mx + nx, my + ny, TILE_PX, TILE_PX))
 
         # Player dot (white, 1px larger for visibility)
-        px = int(player.wx) * TILE_PX
-        py = int(player.wy) * TILE_PX
+        px = int(int(player.wx) * k)
+        py = int(int(player.wy) * k)
         pygame.draw.rect(surface, (255, 255, 255),
                          (mx + px - 1, my + py - 1, TILE_PX + 2, TILE_PX + 2))
 
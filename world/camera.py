@@ -25,6 +25,12 @@ class Camera:
         sx, sy = world_to_screen(wx, wy)
         return sx - self.offset_x, sy - self.offset_y
 
+    def is_visible(self, wx, wy, margin=0):
+        """True if the world point falls inside the view (grown by margin px)."""
+        cx, cy = self.world_to_cam(wx, wy)
+        return (-margin <= cx <= INTERNAL_WIDTH + margin
+                and -margin <= cy <= INTERNAL_HEIGHT + margin)
+
     def snap(self, target_wx, target_wy):
         """Instantly snap to target position (no smoothing)."""
         sx, sy = world_to_screen(target_wx, target_wy)
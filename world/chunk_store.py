@@ -0,0 +1,385 @@
+# ============================================================
+#  Chunked world files: out-of-core tile storage through mmap
+#
+#  A map is cut into CHUNK_SIZE x CHUNK_SIZE tile chunks.  The
+#  file is memory-mapped read-only, so only the chunks that are
+#  actually read (normally the ones near the camera) are paged
+#  in; ChunkedIsoMap reads through it as a regular IsoMap.
+#
+#  Nothing in the game loads .mck files yet: the scene pipeline
+#  (nav fields, influence maps, pathfinding, snapshots) assumes
+#  a whole in-memory map.  The format is produced by the export
+#  below and read by tools that only need nearby tiles.
+#
+#  File layout (little-endian):
+#    header   "MECK" u16 version u16 chunk_size u32 cols u32 rows
+#    index    per chunk, row-major over the chunk grid:
+#             u64 tiles_offset u64 spawns_offset u32 spawns_len
+#    tiles    chunk_size² tile ids per stored chunk, row-major inside
+#             the chunk (edge chunks padded with TILE_EMPTY); chunks
+#             with identical contents share one block
+#    spawns   per chunk, UTF-8 JSON list of spawn descriptors
+#             ({"kind": "enemy", "type": ..., "wx": ..., "wy": ...})
+#
+#    python -m world.chunk_store OUT_DIR   # export the demo zones
+# ============================================================
+import json
+import mmap
+import os
+import struct
+from collections import OrderedDict, deque
+from core.settings import CHUNK_SIZE, CHUNK_CACHE_MAX, TILE_JOURNAL_MAX
+from core.logger import get_logger
+from world.iso_map import IsoMap, WALKABLE_LUT, TILE_WALL
+from assets.sprite_manager import load_tile_sprites
+
+log = get_logger("chunk_store")
+
+CHUNK_MAGIC = b"MECK"
+CHUNK_VERSION = 1
+
+_HEADER = struct.Struct("<4sHHII")
+_INDEX = struct.Struct("<QQI")
+
+CHUNK_EXT = ".mck"
+
+
+def _chunk_grid(cols, rows, cs):
+    return -(-cols // cs), -(-rows // cs)
+
+
+# ============================================================
+#  Writer
+# ============================================================
+def write_chunk_file(path, iso_map, spawns=(), chunk_size=CHUNK_SIZE):
+    """Write *iso_map* (any IsoMap) and its spawn descriptors as a chunk file."""
+    cs = chunk_size
+    cols, rows = iso_map.cols, iso_map.rows
+    ccols, crows = _chunk_grid(cols, rows, cs)
+
+    per_chunk = [[] for _ in range(ccols * crows)]
+    for spawn in spawns:
+        cx = min(max(int(spawn["wx"]) // cs, 0), ccols - 1)
+        cy = min(max(int(spawn["wy"]) // cs, 0), crows - 1)
+        per_chunk[cy * ccols + cx].append(spawn)
+
+    data_start = _HEADER.size + _INDEX.size * len(per_chunk)
+    blocks = {}                # chunk bytes -> offset (dedup)
+    tiles_out = bytearray()
+    tile_offsets = []
+    for cy in range(crows):
+        for cx in range(ccols):
+            c1, r1 = cx * cs, cy * cs
+            c2 = min(c1 + cs, cols)
+            block = bytearray(cs * cs)
+            for r in range(r1, min(r1 + cs, rows)):
+                at = (r - r1) * cs
+                block[at:at + c2 - c1] = iso_map.region(c1, r, c2, r + 1)
+            block = bytes(block)
+            off = blocks.get(block)
+            if off is None:
+                off = blocks[block] = data_start + len(tiles_out)
+                tiles_out += block
+            tile_offsets.append(off)
+
+    spawns_out = bytearray()
+    index = bytearray()
+    spawn_start = data_start + len(tiles_out)
+    for off, chunk_spawns in zip(tile_offsets, per_chunk):
+        raw = json.dumps(chunk_spawns, separators=(",", ":")).encode("utf-8") \
+            if chunk_spawns else b""
+        index += _INDEX.pack(off, spawn_start + len(spawns_out), len(raw))
+        spawns_out += raw
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(CHUNK_MAGIC, CHUNK_VERSION, cs, cols, rows))
+        f.write(index)
+        f.write(tiles_out)
+        f.write(spawns_out)
+    log.info("Chunk file written: %s (%dx%d, %d chunks, %d stored)",
+             path, cols, rows, len(per_chunk), len(blocks))
+
+
+# ============================================================
+#  Reader
+# ============================================================
+class ChunkFile:
+    """Read-only, memory-mapped view of a chunk file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, cs, cols, rows = _HEADER.unpack_from(self._mm, 0)
+        if magic != CHUNK_MAGIC or version != CHUNK_VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a version {CHUNK_VERSION} chunk file")
+        self.chunk_size = cs
+        self.cols, self.rows = cols, rows
+        self.chunk_cols, self.chunk_rows = _chunk_grid(cols, rows, cs)
+        n = self.chunk_cols * self.chunk_rows
+        self._index = list(_INDEX.iter_unpack(
+            self._mm[_HEADER.size:_HEADER.size + _INDEX.size * n]))
+        self._spawns = {}      # chunk index -> decoded spawn list
+
+    def chunk_index(self, col, row):
+        cs = self.chunk_size
+        return (row // cs) * self.chunk_cols + col // cs
+
+    def tile(self, ci, i):
+        """Tile id at offset *i* inside chunk *ci*."""
+        return self._mm[self._index[ci][0] + i]
+
+    def read(self, ci, start, stop):
+        """Bytes [start, stop) of chunk *ci*'s tile block."""
+        off = self._index[ci][0]
+        return self._mm[off + start:off + stop]
+
+    def spawns(self, ci):
+        cached = self._spawns.get(ci)
+        if cached is None:
+            _, off, n = self._index[ci]
+            cached = self._spawns[ci] = json.loads(self._mm[off:off + n]) if n else []
+        return cached
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+#  IsoMap over a chunk file
+# ============================================================
+class ChunkedIsoMap(IsoMap):
+    """IsoMap whose tiles are read on demand from a ChunkFile.
+
+    The file is never written: the first edit inside a chunk copies
+    that chunk into memory.  Walkability bitmaps are derived per chunk
+    and kept in a small LRU, and collision uses the exact disc test
+    instead of a map-wide NavField.
+    """
+
+    def __init__(self, store):
+        if isinstance(store, (str, os.PathLike)):
+            store = ChunkFile(store)
+        self.store = store
+        self.cols, self.rows = store.cols, store.rows
+        self.chunk_size = store.chunk_size
+        self.tile_sprites = load_tile_sprites()
+        self._nav = None
+        self._los_cache = {}
+        self.revision = 0
+        self.journal = deque(maxlen=TILE_JOURNAL_MAX)
+        self._dirty = {}             # dirty regions per storage chunk
+        self._subscribers = []
+        self._owned = {}             # chunk index -> bytearray (edited chunks)
+        self._walk = OrderedDict()   # chunk index -> walkability bytes (LRU)
+
+    def close(self):
+        self.store.close()
+
+    # ── No map-wide NavField: it would read every chunk and copy the map ──
+
+    @property
+    def nav(self):
+        raise NotImplementedError("ChunkedIsoMap has no NavField; use can_occupy / "
+                                  "nearest_walkable, which read only nearby chunks")
+
+    def bake_nav(self):
+        return self.nav
+
+    def install_nav(self, baked):
+        return self.nav
+
+    # ── Chunk access ───────────────────────────────────────────────────────
+
+    def _read(self, ci, start, stop):
+        own = self._owned.get(ci)
+        if own is not None:
+            return own[start:stop]
+        return self.store.read(ci, start, stop)
+
+    def _chunk_walk(self, ci):
+        walk = self._walk.get(ci)
+        if walk is not None:
+            self._walk.move_to_end(ci)
+            return walk
+        cs = self.chunk_size
+        walk = self._walk[ci] = bytes(self._read(ci, 0, cs * cs)).translate(WALKABLE_LUT)
+        if len(self._walk) > CHUNK_CACHE_MAX:
+            self._walk.popitem(last=False)
+        return walk
+
+    def _own(self, ci):
+        own = self._owned.get(ci)
+        if own is None:
+            cs = self.chunk_size
+            own = self._owned[ci] = bytearray(self.store.read(ci, 0, cs * cs))
+        return own
+
+    def _spans(self, row, c1, c2):
+        """(chunk index, start, stop) pieces of columns [c1, c2) of *row*."""
+        cs = self.chunk_size
+        base_ci = (row // cs) * self.store.chunk_cols
+        at = (row % cs) * cs
+        c = c1
+        while c < c2:
+            end = min(c2, (c // cs + 1) * cs)
+            yield base_ci + c // cs, at + c % cs, at + c % cs + end - c
+            c = end
+
+    # ── IsoMap storage primitives ──────────────────────────────────────────
+
+    @property
+    def tiles(self):
+        """Row-major copy of the whole map (materializes every chunk)."""
+        return self.region(0, 0, self.cols, self.rows)
+
+    @property
+    def walkable(self):
+        """Row-major walkability copy of the whole map (materializes every chunk)."""
+        return self.tiles.translate(WALKABLE_LUT)
+
+    def _row(self, row, c1, c2):
+        return b"".join(self._read(ci, a, b) for ci, a, b in self._spans(row, c1, c2))
+
+    def _walk_row(self, row, c1, c2):
+        return b"".join(self._chunk_walk(ci)[a:b] for ci, a, b in self._spans(row, c1, c2))
+
+    def get_tile(self, col, row):
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            cs = self.chunk_size
+            ci = self.store.chunk_index(col, row)
+            i = (row % cs) * cs + col % cs
+            own = self._owned.get(ci)
+            return own[i] if own is not None else self.store.tile(ci, i)
+        return TILE_WALL
+
+    def set_tile(self, col, row, tile_id):
+        if 0 <= col < self.cols and 0 <= row < self.rows and self.get_tile(col, row) != tile_id:
+            cs = self.chunk_size
+            ci = self.store.chunk_index(col, row)
+            self._own(ci)[(row % cs) * cs + col % cs] = tile_id
+            self._walk.pop(ci, None)
+            self._changed(col, row, col + 1, row + 1)
+
+    def set_tiles(self, data):
+        if len(data) != self.cols * self.rows:
+            raise ValueError(f"expected {self.cols * self.rows} tiles, got {len(data)}")
+        for row in range(self.rows):
+            base = row * self.cols
+            self._write_row(row, 0, data[base:base + self.cols])
+
+    def fill_rect(self, c1, r1, c2, r2, tile_id):
+        c1, r1, c2, r2 = self._clip(c1, r1, c2, r2)
+        if c1 >= c2:
+            return
+        run = bytes([tile_id]) * (c2 - c1)
+        for row in range(r1, r2):
+            self._write_row(row, c1, run)
+
+    def _write_row(self, row, c1, data):
+        changed = False
+        pos = 0
+        for ci, a, b in self._spans(row, c1, c1 + len(data)):
+            piece = data[pos:pos + b - a]
+            pos += b - a
+            if self._read(ci, a, b) != piece:
+                self._own(ci)[a:b] = piece
+                self._walk.pop(ci, None)
+                changed = True
+        if changed:
+            self._changed(c1, row, c1 + len(data), row + 1)
+
+    def is_walkable(self, wx, wy):
+        col, row = int(wx), int(wy)
+        if col < 0 or col >= self.cols or row < 0 or row >= self.rows:
+            return False
+        cs = self.chunk_size
+        return self._chunk_walk(self.store.chunk_index(col, row))[
+            (row % cs) * cs + col % cs] == 1
+
+    def as_numpy(self):
+        import numpy as np
+        return np.frombuffer(self.tiles, dtype=np.uint8).reshape(self.rows, self.cols)
+
+    # ── Collision without a map-wide NavField ──────────────────────────────
+
+    def can_occupy(self, wx, wy, radius=0.0):
+        if not self.is_walkable(wx, wy):
+            return False
+        return radius <= 0.0 or self._disc_clear(wx, wy, radius)
+
+    def nearest_walkable(self, wx, wy, radius=0.0):
+        """Like IsoMap.nearest_walkable, via a ring search around the tile."""
+        if self.can_occupy(wx, wy, radius):
+            return (float(wx), float(wy))
+        col = min(max(int(wx), 0), self.cols - 1)
+        row = min(max(int(wy), 0), self.rows - 1)
+        for d in range(1, max(self.cols, self.rows)):
+            for r in range(row - d, row + d + 1):
+                step = 1 if r in (row - d, row + d) else 2 * d
+                for c in range(col - d, col + d + 1, step):
+                    if self.is_walkable(c + 0.5, r + 0.5):
+                        return (c + 0.5, r + 0.5)
+        return (float(wx), float(wy))
+
+    # ── Spawns ─────────────────────────────────────────────────────────────
+
+    def spawns_in(self, c1, r1, c2, r2):
+        """Spawn descriptors whose position lies in [c1, c2) x [r1, r2)."""
+        c1, r1, c2, r2 = self._clip(c1, r1, c2, r2)
+        if c1 >= c2 or r1 >= r2:
+            return []
+        store, cs = self.store, self.chunk_size
+        out = []
+        for cy in range(r1 // cs, (r2 - 1) // cs + 1):
+            for cx in range(c1 // cs, (c2 - 1) // cs + 1):
+                for s in store.spawns(cy * store.chunk_cols + cx):
+                    if c1 <= s["wx"] < c2 and r1 <= s["wy"] < r2:
+                        out.append(s)
+        return out
+
+    def resident_chunks(self):
+        """Chunk indices currently held in memory (edited or cached bitmaps)."""
+        return set(self._owned) | set(self._walk)
+
+
+# ============================================================
+#  Demo level export
+# ============================================================
+def scene_spawns(scene):
+    """Spawn descriptors for a built scene's enemies and NPCs."""
+    spawns = [{"kind": "enemy", "type": e.enemy_type, "wx": e.wx, "wy": e.wy}
+              for e in scene["enemies"]]
+    spawns += [{"kind": "npc", "name": n.name, "wx": n.wx, "wy": n.wy}
+               for n in scene["npcs"]]
+    return spawns
+
+
+def export_demo_level(out_dir, chunk_size=CHUNK_SIZE):
+    """Write every demo zone as OUT_DIR/<zone_id>.mck; returns the paths."""
+    from world.demo_level import build_demo_level
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for zone_id, scene in build_demo_level()["scene_mgr"].build_all().items():
+        path = os.path.join(out_dir, zone_id + CHUNK_EXT)
+        write_chunk_file(path, scene["iso_map"], scene_spawns(scene), chunk_size)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m world.chunk_store OUT_DIR")
+    for p in export_demo_level(sys.argv[1]):
+        print(p, os.path.getsize(p), "bytes")
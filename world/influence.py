@@ -0,0 +1,191 @@
+# ============================================================
+#  Influence maps: per-scene threat / density / danger layers
+#
+#  Small float32 grids over a scene, one cell per INFLUENCE_CELL ×
+#  INFLUENCE_CELL tiles, shared by every enemy in it:
+#
+#   threat   where the player is, and recently was
+#   density  how crowded an area is with enemies
+#   danger   enemy territory around the spawner's home points
+#
+#  Each tick one layer (round-robin) stamps its sources and relaxes
+#  one step: a cell moves by MOMENTUM towards its strongest
+#  neighbour times the layer's decay and the link's conductance —
+#  the share of tile pairs across the shared cell border that are
+#  walkable on both sides — so influence flows around walls and
+#  thins through chokepoints.  The step is incremental: values
+#  under INFLUENCE_EPSILON snap to 0, and only live (non-zero)
+#  cells, this tick's stamps and their neighbours are visited, so
+#  a tick costs O(live cells × 8), at most one plain sweep of
+#  the grid (taken instead once half of it is live); idle layers
+#  and quiet neighbour zones (seamless mode) cost nothing.  Conductances
+#  are recomputed only around changed tiles (IsoMap flush
+#  subscription).  AI reads cells in O(1) (entities/enemy.py):
+#  wanderers climb the density gradient to group up, chasers
+#  flank around dense cells, and wounded enemies retreat down
+#  threat and up danger.
+# ============================================================
+from array import array
+from core.settings import (
+    INFLUENCE_CELL, INFLUENCE_MOMENTUM, INFLUENCE_THREAT_DECAY,
+    INFLUENCE_DENSITY_DECAY, INFLUENCE_DANGER_DECAY, INFLUENCE_DENSITY_FULL,
+    INFLUENCE_EPSILON,
+)
+
+LAYERS = ("threat", "density", "danger")
+_DECAY = {"threat": INFLUENCE_THREAT_DECAY, "density": INFLUENCE_DENSITY_DECAY,
+          "danger": INFLUENCE_DANGER_DECAY}
+
+
+class InfluenceMaps:
+    """The three influence layers of one scene (see module header)."""
+
+    def __init__(self, iso_map, spawner=None, cell=INFLUENCE_CELL):
+        self.iso_map = iso_map
+        self.spawner = spawner
+        self.cell = cell
+        self.cols = (iso_map.cols + cell - 1) // cell
+        self.rows = (iso_map.rows + cell - 1) // cell
+        self._links = [[] for _ in range(self.cols * self.rows)]   # cell -> [(cell, conductance)]
+        self.reset()
+        self._relink(0, 0, iso_map.cols, iso_map.rows)
+        iso_map.subscribe(self._on_tiles_changed)
+
+    @classmethod
+    def for_scene(cls, scene):
+        """The scene's influence maps, created on first use."""
+        maps = scene.get("influence")
+        if maps is None:
+            maps = scene["influence"] = cls(scene["iso_map"], scene.get("spawner"))
+        return maps
+
+    # ------------------------------------------------------------------
+    #  Walkability
+    # ------------------------------------------------------------------
+    def _relink(self, c1, r1, c2, r2):
+        """Recompute the links of every cell whose border tiles lie in a tile rect."""
+        cs = self.cell
+        for cy in range(max(0, (r1 - 1) // cs), min(self.rows, r2 // cs + 1)):
+            for cx in range(max(0, (c1 - 1) // cs), min(self.cols, c2 // cs + 1)):
+                self._links[cy * self.cols + cx] = self._cell_links(cx, cy)
+
+    def _cell_links(self, cx, cy):
+        m, cs = self.iso_map, self.cell
+        cols, walk = m.cols, m.walkable
+        x1, y1 = cx * cs, cy * cs
+        x2, y2 = min(m.cols, x1 + cs) - 1, min(m.rows, y1 + cs) - 1   # inclusive
+        links = []
+        for ny in range(max(0, cy - 1), min(self.rows, cy + 2)):
+            for nx in range(max(0, cx - 1), min(self.cols, cx + 2)):
+                dx, dy = nx - cx, ny - cy
+                if dx and dy:   # through the shared corner, without cutting it
+                    ax, ay = (x2 if dx > 0 else x1), (y2 if dy > 0 else y1)
+                    bx, by = ax + dx, ay + dy
+                    g = float(walk[ay * cols + ax] and walk[by * cols + bx]
+                              and (walk[ay * cols + bx] or walk[by * cols + ax]))
+                elif dx:
+                    ax = x2 if dx > 0 else x1
+                    g = sum(1 for y in range(y1, y2 + 1)
+                            if walk[y * cols + ax] and walk[y * cols + ax + dx]) / (y2 - y1 + 1)
+                elif dy:
+                    ay = y2 if dy > 0 else y1
+                    g = sum(1 for x in range(x1, x2 + 1)
+                            if walk[ay * cols + x] and walk[(ay + dy) * cols + x]) / (x2 - x1 + 1)
+                else:
+                    continue
+                if g:
+                    links.append((ny * self.cols + nx, g))
+        return links
+
+    def _on_tiles_changed(self, iso_map, rects):
+        for c1, r1, c2, r2 in rects:
+            self._relink(c1, r1, c2, r2)
+
+    # ------------------------------------------------------------------
+    #  Update (one layer per tick)
+    # ------------------------------------------------------------------
+    def _stamps(self, name, entities):
+        """cell -> source strength of layer *name* this tick."""
+        out = {}
+        if name == "threat":
+            # the player may stand outside this map (seamless neighbour frame)
+            p = entities.player
+            if p and p.active and p.stats.alive and self.iso_map.is_in_bounds(p.wx, p.wy):
+                out[self._index(p.wx, p.wy)] = 1.0
+        elif name == "density":
+            step = 1.0 / INFLUENCE_DENSITY_FULL
+            for e in entities.enemies:
+                if e.active and e.stats.alive:
+                    i = self._index(e.wx, e.wy)
+                    out[i] = min(1.0, out.get(i, 0.0) + step)
+        elif self.spawner:
+            for slot in self.spawner.slots:
+                out[self._index(slot.wx, slot.wy)] = 1.0
+        return out
+
+    def update(self, entities):
+        """Stamp and relax the next layer in turn (call once per tick)."""
+        name = LAYERS[self.tick % len(LAYERS)]
+        self.tick += 1
+        values, live = self.layers[name], self._live[name]
+        stamps = self._stamps(name, entities)
+        if not stamps and not live:
+            return
+        links = self._links
+        if 2 * (len(live) + len(stamps)) >= len(links):
+            todo = range(len(links))
+        else:
+            todo = live.union(stamps)
+            for i in list(todo):   # links are symmetric: i's links reach every cell i feeds
+                todo.update(j for j, _ in links[i])
+        decay = _DECAY[name]
+        new = {}
+        for i in todo:
+            best = 0.0
+            for j, g in links[i]:
+                v = values[j] * g
+                if v > best:
+                    best = v
+            target = max(best * decay, stamps.get(i, 0.0))
+            new[i] = values[i] + (target - values[i]) * INFLUENCE_MOMENTUM
+        for i, v in new.items():
+            if v < INFLUENCE_EPSILON:
+                values[i] = 0.0
+                live.discard(i)
+            else:
+                values[i] = v
+                live.add(i)
+
+    # ------------------------------------------------------------------
+    #  Queries (O(1))
+    # ------------------------------------------------------------------
+    def _index(self, wx, wy):
+        cx = min(max(int(wx) // self.cell, 0), self.cols - 1)
+        cy = min(max(int(wy) // self.cell, 0), self.rows - 1)
+        return cy * self.cols + cx
+
+    def sample(self, name, wx, wy):
+        """Layer value at a world position (clamped to the grid)."""
+        return self.layers[name][self._index(wx, wy)]
+
+    def gradient(self, name, wx, wy):
+        """(dx, dy) towards rising values around a world position, unnormalized."""
+        v, cs = self.layers[name], self.cell
+        return (v[self._index(wx + cs, wy)] - v[self._index(wx - cs, wy)],
+                v[self._index(wx, wy + cs)] - v[self._index(wx, wy - cs)])
+
+    # ------------------------------------------------------------------
+    #  Snapshots
+    # ------------------------------------------------------------------
+    def state(self):
+        return {"tick": self.tick, "layers": {k: v.tobytes() for k, v in self.layers.items()}}
+
+    def restore(self, state):
+        self.tick = state["tick"]
+        self.layers = {k: array("f", v) for k, v in state["layers"].items()}
+        self._live = {k: {i for i, x in enumerate(v) if x} for k, v in self.layers.items()}
+
+    def reset(self):
+        self.tick = 0
+        self.layers = {name: array("f", bytes(4 * len(self._links))) for name in LAYERS}
+        self._live = {name: set() for name in LAYERS}   # cells with a non-zero value
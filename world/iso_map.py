@@ -1,9 +1,24 @@
 # ============================================================
 #  Isometric tile map: coordinate transforms, collision, diamond rendering
+#
+#  Tiles live in one flat row-major bytearray (index = row * cols
+#  + col) next to a 0/1 walkability bitmap of the same layout, so
+#  bulk fills are slice assignments and region queries run in C
+#  (bytearray.count / translate) instead of per-tile Python calls.
+#
+#  Every write is journaled and marks the chunks it touched dirty.
+#  flush() hands the dirty regions to the derived data: the nav
+#  field is repaired in place, line-of-sight results crossing the
+#  region are dropped, and subscribers (minimap, path caches)
+#  re-derive just those tiles — so gates, bridges and destructible
+#  walls can change at runtime without full rebuilds.
 # ============================================================
+import math
+from collections import deque
 import pygame
 from core.settings import (
     HALF_W, HALF_H, TILE_W, TILE_H, MAP_COLS, MAP_ROWS,
+    TILE_DIRTY_CHUNK, TILE_JOURNAL_MAX,
     INTERNAL_WIDTH, INTERNAL_HEIGHT,
     COLOR_GRASS, COLOR_GRASS_DARK, COLOR_DIRT, COLOR_STONE, COLOR_STONE_DARK,
     COLOR_WATER, COLOR_WATER_DEEP, COLOR_SAND, COLOR_BRIDGE,
@@ -12,6 +27,7 @@ from core.settings import (
 )
 from core.utils import world_to_screen
 from assets.sprite_manager import load_tile_sprites
+from world.nav_field import NavField
 
 # Tile types
 TILE_EMPTY = 0
@@ -32,6 +48,16 @@ TILE_FENCE = 14
 TILE_HOUSE_WALL = 15   # tall warm-stone wall with window slots
 TILE_ROOF = 16         # terracotta roof interior (wall fill + pyramid)
 
+# Tile names used by level files (data/levels/*.json)
+TILE_NAMES = {
+    "empty": TILE_EMPTY, "grass": TILE_GRASS, "grass2": TILE_GRASS2,
+    "dirt": TILE_DIRT, "stone": TILE_STONE, "stone2": TILE_STONE2,
+    "water": TILE_WATER, "water2": TILE_WATER2, "sand": TILE_SAND,
+    "bridge": TILE_BRIDGE, "tree": TILE_TREE, "wall": TILE_WALL,
+    "cave": TILE_CAVE, "cliff": TILE_CLIFF, "fence": TILE_FENCE,
+    "house_wall": TILE_HOUSE_WALL, "roof": TILE_ROOF,
+}
+
 # Tile color mapping
 TILE_COLORS = {
     TILE_EMPTY:      None,
@@ -59,27 +85,221 @@ SOLID_TILES = {
     TILE_CLIFF, TILE_FENCE, TILE_HOUSE_WALL, TILE_ROOF,
 }
 
+# Tiles that block line of sight (water and low fences can be seen across)
+OPAQUE_TILES = SOLID_TILES - {TILE_WATER, TILE_WATER2, TILE_FENCE}
+
+LOS_CACHE_MAX = 8192   # cached (from_tile, to_tile) pairs per scene
+
+# tile id -> 1 if walkable (bytes.translate table for the walkability bitmap)
+WALKABLE_LUT = bytes(0 if i in SOLID_TILES else 1 for i in range(256))
+
 
 class IsoMap:
+    # callback(col, row) -> tile id for off-map tiles in line-of-sight
+    # traces (set by seamless zone frames); None = wall
+    outside = None
+
     def __init__(self, cols=MAP_COLS, rows=MAP_ROWS):
         self.cols = cols
         self.rows = rows
-        self.grid = [[TILE_GRASS for _ in range(cols)] for _ in range(rows)]
+        self.tiles = bytearray([TILE_GRASS]) * (cols * rows)   # row-major tile ids
+        self.walkable = self.tiles.translate(WALKABLE_LUT)     # 1 = walkable
         self.tile_sprites = load_tile_sprites()  # None if no assets
+        self._nav = None   # NavField, built lazily and dropped on mutation
+        self._los_cache = {}   # (from_idx, to_idx) -> bool
+        self.revision = 0      # bumped on every tile change
+        self.chunk_size = TILE_DIRTY_CHUNK
+        self.journal = deque(maxlen=TILE_JOURNAL_MAX)   # (revision, c1, r1, c2, r2)
+        self._dirty = {}        # chunk index -> [c1, r1, c2, r2] written since flush()
+        self._subscribers = []  # callback(iso_map, rects), called by flush()
+
+    # ── Change tracking ────────────────────────────────────────────────────
+
+    def _changed(self, c1, r1, c2, r2):
+        """Record a write to [c1, c2) x [r1, r2)."""
+        self.revision += 1
+        self.journal.append((self.revision, c1, r1, c2, r2))
+        cs = self.chunk_size
+        chunk_cols = (self.cols + cs - 1) // cs
+        for cy in range(r1 // cs, (r2 - 1) // cs + 1):
+            for cx in range(c1 // cs, (c2 - 1) // cs + 1):
+                a, b = max(c1, cx * cs), max(r1, cy * cs)
+                c, d = min(c2, (cx + 1) * cs), min(r2, (cy + 1) * cs)
+                box = self._dirty.get(cy * chunk_cols + cx)
+                if box is None:
+                    self._dirty[cy * chunk_cols + cx] = [a, b, c, d]
+                else:
+                    box[0], box[1] = min(box[0], a), min(box[1], b)
+                    box[2], box[3] = max(box[2], c), max(box[3], d)
+
+    def subscribe(self, callback):
+        """Have flush() call callback(iso_map, rects) after tiles change."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def flush(self):
+        """Propagate the writes since the last flush; returns the dirty rects.
+
+        One (c1, r1, c2, r2) rect per touched chunk, bounding the tiles
+        written in it.  Runs by itself before the nav field or the LOS
+        cache is read, and once per frame from the game loop.
+        """
+        if not self._dirty:
+            return []
+        rects = [tuple(box) for _, box in sorted(self._dirty.items())]
+        self._dirty.clear()
+        if self._nav is not None:
+            if 2 * sum((c2 - c1) * (r2 - r1) for c1, r1, c2, r2 in rects) > self.cols * self.rows:
+                self._nav = None   # mostly rewritten: rebuild on next use
+            else:
+                self._nav.repair(self, rects)
+        self._forget_los(rects)
+        for callback in list(self._subscribers):
+            callback(self, rects)
+        return rects
+
+    def changes_since(self, revision):
+        """Rects written after *revision*, or None once the journal no longer reaches it."""
+        if revision == self.revision:
+            return []
+        if not self.journal or self.journal[0][0] > revision + 1:
+            return None
+        return [entry[1:] for entry in self.journal if entry[0] > revision]
+
+    def _forget_los(self, rects):
+        """Drop cached sight lines whose tile span overlaps any of *rects*."""
+        cols = self.cols
+        stale = []
+        for a, b in self._los_cache:
+            ca, ra, cb, rb = a % cols, a // cols, b % cols, b // cols
+            lo_c, hi_c = min(ca, cb), max(ca, cb)
+            for c1, r1, c2, r2 in rects:
+                if lo_c < c2 and c1 <= hi_c and ra < r2 and r1 <= rb:
+                    stale.append((a, b))
+                    break
+        for key in stale:
+            del self._los_cache[key]
+
+    # ── Tile writes ────────────────────────────────────────────────────────
 
     def set_tile(self, col, row, tile_id):
         if 0 <= col < self.cols and 0 <= row < self.rows:
-            self.grid[row][col] = tile_id
+            idx = row * self.cols + col
+            if self.tiles[idx] != tile_id:
+                self.tiles[idx] = tile_id
+                self.walkable[idx] = WALKABLE_LUT[tile_id]
+                self._changed(col, row, col + 1, row + 1)
+
+    def set_tiles(self, data):
+        """Replace every tile at once from a cols*rows row-major buffer."""
+        if len(data) != len(self.tiles):
+            raise ValueError(f"expected {len(self.tiles)} tiles, got {len(data)}")
+        if self.tiles != data:
+            self.tiles[:] = data
+            self.walkable[:] = self.tiles.translate(WALKABLE_LUT)
+            self._changed(0, 0, self.cols, self.rows)
+
+    @property
+    def nav(self):
+        """Nearest-walkable + clearance fields (repaired after tile writes)."""
+        if self._dirty:
+            self.flush()
+        if self._nav is None:
+            self._nav = NavField(self)
+        return self._nav
+
+    def bake_nav(self):
+        """Compute the nav field without installing it (safe off the game thread)."""
+        revision = self.revision
+        return revision, NavField(self)
+
+    def install_nav(self, baked):
+        """Adopt a bake_nav() result, repairing it for any writes since the bake."""
+        revision, nav = baked
+        if self._nav is not None:
+            return
+        if revision != self.revision:
+            rects = self.changes_since(revision)
+            if rects is None:
+                return
+            nav.repair(self, rects)
+        self._nav = nav
 
     def get_tile(self, col, row):
         if 0 <= col < self.cols and 0 <= row < self.rows:
-            return self.grid[row][col]
+            return self.tiles[row * self.cols + col]
         return TILE_WALL  # Out of bounds treated as wall
 
+    def _clip(self, c1, r1, c2, r2):
+        return max(0, c1), max(0, r1), min(self.cols, c2), min(self.rows, r2)
+
     def fill_rect(self, c1, r1, c2, r2, tile_id):
+        """Fill [c1, c2) x [r1, r2) (clipped to the map) with one slice per row."""
+        c1, r1, c2, r2 = self._clip(c1, r1, c2, r2)
+        if c1 >= c2 or r1 >= r2:
+            return
+        run = bytes([tile_id]) * (c2 - c1)
+        walk = bytes([WALKABLE_LUT[tile_id]]) * (c2 - c1)
+        changed = False
         for r in range(r1, r2):
-            for c in range(c1, c2):
-                self.set_tile(c, r, tile_id)
+            a = r * self.cols + c1
+            b = a + c2 - c1
+            if self.tiles[a:b] != run:
+                self.tiles[a:b] = run
+                self.walkable[a:b] = walk
+                changed = True
+        if changed:
+            self._changed(c1, r1, c2, r2)
+
+    def paste(self, c1, r1, width, data):
+        """Write a row-major block of tile ids *width* wide at (c1, r1), clipped."""
+        for i in range(len(data) // width):
+            row = r1 + i
+            if not 0 <= row < self.rows:
+                continue
+            a, b = max(c1, 0), min(c1 + width, self.cols)
+            if a < b:
+                self._write_row(row, a, data[i * width + a - c1:i * width + b - c1])
+
+    def _write_row(self, row, c1, data):
+        base = row * self.cols + c1
+        if self.tiles[base:base + len(data)] != data:
+            self.tiles[base:base + len(data)] = data
+            self.walkable[base:base + len(data)] = bytes(data).translate(WALKABLE_LUT)
+            self._changed(c1, row, c1 + len(data), row + 1)
+
+    def _row(self, row, c1, c2):
+        """Tile ids of columns [c1, c2) of one in-bounds row."""
+        base = row * self.cols
+        return self.tiles[base + c1:base + c2]
+
+    def _walk_row(self, row, c1, c2):
+        """Walkability bits of columns [c1, c2) of one in-bounds row."""
+        base = row * self.cols
+        return self.walkable[base + c1:base + c2]
+
+    def region(self, c1, r1, c2, r2):
+        """Tile ids of [c1, c2) x [r1, r2) as row-major bytes (clipped)."""
+        c1, r1, c2, r2 = self._clip(c1, r1, c2, r2)
+        if c1 >= c2:
+            return b""
+        return b"".join(self._row(r, c1, c2) for r in range(r1, r2))
+
+    def count_walkable(self, c1, r1, c2, r2):
+        """Number of walkable tiles in [c1, c2) x [r1, r2) (clipped)."""
+        c1, r1, c2, r2 = self._clip(c1, r1, c2, r2)
+        if c1 >= c2:
+            return 0
+        return sum(self._walk_row(r, c1, c2).count(1) for r in range(r1, r2))
+
+    def as_numpy(self):
+        """(rows, cols) uint8 view of the tiles (needs NumPy; shares memory)."""
+        import numpy as np
+        return np.frombuffer(self.tiles, dtype=np.uint8).reshape(self.rows, self.cols)
 
     def is_walkable(self, wx, wy):
         """Check if world coordinates are walkable."""
@@ -87,32 +307,134 @@ class IsoMap:
         row = int(wy)
         if col < 0 or col >= self.cols or row < 0 or row >= self.rows:
             return False
-        return self.grid[row][col] not in SOLID_TILES
+        return self.walkable[row * self.cols + col] == 1
+
+    def can_occupy(self, wx, wy, radius=0.0):
+        """Check if a disc of *radius* centred at (wx, wy) touches no solid tile.
 
-    def nearest_walkable(self, wx, wy):
-        """Return the nearest walkable (wx, wy) via spiral search from the given position."""
-        if self.is_walkable(wx, wy):
+        Map borders are not treated as solid so entities can still walk
+        right up to a scene edge and trigger a transition.
+        """
+        if not self.is_walkable(wx, wy):
+            return False
+        if radius <= 0.0:
+            return True
+        col, row = int(wx), int(wy)
+        reach = int(math.ceil(radius))
+        # Fast path: every tile within reach steps is walkable
+        if self.nav.clearance_at(col, row) > reach:
+            return True
+        return self._disc_clear(wx, wy, radius)
+
+    def _disc_clear(self, wx, wy, radius):
+        """Exact disc-vs-solid-tiles test over the tiles within reach."""
+        col, row = int(wx), int(wy)
+        reach = int(math.ceil(radius))
+        r2 = radius * radius
+        c_lo = max(0, col - reach)
+        for r in range(max(0, row - reach), min(self.rows, row + reach + 1)):
+            for c, walk in enumerate(self._walk_row(r, c_lo, min(self.cols, col + reach + 1)),
+                                     c_lo):
+                if walk:
+                    continue
+                # Closest point of the tile square to the disc centre
+                nx = min(max(wx, c), c + 1)
+                ny = min(max(wy, r), r + 1)
+                if (wx - nx) ** 2 + (wy - ny) ** 2 < r2:
+                    return False
+        return True
+
+    def has_line_of_sight(self, wx0, wy0, wx1, wy1):
+        """True if no opaque tile lies strictly between the two positions' tiles.
+
+        Traced with Bresenham over tile coordinates; results are cached per
+        (from_tile, to_tile) pair until a tile between them changes.
+        """
+        if self._dirty:
+            self.flush()
+        c0, r0, c1, r1 = int(wx0), int(wy0), int(wx1), int(wy1)
+        if c0 == c1 and r0 == r1:   # same tile: nothing lies between
+            return True
+        a = r0 * self.cols + c0
+        b = r1 * self.cols + c1
+        if a > b:   # trace in a canonical direction so the result is symmetric
+            a, b = b, a
+            c0, r0, c1, r1 = c1, r1, c0, r0
+        key = (a, b)
+        # Off-map endpoints (a neighbour zone's frame, see world/seamless.py)
+        # alias other tiles' indices, so those traces are not cached
+        cacheable = (0 <= c0 < self.cols and 0 <= r0 < self.rows
+                     and 0 <= c1 < self.cols and 0 <= r1 < self.rows)
+        cached = self._los_cache.get(key) if cacheable else None
+        if cached is not None:
+            return cached
+
+        visible = True
+        outside = self.outside
+        dc, dr = abs(c1 - c0), -abs(r1 - r0)
+        sc = 1 if c0 < c1 else -1
+        sr = 1 if r0 < r1 else -1
+        err = dc + dr
+        c, r = c0, r0
+        while True:
+            e2 = 2 * err
+            if e2 >= dr:
+                err += dr
+                c += sc
+            if e2 <= dc:
+                err += dc
+                r += sr
+            if c == c1 and r == r1:
+                break
+            if outside is not None and not (0 <= c < self.cols and 0 <= r < self.rows):
+                tile = outside(c, r)
+            else:
+                tile = self.get_tile(c, r)
+            if tile in OPAQUE_TILES:
+                visible = False
+                break
+
+        if not cacheable:
+            return visible
+        if len(self._los_cache) >= LOS_CACHE_MAX:
+            self._los_cache.clear()
+        self._los_cache[key] = visible
+        return visible
+
+    def nearest_walkable(self, wx, wy, radius=0.0):
+        """Return (wx, wy) if a disc of *radius* fits there, otherwise the
+        centre of the nearest walkable tile (O(1) via the nav field)."""
+        if self.can_occupy(wx, wy, radius):
             return (float(wx), float(wy))
-        cx, cy = int(wx), int(wy)
-        for radius in range(1, 10):
-            for dc in range(-radius, radius + 1):
-                for dr in range(-radius, radius + 1):
-                    if abs(dc) == radius or abs(dr) == radius:
-                        nx, ny = cx + dc + 0.5, cy + dr + 0.5
-                        if self.is_walkable(nx, ny):
-                            return (nx, ny)
-        return (float(wx), float(wy))
+        tile = self.nav.nearest_tile(int(wx), int(wy))
+        if tile is None:
+            return (float(wx), float(wy))
+        return (tile[0] + 0.5, tile[1] + 0.5)
 
     def is_in_bounds(self, wx, wy):
         return 0 <= wx < self.cols and 0 <= wy < self.rows
 
+    def _visible_bounds(self, cam_x, cam_y):
+        """Conservative (col - row) and (col + row) ranges that can be on screen."""
+        d_lo = math.floor((cam_x - TILE_W - HALF_W) / HALF_W)
+        d_hi = math.ceil((cam_x + INTERNAL_WIDTH + TILE_W + HALF_W) / HALF_W)
+        s_lo = math.floor((cam_y - TILE_H * 4) / HALF_H)
+        s_hi = math.ceil((cam_y + INTERNAL_HEIGHT + TILE_H * 4) / HALF_H)
+        return d_lo, d_hi, s_lo, s_hi
+
     def draw(self, surface, camera):
         """Draw tiles within visible range (viewport culling)."""
         cam_x, cam_y = camera.offset_x, camera.offset_y
+        cols = self.cols
+        d_lo, d_hi, s_lo, s_hi = self._visible_bounds(cam_x, cam_y)
 
-        for row in range(self.rows):
-            for col in range(self.cols):
-                tile_id = self.grid[row][col]
+        # Only walk the on-screen diamond of the map, in the usual row-major order
+        for row in range(max(0, (s_lo - d_hi) // 2), min(self.rows, (s_hi - d_lo) // 2 + 1)):
+            c_lo = max(0, s_lo - row, d_lo + row)
+            c_hi = min(cols, s_hi - row + 1, d_hi + row + 1)
+            if c_lo >= c_hi:
+                continue
+            for col, tile_id in enumerate(self._row(row, c_lo, c_hi), c_lo):
                 color = TILE_COLORS.get(tile_id)
                 if color is None:
                     continue
@@ -222,3 +544,20 @@ class IsoMap:
                             pygame.draw.polygon(surface, r_lt, [b_w, b_s, apex])
                             # Front-right slope (darker, in shadow)
                             pygame.draw.polygon(surface, r_dk, [b_s, b_e, apex])
+
+
+def draw_house(m, c1, r1, c2, r2, door_c, door_r):
+    """House walls around [c1, c2] x [r1, r2] (inclusive), roofed inside, with a door.
+
+    Works on anything with set_tile (an IsoMap, a procgen chunk canvas).
+    """
+    for c in range(c1, c2 + 1):
+        m.set_tile(c, r1, TILE_HOUSE_WALL)
+        m.set_tile(c, r2, TILE_HOUSE_WALL)
+    for r in range(r1 + 1, r2):
+        m.set_tile(c1, r, TILE_HOUSE_WALL)
+        m.set_tile(c2, r, TILE_HOUSE_WALL)
+    for r in range(r1 + 1, r2):
+        for c in range(c1 + 1, c2):
+            m.set_tile(c, r, TILE_ROOF)
+    m.set_tile(door_c, door_r, TILE_DIRT)
@@ -0,0 +1,396 @@
+# ============================================================
+#  Level compiler: declarative level files -> runtime data
+#
+#  A level source (data/levels/*.json) describes zones (terrain
+#  ops, enemy spawns, NPCs), dialogues, quests and shops.  Text
+#  is given as i18n keys and translated when the level loads.
+#  compile_level() validates every reference and produces the
+#  runtime form:
+#    - one packed row-major tile buffer per zone
+#    - every string interned once in a table, referenced by index
+#    - entity positions and patrol points already snapped to
+#      walkable tiles; dialogue / shop / quest ids resolved
+#
+#  Compiled levels are cached under CACHE_DIR, keyed by a hash of
+#  the source file and the compiler, and load with a single read.
+#
+#  Compiled file layout (little-endian):
+#    header   "MELV" u16 version 16-byte key u32 payload length
+#    payload  zlib(pickle(compiled level))
+#
+#    python -m world.level_compiler [SOURCE.json]   # validate + compile
+# ============================================================
+import hashlib
+import json
+import os
+import pickle
+import struct
+import zlib
+from core.settings import CACHE_DIR, LEVEL_FILE, NPC_RADIUS
+from core.logger import get_logger
+from world.iso_map import IsoMap, TILE_NAMES, draw_house
+
+log = get_logger("level")
+
+LEVEL_FORMAT = 1          # source format understood by this compiler
+COMPILED_MAGIC = b"MELV"
+COMPILED_VERSION = 1
+
+_HEADER = struct.Struct("<4sH16sI")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Code the compiled output depends on (tile ops, snapping, enemy and NPC radii)
+_COMPILER_SOURCES = ("world/level_compiler.py", "world/iso_map.py", "world/nav_field.py",
+                     "entities/enemy.py", "core/settings.py")
+
+NPC_KINDS = ("talk", "shop", "quest")
+NPC_BEHAVIORS = ("idle", "patrol", "wander", "follow")
+QUEST_TYPES = ("kill", "collect", "talk", "explore", "escort", "timed_kill")
+# dialogue option action -> argument kind
+ACTIONS = {"open_shop": "shop", "heal": "heal"}
+
+NO_REF = -1   # string index for "none"
+_AREA_KEYS = ("x1", "y1", "x2", "y2")   # quest zone rectangle
+
+
+class LevelError(ValueError):
+    """A level source failed validation; .errors lists every problem found."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("invalid level:\n  " + "\n  ".join(self.errors))
+
+
+# ============================================================
+#  Compiler
+# ============================================================
+class _Compiler:
+    def __init__(self, src):
+        from systems.i18n import LANG
+        from systems.inventory import ITEMS
+        from entities.enemy import ENEMY_TEMPLATES, get_archetype
+        self.archetype = get_archetype
+        self.src = src
+        self.lang = LANG
+        self.items = ITEMS
+        self.enemy_types = ENEMY_TEMPLATES
+        self.errors = []
+        self.strings = []
+        self._index = {}
+
+    # ── Helpers ────────────────────────────────────────────────────────────
+    def err(self, where, msg):
+        self.errors.append(f"{where}: {msg}")
+
+    def s(self, value):
+        """Intern *value* in the string table; None -> NO_REF."""
+        if value is None:
+            return NO_REF
+        idx = self._index.get(value)
+        if idx is None:
+            idx = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+    def text(self, where, key):
+        if not isinstance(key, str) or key not in self.lang:
+            self.err(where, f"unknown text key {key!r}")
+        return self.s(key)
+
+    def ref(self, where, value, known, what):
+        if value is not None and value not in known:
+            self.err(where, f"unknown {what} {value!r}")
+        return self.s(value)
+
+    def point(self, where, p, cols, rows):
+        if (not isinstance(p, list) or len(p) != 2
+                or not all(isinstance(v, (int, float)) for v in p)):
+            self.err(where, f"expected [col, row], got {p!r}")
+            return 0, 0
+        if not (0 <= p[0] < cols and 0 <= p[1] < rows):
+            self.err(where, f"{p} is outside the {cols}x{rows} zone")
+        return p[0], p[1]
+
+    # ── Top level ──────────────────────────────────────────────────────────
+    def compile(self):
+        src = self.src
+        if src.get("format") != LEVEL_FORMAT:
+            raise LevelError([f"format: expected {LEVEL_FORMAT}, got {src.get('format')!r}"])
+        dialogues = src.get("dialogues", {})
+        quests = src.get("quests", {})
+        shops = src.get("shops", {})
+        self.known = {"dialogue": dialogues, "quest": quests, "shop": shops}
+
+        zone_ids = [z.get("id") for z in src.get("zones", [])]
+        for zid in {z for z in zone_ids if zone_ids.count(z) > 1}:
+            self.err("zones", f"duplicate zone id {zid!r}")
+        self.zone_ids = set(zone_ids)
+
+        start = src.get("start", {})
+        if start.get("zone") not in self.zone_ids:
+            self.err("start.zone", f"unknown zone {start.get('zone')!r}")
+        out = {
+            "start": (self.s(start.get("zone")), *start.get("at", (0, 0))),
+            "zones": [self.zone(f"zones[{i}]", z) for i, z in enumerate(src.get("zones", []))],
+            "dialogues": [self.dialogue(f"dialogues.{did}", did, nodes)
+                          for did, nodes in dialogues.items()],
+            "quests": [self.quest(f"quests.{qid}", qid, q) for qid, q in quests.items()],
+            "shops": [(self.s(sid), tuple(self.ref(f"shops.{sid}", item, self.items, "item")
+                                          for item in items))
+                      for sid, items in shops.items()],
+        }
+        if self.errors:
+            raise LevelError(self.errors)
+        out["strings"] = self.strings
+        return out
+
+    # ── Zones ──────────────────────────────────────────────────────────────
+    def zone(self, where, z):
+        size = z.get("size")
+        if (isinstance(size, list) and len(size) == 2
+                and all(isinstance(v, int) and v > 0 for v in size)):
+            cols, rows = size
+        else:
+            self.err(f"{where}.size", f"expected [cols, rows], got {size!r}")
+            cols, rows = 1, 1
+        m = IsoMap(cols, rows)
+        for i, op in enumerate(z.get("terrain", [])):
+            self.terrain(f"{where}.terrain[{i}]", m, op)
+
+        spawns = []
+        for i, group in enumerate(z.get("enemies", [])):
+            gw = f"{where}.enemies[{i}]"
+            etype = group.get("type")
+            if etype not in self.enemy_types:
+                self.err(gw, f"unknown enemy type {etype!r}")
+                continue
+            radius = self.archetype(etype).radius
+            if "scatter" in group:
+                sc = group["scatter"]
+                lo, hi = sc.get("min", 0), sc.get("max", min(cols, rows) - 1)
+                if not (0 <= lo <= hi < min(cols, rows)):
+                    self.err(f"{gw}.scatter", f"range [{lo}, {hi}] is outside the zone")
+                # positions depend on the run seed: resolved (and snapped) at load
+                spawns.append(("scatter", self.s(etype), sc.get("count", 1), lo, hi,
+                               self.s(sc.get("seed", f"level:{z.get('id')}"))))
+            for j, p in enumerate(group.get("at", [])):
+                x, y = self.point(f"{gw}.at[{j}]", p, cols, rows)
+                spawns.append(("at", self.s(etype), x, y, *m.nearest_walkable(x, y, radius)))
+
+        npcs = [self.npc(f"{where}.npcs[{i}]", m, n) for i, n in enumerate(z.get("npcs", []))]
+        return {
+            "id": self.s(z.get("id")),
+            "name": self.text(f"{where}.name", z.get("name")),
+            "difficulty": self.text(f"{where}.difficulty", z.get("difficulty")),
+            "size": (cols, rows),
+            "tiles": bytes(m.tiles),
+            "spawns": spawns,
+            "npcs": npcs,
+        }
+
+    def terrain(self, where, m, op):
+        if "house" in op:
+            args = op["house"]
+            if len(args) != 6 or not all(isinstance(v, int) for v in args):
+                self.err(where, f"house expects [c1, r1, c2, r2, door_c, door_r], got {args!r}")
+                return
+            if not (0 <= args[0] <= args[2] < m.cols and 0 <= args[1] <= args[3] < m.rows):
+                self.err(where, f"house {args} is outside the zone")
+            draw_house(m, *args)
+            return
+        tile = TILE_NAMES.get(op.get("tile"))
+        if tile is None:
+            self.err(where, f"unknown tile {op.get('tile')!r}")
+            return
+        for rect in op.get("rects", []):
+            if (len(rect) != 4 or not all(isinstance(v, int) for v in rect)
+                    or not (0 <= rect[0] < rect[2] <= m.cols and 0 <= rect[1] < rect[3] <= m.rows)):
+                self.err(where, f"bad rect {rect!r} (expected [c1, r1, c2, r2) inside the zone)")
+                continue
+            m.fill_rect(*rect, tile)
+        for cell in op.get("cells", []):
+            c, r = self.point(where, cell, m.cols, m.rows)
+            m.set_tile(c, r, tile)
+
+    def npc(self, where, m, n):
+        kind = n.get("kind", "talk")
+        if kind not in NPC_KINDS:
+            self.err(f"{where}.kind", f"expected one of {NPC_KINDS}, got {kind!r}")
+        behavior = n.get("behavior", "idle")
+        if behavior not in NPC_BEHAVIORS:
+            self.err(f"{where}.behavior", f"expected one of {NPC_BEHAVIORS}, got {behavior!r}")
+        x, y = self.point(f"{where}.at", n.get("at"), m.cols, m.rows)
+        patrol = tuple(m.nearest_walkable(*self.point(f"{where}.patrol", p, m.cols, m.rows),
+                                          NPC_RADIUS)
+                       for p in n.get("patrol", []))
+        if behavior == "patrol" and not patrol:
+            self.err(f"{where}.patrol", "patrol behavior needs patrol points")
+        return (
+            self.s(n.get("name", "NPC")), self.s(kind),
+            self.ref(f"{where}.dialogue", n.get("dialogue"), self.known["dialogue"], "dialogue"),
+            self.ref(f"{where}.shop", n.get("shop"), self.known["shop"], "shop"),
+            tuple(self.ref(f"{where}.quests", q, self.known["quest"], "quest")
+                  for q in n.get("quests", [])),
+            tuple(n["color"]) if "color" in n else None,
+            self.s(behavior), float(n.get("wander_radius", 3.0)),
+            m.nearest_walkable(x, y, NPC_RADIUS), patrol,
+            tuple(self.text(f"{where}.idle_lines", k) for k in n.get("idle_lines", [])),
+        )
+
+    # ── Dialogues / quests ─────────────────────────────────────────────────
+    def dialogue(self, where, did, nodes):
+        if "start" not in nodes:
+            self.err(where, "missing 'start' node")
+        out = []
+        for nid, node in nodes.items():
+            options = []
+            for i, o in enumerate(node.get("options", [])):
+                ow = f"{where}.{nid}.options[{i}]"
+                nxt = o.get("next")
+                if nxt is not None and nxt not in nodes:
+                    self.err(ow, f"unknown node {nxt!r}")
+                options.append((self.text(ow, o.get("label")), self.s(nxt),
+                                self.action(ow, o.get("action"))))
+            out.append((self.s(nid), self.text(f"{where}.{nid}", node.get("text")), tuple(options)))
+        return self.s(did), tuple(out)
+
+    def action(self, where, action):
+        if action is None:
+            return None
+        if not isinstance(action, dict) or len(action) != 1:
+            self.err(where, f"action must be a single {{name: argument}}, got {action!r}")
+            return None
+        (name, arg), = action.items()
+        kind = ACTIONS.get(name)
+        if kind == "shop":
+            return name, self.ref(where, arg, self.known["shop"], "shop")
+        if kind == "heal":
+            if not isinstance(arg, dict) or not isinstance(arg.get("cost", 0), int):
+                self.err(where, f"heal expects {{cost, log}}, got {arg!r}")
+                return None
+            return name, arg.get("cost", 0), self.text(where, arg.get("log"))
+        self.err(where, f"unknown action {name!r} (known: {', '.join(ACTIONS)})")
+        return None
+
+    def quest(self, where, qid, q):
+        if q.get("type") not in QUEST_TYPES:
+            self.err(f"{where}.type", f"expected one of {QUEST_TYPES}, got {q.get('type')!r}")
+        rewards = q.get("rewards", {})
+        out = {
+            "name": self.text(f"{where}.name", q.get("name")),
+            "desc": self.text(f"{where}.desc", q.get("desc")),
+            "type": self.s(q.get("type")),
+            "target": self.s(q.get("target")),
+            "required": int(q.get("required", 1)),
+            "rewards": (int(rewards.get("xp", 0)), int(rewards.get("gold", 0)),
+                        tuple(self.ref(f"{where}.rewards", item, self.items, "item")
+                              for item in rewards.get("items", []))),
+        }
+        if "zones" in q:
+            out["zones"] = tuple(filter(None, (self.quest_area(f"{where}.zones[{i}]", a)
+                                               for i, a in enumerate(q["zones"]))))
+        for key in ("escort_dest", "escort_radius", "time_limit"):
+            if key in q:
+                out[key] = tuple(q[key]) if isinstance(q[key], list) else q[key]
+        return self.s(qid), out
+
+    def quest_area(self, where, a):
+        if (not isinstance(a, dict)
+                or not all(isinstance(a.get(k), (int, float)) for k in _AREA_KEYS)):
+            self.err(where, f"expected {{name, scene, x1, y1, x2, y2}}, got {a!r}")
+            return None
+        return (self.text(where, a.get("name")),
+                self.ref(where, a.get("scene"), self.zone_ids, "zone"),
+                *(a[k] for k in _AREA_KEYS))
+
+
+def compile_level(src):
+    """Validate a level source dict and return its compiled form (raises LevelError)."""
+    return _Compiler(src).compile()
+
+
+# ============================================================
+#  Compiled file cache
+# ============================================================
+_loaded = {}   # source path -> (key, compiled): parsed once per process
+_keys = {}     # source path -> key
+
+
+def level_key(source_path):
+    key = _keys.get(source_path)
+    if key is None:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(str(COMPILED_VERSION).encode("ascii"))
+        for path in (source_path, *(os.path.join(_ROOT, rel) for rel in _COMPILER_SOURCES)):
+            with open(path, "rb") as f:
+                h.update(f.read())
+        key = _keys[source_path] = h.digest()
+    return key
+
+
+def compiled_path(source_path):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(CACHE_DIR, f"{name}.lvc")
+
+
+def _read_compiled(path, key):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, file_key, n = _HEADER.unpack_from(data, 0)
+        if magic != COMPILED_MAGIC or version != COMPILED_VERSION or file_key != key:
+            return None
+        return pickle.loads(zlib.decompress(data[_HEADER.size:_HEADER.size + n]))
+    except (OSError, struct.error, zlib.error, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def write_compiled(compiled, path, key):
+    payload = zlib.compress(pickle.dumps(compiled, protocol=4), 6)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(COMPILED_MAGIC, COMPILED_VERSION, key, len(payload)))
+        f.write(payload)
+    os.replace(tmp, path)
+    return _HEADER.size + len(payload)
+
+
+def compile_file(source_path):
+    """Compile *source_path* and write it to the cache; returns the compiled level."""
+    with open(source_path, encoding="utf-8") as f:
+        compiled = compile_level(json.load(f))
+    key = level_key(source_path)
+    path = compiled_path(source_path)
+    try:
+        size = write_compiled(compiled, path, key)
+        log.info("Level compiled: %s -> %s (%d bytes)", source_path, path, size)
+    except OSError as exc:
+        log.warning("Compiled level not written: %s", exc)
+    _loaded[source_path] = (key, compiled)
+    return compiled
+
+
+def load_level(source_path=LEVEL_FILE):
+    """Compiled form of *source_path*, recompiling only when the source changed."""
+    key = level_key(source_path)
+    hit = _loaded.get(source_path)
+    if hit and hit[0] == key:
+        return hit[1]
+    compiled = _read_compiled(compiled_path(source_path), key)
+    if compiled is None:
+        return compile_file(source_path)
+    _loaded[source_path] = (key, compiled)
+    return compiled
+
+
+if __name__ == "__main__":
+    import sys
+    source = sys.argv[1] if len(sys.argv) > 1 else LEVEL_FILE
+    try:
+        level = compile_file(source)
+    except LevelError as exc:
+        sys.exit(str(exc))
+    print(f"{source}: {len(level['zones'])} zones, {len(level['dialogues'])} dialogues, "
+          f"{len(level['quests'])} quests, {len(level['shops'])} shops, "
+          f"{len(level['strings'])} strings -> {compiled_path(source)}")
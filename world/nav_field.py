@@ -0,0 +1,197 @@
+# ============================================================
+#  Navigation fields: nearest-walkable lookup + clearance map
+#
+#  Both fields are built once per IsoMap with a multi-source
+#  BFS over the tile grid and repaired around changed tiles
+#  afterwards, so snapping and radius-aware collision become
+#  O(1) lookups.
+# ============================================================
+from collections import deque
+from heapq import heappush, heappop
+
+# 8-connected neighbourhood → BFS distances are Chebyshev steps
+_NEIGHBORS_8 = (
+    (-1, -1), (0, -1), (1, -1),
+    (-1,  0),          (1,  0),
+    (-1,  1), (0,  1), (1,  1),
+)
+
+NO_TILE = -1
+CLEARANCE_INF = 0x7FFF   # no solid tile anywhere on the map
+_FAR = 1 << 30           # distance to "no walkable tile"
+
+
+class NavField:
+    """Per-scene navigation data derived from one IsoMap.
+
+    nearest[i]   — flat index of the closest walkable tile to tile i
+                   (i itself when walkable, NO_TILE if the map has none)
+    clearance[i] — BFS steps from tile i to the closest in-bounds solid
+                   tile (0 on solid tiles).  Clearance >= k + 1 means every
+                   tile within k steps is walkable.
+    """
+
+    def __init__(self, iso_map):
+        self.cols = iso_map.cols
+        self.rows = iso_map.rows
+        n = self.cols * self.rows
+        self.nearest = [NO_TILE] * n
+        self.clearance = [CLEARANCE_INF] * n
+        self._build(iso_map)
+
+    def _build(self, iso_map):
+        cols, rows = self.cols, self.rows
+        nearest, clearance = self.nearest, self.clearance
+
+        walk_q = deque()
+        solid_q = deque()
+        for idx, walkable in enumerate(iso_map.walkable):
+            if walkable:
+                nearest[idx] = idx
+                walk_q.append(idx)
+            else:
+                clearance[idx] = 0
+                solid_q.append(idx)
+
+        # Multi-source BFS from every walkable tile: propagate the source index
+        while walk_q:
+            idx = walk_q.popleft()
+            src = nearest[idx]
+            col, row = idx % cols, idx // cols
+            for dc, dr in _NEIGHBORS_8:
+                c, r = col + dc, row + dr
+                if 0 <= c < cols and 0 <= r < rows:
+                    n_idx = r * cols + c
+                    if nearest[n_idx] == NO_TILE:
+                        nearest[n_idx] = src
+                        walk_q.append(n_idx)
+
+        # Multi-source BFS from every solid tile: distance-to-solid
+        while solid_q:
+            idx = solid_q.popleft()
+            d = clearance[idx] + 1
+            col, row = idx % cols, idx // cols
+            for dc, dr in _NEIGHBORS_8:
+                c, r = col + dc, row + dr
+                if 0 <= c < cols and 0 <= r < rows:
+                    n_idx = r * cols + c
+                    if clearance[n_idx] > d:
+                        clearance[n_idx] = d
+                        solid_q.append(n_idx)
+
+    # ------------------------------------------------------------------
+    #  Incremental repair
+    # ------------------------------------------------------------------
+    def repair(self, iso_map, rects):
+        """Update both fields after the tiles inside *rects* changed.
+
+        Each field is a pure function of the tiles: clearance is the
+        Chebyshev distance to the closest solid tile, nearest is the
+        lowest-index walkable tile at the smallest Chebyshev distance
+        (the order the BFS above discovers them in).  A tile can only
+        change if it is no farther from the edit than from its current
+        answer; those tiles are re-solved from their unaffected
+        neighbours, giving exactly what a full rebuild would.
+        """
+        cols = self.cols
+        seeds = [r * cols + c for c1, r1, c2, r2 in rects
+                 for r in range(r1, r2) for c in range(c1, c2)]
+        self._repair_clearance(iso_map.walkable, seeds)
+        self._repair_nearest(iso_map.walkable, seeds)
+
+    def _around(self, idx):
+        cols, rows = self.cols, self.rows
+        col, row = idx % cols, idx // cols
+        return [(row + dr) * cols + col + dc for dc, dr in _NEIGHBORS_8
+                if 0 <= col + dc < cols and 0 <= row + dr < rows]
+
+    def _affected(self, seeds, reach):
+        """Tiles whose *reach* (distance to their answer) is >= their distance to *seeds*."""
+        dist = dict.fromkeys(seeds, 0)
+        queue = deque(dist)
+        while queue:
+            idx = queue.popleft()
+            d = dist[idx] + 1
+            for n_idx in self._around(idx):
+                if n_idx not in dist and reach(n_idx) >= d:
+                    dist[n_idx] = d
+                    queue.append(n_idx)
+        return dist
+
+    def _repair_clearance(self, walkable, seeds):
+        clearance = self.clearance
+        area = self._affected(seeds, clearance.__getitem__)
+        heap = []
+        for idx in area:
+            best = 0
+            if walkable[idx]:
+                best = CLEARANCE_INF
+                for n_idx in self._around(idx):
+                    if n_idx not in area and clearance[n_idx] + 1 < best:
+                        best = clearance[n_idx] + 1
+            clearance[idx] = best
+            if best < CLEARANCE_INF:
+                heappush(heap, (best, idx))
+        while heap:
+            d, idx = heappop(heap)
+            if d > clearance[idx]:
+                continue
+            d += 1
+            for n_idx in self._around(idx):
+                if n_idx in area and clearance[n_idx] > d:
+                    clearance[n_idx] = d
+                    heappush(heap, (d, n_idx))
+
+    def _repair_nearest(self, walkable, seeds):
+        cols, nearest = self.cols, self.nearest
+
+        def reach(idx):
+            src = nearest[idx]
+            if src == NO_TILE:
+                return _FAR
+            return max(abs(idx % cols - src % cols), abs(idx // cols - src // cols))
+
+        area = self._affected(seeds, reach)
+        # (distance, source index) keys: the smallest one is the BFS answer
+        best = {}
+        heap = []
+        for idx in area:
+            key = (0, idx) if walkable[idx] else None
+            if key is None:
+                for n_idx in self._around(idx):
+                    if n_idx not in area and nearest[n_idx] != NO_TILE:
+                        cand = (reach(n_idx) + 1, nearest[n_idx])
+                        if key is None or cand < key:
+                            key = cand
+            best[idx] = key
+            if key is not None:
+                heappush(heap, (*key, idx))
+        for idx, key in best.items():
+            nearest[idx] = NO_TILE if key is None else key[1]
+        while heap:
+            d, src, idx = heappop(heap)
+            if best[idx] != (d, src):
+                continue
+            cand = (d + 1, src)
+            for n_idx in self._around(idx):
+                if n_idx in area and (best[n_idx] is None or cand < best[n_idx]):
+                    best[n_idx] = cand
+                    nearest[n_idx] = src
+                    heappush(heap, (d + 1, src, n_idx))
+
+    # ------------------------------------------------------------------
+    #  Queries
+    # ------------------------------------------------------------------
+    def nearest_tile(self, col, row):
+        """Return (col, row) of the closest walkable tile, or None."""
+        col = min(max(col, 0), self.cols - 1)
+        row = min(max(row, 0), self.rows - 1)
+        idx = self.nearest[row * self.cols + col]
+        if idx == NO_TILE:
+            return None
+        return idx % self.cols, idx // self.cols
+
+    def clearance_at(self, col, row):
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return self.clearance[row * self.cols + col]
+        return 0
@@ -0,0 +1,368 @@
+# ============================================================
+#  ZonePathfinder: hierarchical (HPA*) routes across the zone grid
+#
+#  Abstract level: every run of tiles walkable on both sides of a
+#  shared zone edge is an entrance; short runs get one portal at
+#  their middle, wide ones one at each end and every few tiles.  Each portal tile owns
+#  a cached distance field over its zone (Dijkstra, 8-connected,
+#  no corner cutting), which gives the intra-zone portal-to-portal
+#  costs of the abstract graph as well as the start / goal costs
+#  of a query — so a query is an A* over ~100 portal nodes and no
+#  tile search at all.
+#
+#  Concrete level: refine() turns the next waypoint into a tile
+#  path inside the current zone only, by walking downhill in the
+#  waypoint's field (or a plain A* for the final goal tile).
+#
+#  Scenes are never built for routing: unbuilt zones are read
+#  from the level's tiles, built ones from their live IsoMap, to
+#  which the pathfinder subscribes — tile writes drop just the
+#  fields (and border portals) of the zones they touch.
+# ============================================================
+from heapq import heappush, heappop
+from world.iso_map import WALKABLE_LUT
+from world.scene_manager import ZONE_GRID, GRID_TO_ZONE
+
+# Step costs (orthogonal, diagonal) ≈ 10 × (1, √2), exact in integers
+_STRAIGHT = 10
+_DIAGONAL = 14
+_INF = 1 << 30
+_WIDE_ENTRANCE = 6   # entrances this wide get portals at both ends and this far apart
+
+
+def _octile(dx, dy):
+    dx, dy = abs(dx), abs(dy)
+    return _STRAIGHT * max(dx, dy) + (_DIAGONAL - _STRAIGHT) * min(dx, dy)
+
+
+def _steps(walk, cols, rows, idx):
+    """(neighbour index, cost) pairs reachable from tile *idx* in one move."""
+    c, r = idx % cols, idx // cols
+    w = c > 0 and walk[idx - 1]
+    e = c < cols - 1 and walk[idx + 1]
+    n = r > 0 and walk[idx - cols]
+    s = r < rows - 1 and walk[idx + cols]
+    out = []
+    if w:
+        out.append((idx - 1, _STRAIGHT))
+    if e:
+        out.append((idx + 1, _STRAIGHT))
+    if n:
+        out.append((idx - cols, _STRAIGHT))
+        if w and walk[idx - cols - 1]:
+            out.append((idx - cols - 1, _DIAGONAL))
+        if e and walk[idx - cols + 1]:
+            out.append((idx - cols + 1, _DIAGONAL))
+    if s:
+        out.append((idx + cols, _STRAIGHT))
+        if w and walk[idx + cols - 1]:
+            out.append((idx + cols - 1, _DIAGONAL))
+        if e and walk[idx + cols + 1]:
+            out.append((idx + cols + 1, _DIAGONAL))
+    return out
+
+
+def distance_field(walk, cols, rows, source):
+    """Dijkstra costs from tile *source* to every tile (_INF where unreachable)."""
+    dist = [_INF] * (cols * rows)
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        d, idx = heappop(heap)
+        if d > dist[idx]:
+            continue
+        for n_idx, cost in _steps(walk, cols, rows, idx):
+            nd = d + cost
+            if nd < dist[n_idx]:
+                dist[n_idx] = nd
+                heappush(heap, (nd, n_idx))
+    return dist
+
+
+def tile_path(walk, cols, rows, start, goal):
+    """A* tile path start -> goal (flat indices, start excluded), or None."""
+    if start == goal:
+        return []
+    if not walk[goal]:
+        return None
+    gc, gr = goal % cols, goal // cols
+    best = {start: 0}
+    came = {}
+    heap = [(0, 0, start)]
+    while heap:
+        _, d, idx = heappop(heap)
+        if idx == goal:
+            path = []
+            while idx != start:
+                path.append(idx)
+                idx = came[idx]
+            path.reverse()
+            return path
+        if d > best[idx]:
+            continue
+        for n_idx, cost in _steps(walk, cols, rows, idx):
+            nd = d + cost
+            if nd < best.get(n_idx, _INF):
+                best[n_idx] = nd
+                came[n_idx] = idx
+                h = _octile(n_idx % cols - gc, n_idx // cols - gr)
+                heappush(heap, (nd + h, nd, n_idx))
+    return None
+
+
+class ZonePathfinder:
+    """Routes between any two tiles of the zone grid (see module header)."""
+
+    def __init__(self, scene_mgr, zone_tiles):
+        """*zone_tiles*: zone_id -> ((cols, rows), tiles) as the level defines them."""
+        self.scene_mgr = scene_mgr
+        self._size = {}       # zone_id -> (cols, rows)
+        self._walk = {}       # zone_id -> walkability bitmap routes are derived from
+        self._live = {}       # zone_id -> IsoMap subscribed to (built scenes)
+        for zone_id, (size, tiles) in zone_tiles.items():
+            if zone_id in ZONE_GRID:
+                self._size[zone_id] = tuple(size)
+                self._walk[zone_id] = bytes(tiles).translate(WALKABLE_LUT)
+        self._edges = {}      # (zone_a, zone_b) east/south pair -> [(idx_a, idx_b)]
+        self._fields = {}     # zone_id -> {portal idx: distance_field}
+        self._links = None    # abstract graph: (zone_id, idx) -> [(node, cost)]
+        for zone_id in self._walk:
+            for other in self._neighbors(zone_id):
+                self._edges[self._edge_key(zone_id, other)] = None
+
+    # ------------------------------------------------------------------
+    #  Abstract graph
+    # ------------------------------------------------------------------
+    def _neighbors(self, zone_id):
+        cb, rb = ZONE_GRID[zone_id]
+        for dc, dr in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            other = GRID_TO_ZONE.get((cb + dc, rb + dr))
+            if other in self._walk:
+                yield other
+
+    @staticmethod
+    def _edge_key(a, b):
+        """Order a zone pair west->east / north->south."""
+        return (a, b) if ZONE_GRID[a] < ZONE_GRID[b] else (b, a)
+
+    def _portals(self, key):
+        """Portal tile pairs on the edge shared by *key*'s two zones."""
+        pairs = self._edges[key]
+        if pairs is not None:
+            return pairs
+        a, b = key
+        (ca, ra), wa = self._size[a], self._walk[a]
+        (cb, rb), wb = self._size[b], self._walk[b]
+        if ZONE_GRID[a][1] == ZONE_GRID[b][1]:   # a west of b: a's last col, b's first
+            span = min(ra, rb)
+            open_ = [wa[i * ca + ca - 1] and wb[i * cb] for i in range(span)]
+            at = lambda i: (i * ca + ca - 1, i * cb)
+        else:                                    # a north of b: a's last row, b's first
+            span = min(ca, cb)
+            open_ = [wa[(ra - 1) * ca + i] and wb[i] for i in range(span)]
+            at = lambda i: ((ra - 1) * ca + i, i)
+        pairs = []
+        i = 0
+        while i < span:
+            if not open_[i]:
+                i += 1
+                continue
+            j = i
+            while j + 1 < span and open_[j + 1]:
+                j += 1
+            if j - i + 1 >= _WIDE_ENTRANCE:   # both ends, plus one every _WIDE_ENTRANCE tiles
+                pairs += [at(k) for k in range(i, j, _WIDE_ENTRANCE)] + [at(j)]
+            else:
+                pairs.append(at((i + j) // 2))
+            i = j + 1
+        self._edges[key] = pairs
+        return pairs
+
+    def _zone_fields(self, zone_id):
+        """Distance field per portal tile of *zone_id* (computed on first use)."""
+        fields = self._fields.get(zone_id)
+        if fields is None:
+            nodes = set()
+            for other in self._neighbors(zone_id):
+                key = self._edge_key(zone_id, other)
+                side = 0 if key[0] == zone_id else 1
+                nodes.update(pair[side] for pair in self._portals(key))
+            cols, rows = self._size[zone_id]
+            walk = self._walk[zone_id]
+            fields = self._fields[zone_id] = {
+                idx: distance_field(walk, cols, rows, idx) for idx in sorted(nodes)}
+        return fields
+
+    def _graph(self):
+        if self._links is None:
+            links = {}
+            for zone_id in self._walk:
+                fields = self._zone_fields(zone_id)
+                for a, field in fields.items():
+                    links[(zone_id, a)] = [((zone_id, b), field[b]) for b in fields
+                                           if b != a and field[b] < _INF]
+            for (za, zb), pairs in self._edges.items():
+                for a, b in pairs:
+                    links[(za, a)].append(((zb, b), _STRAIGHT))
+                    links[(zb, b)].append(((za, a), _STRAIGHT))
+            self._links = links
+        return self._links
+
+    def precompute(self):
+        """Build every portal field now instead of on the first query."""
+        self.sync()
+        self._graph()
+
+    # ------------------------------------------------------------------
+    #  Keeping up with tile changes
+    # ------------------------------------------------------------------
+    def sync(self):
+        """Follow built scenes' live maps (call before querying)."""
+        scenes = self.scene_mgr.scenes
+        for zone_id in self._walk:
+            scene = scenes.get(zone_id)
+            if scene is None:
+                continue
+            m = scene["iso_map"]
+            old = self._live.get(zone_id)
+            if m is old:
+                m.flush()   # pending writes reach _on_tiles_changed
+                continue
+            if old is not None:
+                old.unsubscribe(self._on_tiles_changed)
+            self._live[zone_id] = m
+            m.flush()
+            m.subscribe(self._on_tiles_changed)
+            changed = m.walkable != self._walk[zone_id]
+            self._walk[zone_id] = m.walkable   # shared: later writes show up here
+            if changed:
+                self._invalidate(zone_id, [(0, 0) + self._size[zone_id]])
+
+    def _on_tiles_changed(self, iso_map, rects):
+        for zone_id, m in self._live.items():
+            if m is iso_map:
+                self._invalidate(zone_id, rects)
+                return
+
+    def _invalidate(self, zone_id, rects):
+        """Drop what the tiles in *rects* of *zone_id* were used for."""
+        self._fields.pop(zone_id, None)
+        self._links = None
+        cols, rows = self._size[zone_id]
+        if all(0 < c1 and c2 < cols and 0 < r1 and r2 < rows for c1, r1, c2, r2 in rects):
+            return   # interior only: the portals stand
+        for other in self._neighbors(zone_id):
+            self._edges[self._edge_key(zone_id, other)] = None
+            self._fields.pop(other, None)
+
+    # ------------------------------------------------------------------
+    #  Queries
+    # ------------------------------------------------------------------
+    def route(self, start_zone, sx, sy, goal_zone, gx, gy):
+        """Waypoints [(zone_id, col, row), ...] from a tile to another, or None.
+
+        Consecutive waypoints in different zones are the two sides of a
+        portal; the last one is the goal tile.
+        """
+        self.sync()
+        if start_zone not in self._walk or goal_zone not in self._walk:
+            return None
+        s_cols = self._size[start_zone][0]
+        g_cols = self._size[goal_zone][0]
+        s_idx = int(sy) * s_cols + int(sx)
+        g_idx = int(gy) * g_cols + int(gx)
+        goal = (goal_zone, int(gx), int(gy))
+        if start_zone == goal_zone:
+            cols, rows = self._size[start_zone]
+            if tile_path(self._walk[start_zone], cols, rows, s_idx, g_idx) is not None:
+                return [goal]
+        if not self._walk[goal_zone][g_idx]:
+            return None
+
+        links = self._graph()
+        ox, oy = ZONE_GRID[goal_zone]
+        goal_w = (ox * g_cols + int(gx), oy * self._size[goal_zone][1] + int(gy))
+        goal_cost = {(goal_zone, a): field[g_idx]
+                     for a, field in self._zone_fields(goal_zone).items() if field[g_idx] < _INF}
+        if not goal_cost:
+            return None
+
+        def h(node):
+            zone_id, idx = node
+            cols, rows = self._size[zone_id]
+            cb, rb = ZONE_GRID[zone_id]
+            return _octile(cb * cols + idx % cols - goal_w[0], rb * rows + idx // cols - goal_w[1])
+
+        best, came, heap = {}, {}, []
+        for a, field in self._zone_fields(start_zone).items():
+            d = field[s_idx]
+            if d < _INF:
+                node = (start_zone, a)
+                best[node] = d
+                came[node] = None
+                heappush(heap, (d + h(node), d, node))
+        end, end_cost = None, _INF
+        while heap:
+            f, d, node = heappop(heap)
+            if f >= end_cost:
+                break
+            if d > best[node]:
+                continue
+            if node in goal_cost and d + goal_cost[node] < end_cost:
+                end, end_cost = node, d + goal_cost[node]
+            for nxt, cost in links[node]:
+                nd = d + cost
+                if nd < best.get(nxt, _INF):
+                    best[nxt] = nd
+                    came[nxt] = node
+                    heappush(heap, (nd + h(nxt), nd, nxt))
+        if end is None:
+            return None
+        out = [goal]
+        node = end
+        while node is not None:
+            zone_id, idx = node
+            cols = self._size[zone_id][0]
+            out.append((zone_id, idx % cols, idx // cols))
+            node = came[node]
+        out.reverse()
+        return out
+
+    def refine(self, zone_id, sx, sy, col, row):
+        """Tile path [(col, row), ...] inside *zone_id* to a waypoint, or None."""
+        cols, rows = self._size[zone_id]
+        walk = self._walk[zone_id]
+        idx, target = int(sy) * cols + int(sx), row * cols + col
+        field = self._fields.get(zone_id, {}).get(target)
+        if field is None:
+            path = tile_path(walk, cols, rows, idx, target)
+        elif field[idx] >= _INF:
+            return None
+        else:   # walk downhill in the portal's field
+            path = []
+            while idx != target:
+                idx = min(_steps(walk, cols, rows, idx), key=lambda step: field[step[0]] + step[1])[0]
+                path.append(idx)
+        return None if path is None else [(i % cols, i // cols) for i in path]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from world.demo_level import build_demo_level
+    if len(sys.argv) != 7:
+        sys.exit("usage: python -m world.pathfinding FROM_ZONE X Y TO_ZONE X Y")
+    a, ax, ay, b, bx, by = sys.argv[1:]
+    data = build_demo_level()
+    finder = ZonePathfinder(data["scene_mgr"], data["zone_tiles"])
+    t0 = time.perf_counter()
+    finder.precompute()
+    t1 = time.perf_counter()
+    found = finder.route(a, int(ax), int(ay), b, int(bx), int(by))
+    t2 = time.perf_counter()
+    portals = sum(len(fields) for fields in finder._fields.values())
+    print(f"{portals} portals, precompute {(t1 - t0) * 1000:.1f} ms, query {(t2 - t1) * 1e6:.0f} us")
+    if found is None:
+        print("unreachable")
+    else:
+        print(" -> ".join(f"{z}({c},{r})" for z, c, r in found))
@@ -0,0 +1,443 @@
+# ============================================================
+#  Procedural zones: seeded terrain generated chunk by chunk
+#
+#  A ZoneGenerator plans the zone-wide features (one crossroads,
+#  one meandering river) from its seed, then fills any chunk on
+#  request from per-tile hashes and a per-chunk Random, so every
+#  chunk is independent and identical for the same seed no
+#  matter which order the chunks are generated in.
+#
+#  ChunkStreamer runs the generator on a daemon thread, nearest
+#  chunk to the player first, and hands finished chunks to the
+#  main thread through a queue; stream_scene() pastes a few of
+#  them into the live scene each frame.  Headless runs, recordings
+#  and replays generate inline instead, a fixed number of chunks
+#  per frame, so arrival never depends on thread timing.
+#
+#    python -m world.procgen [BIOME] [SEED] [SIZE]   # generate + validate
+# ============================================================
+import queue
+import random
+import threading
+from collections import deque
+from core.settings import CHUNK_SIZE, PROCGEN_ZONE_SIZE, PROCGEN_CHUNKS_PER_FRAME
+from core.logger import get_logger
+from entities.enemy import Enemy
+from world.iso_map import (
+    IsoMap, WALKABLE_LUT, TILE_EMPTY, TILE_GRASS, TILE_GRASS2, TILE_DIRT,
+    TILE_STONE, TILE_STONE2, TILE_WATER, TILE_WATER2, TILE_SAND, TILE_BRIDGE,
+    TILE_TREE, TILE_CLIFF, draw_house,
+)
+from world.spawn_director import SpawnDirector
+
+log = get_logger("procgen")
+
+# biome -> generation parameters (+ ZONES-style banner keys)
+BIOMES = {
+    "meadow": {
+        "base": TILE_GRASS, "patch": TILE_GRASS2, "patch_p": 0.45,
+        "scatter": TILE_TREE, "scatter_p": 0.03, "water": TILE_WATER,
+        "river_w": 2, "house_p": 0.5, "enemies": ("goblin", "wolf"),
+        "density": 0.004, "name_key": "biome_meadow", "diff_key": "diff_easy",
+    },
+    "forest": {
+        "base": TILE_GRASS2, "patch": TILE_GRASS, "patch_p": 0.35,
+        "scatter": TILE_TREE, "scatter_p": 0.20, "water": TILE_WATER,
+        "river_w": 2, "house_p": 0.1, "enemies": ("wolf", "spider"),
+        "density": 0.006, "name_key": "biome_forest", "diff_key": "diff_medium",
+    },
+    "marsh": {
+        "base": TILE_GRASS2, "patch": TILE_WATER2, "patch_p": 0.30,
+        "scatter": TILE_TREE, "scatter_p": 0.04, "water": TILE_WATER2,
+        "river_w": 3, "house_p": 0.0, "enemies": ("undead", "wight"),
+        "density": 0.006, "name_key": "biome_marsh", "diff_key": "diff_hard",
+    },
+    "mountains": {
+        "base": TILE_STONE2, "patch": TILE_STONE, "patch_p": 0.45,
+        "scatter": TILE_CLIFF, "scatter_p": 0.10, "water": TILE_WATER,
+        "river_w": 1, "house_p": 0.0, "enemies": ("orc", "uruk_archer"),
+        "density": 0.006, "name_key": "biome_mountains", "diff_key": "diff_hard",
+    },
+    "wastes": {
+        "base": TILE_STONE2, "patch": TILE_SAND, "patch_p": 0.40,
+        "scatter": TILE_CLIFF, "scatter_p": 0.05, "water": TILE_WATER2,
+        "river_w": 0, "house_p": 0.0, "enemies": ("orc", "uruk_berserker"),
+        "density": 0.008, "name_key": "biome_wastes", "diff_key": "diff_very_hard",
+    },
+}
+
+NOISE_CELL = 8      # tiles per value-noise lattice cell (size of terrain patches)
+ROAD_WIDTH = 2
+
+ZONE_PREFIX = "wilds"
+
+
+def procedural_zone_id(biome, seed, size=PROCGEN_ZONE_SIZE):
+    """Scene id that encodes everything needed to regenerate the zone."""
+    return f"{ZONE_PREFIX}_{biome}_{seed}_{size}"
+
+
+def parse_zone_id(zone_id):
+    """(biome, seed, size) for a procedural_zone_id(), else None."""
+    parts = zone_id.split("_")
+    if len(parts) != 4 or parts[0] != ZONE_PREFIX or parts[1] not in BIOMES:
+        return None
+    try:
+        return parts[1], int(parts[2]), int(parts[3])
+    except ValueError:
+        return None
+
+
+def _hash01(seed, x, y):
+    """Deterministic pseudo-random float in [0, 1) for a lattice point."""
+    h = (x * 374761393 + y * 668265263 + seed * 2246822519) & 0xFFFFFFFF
+    h = ((h ^ (h >> 13)) * 1274126177) & 0xFFFFFFFF
+    return (h ^ (h >> 16)) / 4294967296.0
+
+
+def _noise(seed, col, row):
+    """Smooth value noise in [0, 1): bilinear blend of the lattice hashes."""
+    gx, fx = divmod(col, NOISE_CELL)
+    gy, fy = divmod(row, NOISE_CELL)
+    tx = fx / NOISE_CELL
+    ty = fy / NOISE_CELL
+    a = _hash01(seed, gx, gy)
+    b = _hash01(seed, gx + 1, gy)
+    c = _hash01(seed, gx, gy + 1)
+    d = _hash01(seed, gx + 1, gy + 1)
+    top = a + (b - a) * tx
+    return top + ((c + (d - c) * tx) - top) * ty
+
+
+class _ChunkCanvas:
+    """set_tile / get_tile over one chunk in zone coordinates (what draw_house needs)."""
+
+    def __init__(self, col0, row0, size, cols, rows):
+        self.col0, self.row0, self.size = col0, row0, size
+        self.cols, self.rows = cols, rows
+        self.tiles = bytearray(size * size)
+
+    def _index(self, col, row):
+        c, r = col - self.col0, row - self.row0
+        if 0 <= c < self.size and 0 <= r < self.size and col < self.cols and row < self.rows:
+            return r * self.size + c
+        return None
+
+    def set_tile(self, col, row, tile_id):
+        i = self._index(col, row)
+        if i is not None:
+            self.tiles[i] = tile_id
+
+    def get_tile(self, col, row):
+        i = self._index(col, row)
+        return TILE_EMPTY if i is None else self.tiles[i]
+
+    def walkable(self, col, row):
+        i = self._index(col, row)
+        return i is not None and WALKABLE_LUT[self.tiles[i]] == 1
+
+
+class GeneratedChunk:
+    """One finished chunk: row-major tile ids plus enemy spawn descriptors."""
+
+    __slots__ = ("cx", "cy", "tiles", "spawns")
+
+    def __init__(self, cx, cy, tiles, spawns):
+        self.cx, self.cy = cx, cy
+        self.tiles = tiles
+        self.spawns = spawns
+
+
+# ============================================================
+#  Generator
+# ============================================================
+class ZoneGenerator:
+    """Deterministic, seeded terrain + enemy placement for one zone."""
+
+    def __init__(self, seed, biome="meadow", cols=PROCGEN_ZONE_SIZE,
+                 rows=PROCGEN_ZONE_SIZE, chunk_size=CHUNK_SIZE):
+        if biome not in BIOMES:
+            raise ValueError(f"unknown biome {biome!r}")
+        self.seed = seed
+        self.biome = biome
+        self.params = BIOMES[biome]
+        self.cols, self.rows = cols, rows
+        self.chunk_size = chunk_size
+        self.chunk_cols = -(-cols // chunk_size)
+        self.chunk_rows = -(-rows // chunk_size)
+
+        plan = random.Random(f"procgen:{seed}:{biome}:plan")
+        # Crossroads: one east-west and one north-south road across the zone
+        self.road_row = plan.randint(rows // 4, rows * 3 // 4)
+        self.road_col = plan.randint(cols // 4, cols * 3 // 4)
+        # River: a north-south random walk, kept clear of the map edges
+        self.river_col = []
+        if self.params["river_w"]:
+            c = plan.randint(cols // 6, cols * 5 // 6)
+            for _ in range(rows):
+                c = min(max(c + plan.choice((-1, 0, 0, 1)), 3), cols - 4)
+                self.river_col.append(c)
+
+    def meta(self, zone_id):
+        """ZONES-style metadata for the HUD banner."""
+        return {"id": zone_id, "name_key": self.params["name_key"],
+                "diff_key": self.params["diff_key"], "procedural": True}
+
+    @property
+    def start(self):
+        """A safe starting tile: the crossroads."""
+        return (self.road_col + 0.5, self.road_row + 0.5)
+
+    def entrances(self):
+        """Road ends on the four map edges (for connectivity validation)."""
+        return [(0, self.road_row), (self.cols - 1, self.road_row),
+                (self.road_col, 0), (self.road_col, self.rows - 1)]
+
+    def _on_road(self, col, row):
+        return (self.road_row <= row < self.road_row + ROAD_WIDTH
+                or self.road_col <= col < self.road_col + ROAD_WIDTH)
+
+    def _in_river(self, col, row, margin=0):
+        if not self.river_col:
+            return False
+        c = self.river_col[row]
+        return c - margin <= col < c + self.params["river_w"] + margin
+
+    # ── Chunks ─────────────────────────────────────────────────────────────
+
+    def chunk_order(self, col, row):
+        """All chunk coordinates, nearest to tile (col, row) first."""
+        cs = self.chunk_size
+        fx, fy = col // cs, row // cs
+        coords = [(cx, cy) for cy in range(self.chunk_rows) for cx in range(self.chunk_cols)]
+        coords.sort(key=lambda p: (abs(p[0] - fx) + abs(p[1] - fy), p[1], p[0]))
+        return coords
+
+    def chunk(self, cx, cy):
+        """Generate chunk (cx, cy); pure function of the seed and coordinates."""
+        p = self.params
+        cs = self.chunk_size
+        col0, row0 = cx * cs, cy * cs
+        col1, row1 = min(col0 + cs, self.cols), min(row0 + cs, self.rows)
+        canvas = _ChunkCanvas(col0, row0, cs, self.cols, self.rows)
+        rnd = random.Random(f"procgen:{self.seed}:{self.biome}:{cx}:{cy}")
+        seed = self.seed
+
+        # Terrain: noise patches, scattered obstacles, river, roads
+        for row in range(row0, row1):
+            for col in range(col0, col1):
+                tile = p["patch"] if _noise(seed, col, row) < p["patch_p"] else p["base"]
+                if _hash01(seed ^ 0x5EED, col, row) < p["scatter_p"]:
+                    tile = p["scatter"]
+                if self._in_river(col, row):
+                    tile = p["water"]
+                if self._on_road(col, row):
+                    tile = TILE_BRIDGE if self._in_river(col, row) else TILE_DIRT
+                canvas.set_tile(col, row, tile)
+
+        # Houses: fully inside the chunk, clear of roads and the river
+        if p["house_p"] and rnd.random() < p["house_p"]:
+            w, h = rnd.randint(4, 6), rnd.randint(4, 5)
+            c1 = rnd.randint(col0 + 1, max(col0 + 1, col1 - w - 2))
+            r1 = rnd.randint(row0 + 1, max(row0 + 1, row1 - h - 3))
+            c2, r2 = c1 + w, r1 + h
+            clear = c2 < col1 - 1 and r2 + 1 < row1 - 1 and not any(
+                self._on_road(c, r) or self._in_river(c, r, margin=1)
+                for r in range(r1 - 1, r2 + 2) for c in range(c1 - 1, c2 + 2))
+            if clear:
+                door = (c1 + c2) // 2
+                draw_house(canvas, c1, r1, c2, r2, door, r2)
+                canvas.set_tile(door, r2 + 1, TILE_DIRT)
+
+        # Enemies: on open ground (3x3 walkable), off the roads
+        spawns = []
+        area = (col1 - col0) * (row1 - row0)
+        count = int(area * p["density"] + rnd.random())
+        for _ in range(count * 8):
+            if len(spawns) >= count:
+                break
+            col, row = rnd.randrange(col0, col1), rnd.randrange(row0, row1)
+            if self._on_road(col, row):
+                continue
+            if all(canvas.walkable(col + dc, row + dr)
+                   for dr in (-1, 0, 1) for dc in (-1, 0, 1)):
+                spawns.append({"kind": "enemy", "type": rnd.choice(p["enemies"]),
+                               "wx": col + 0.5, "wy": row + 0.5})
+        return GeneratedChunk(cx, cy, bytes(canvas.tiles), spawns)
+
+    def build(self):
+        """Generate the whole zone synchronously; returns (IsoMap, spawns)."""
+        m = IsoMap(self.cols, self.rows)
+        spawns = []
+        for cx, cy in self.chunk_order(*map(int, self.start)):
+            chunk = self.chunk(cx, cy)
+            paste_chunk(m, chunk, self.chunk_size)
+            spawns += chunk.spawns
+        return m, spawns
+
+
+def paste_chunk(iso_map, chunk, chunk_size):
+    iso_map.paste(chunk.cx * chunk_size, chunk.cy * chunk_size, chunk_size, chunk.tiles)
+
+
+def validate_zone(iso_map, spawns, entrances=()):
+    """Return a list of problems: spawns on solid tiles, unreachable entrances."""
+    problems = [f"spawn on solid tile at ({s['wx']}, {s['wy']})"
+                for s in spawns if not iso_map.is_walkable(s["wx"], s["wy"])]
+    entrances = list(entrances)
+    if entrances:
+        cols, rows = iso_map.cols, iso_map.rows
+        walk = iso_map.walkable
+        c0, r0 = entrances[0]
+        seen = bytearray(cols * rows)
+        seen[r0 * cols + c0] = 1
+        todo = deque([(c0, r0)])
+        while todo:
+            c, r = todo.popleft()
+            for nc, nr in ((c + 1, r), (c - 1, r), (c, r + 1), (c, r - 1)):
+                if 0 <= nc < cols and 0 <= nr < rows:
+                    i = nr * cols + nc
+                    if walk[i] and not seen[i]:
+                        seen[i] = 1
+                        todo.append((nc, nr))
+        problems += [f"entrance ({c}, {r}) unreachable"
+                     for c, r in entrances if not seen[r * cols + c]]
+    return problems
+
+
+# ============================================================
+#  Background streaming
+# ============================================================
+class ChunkStreamer:
+    """Generates a zone's chunks on a worker thread, nearest to the focus first."""
+
+    def __init__(self, generator, focus=None, threaded=True):
+        self.generator = generator
+        self.ready = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = set((cx, cy) for cy in range(generator.chunk_rows)
+                            for cx in range(generator.chunk_cols))
+        self._focus = focus or generator.start
+        self._stop = False
+        self.remaining = len(self._pending)    # chunks not yet pasted
+        # Claimed before the worker starts, so the caller always gets it
+        self.first = self._next()
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="procgen", daemon=True)
+            self._thread.start()
+
+    @property
+    def done(self):
+        return self.remaining == 0
+
+    def set_focus(self, wx, wy):
+        self._focus = (wx, wy)
+
+    def _next(self):
+        with self._lock:
+            if not self._pending:
+                return None
+            cs = self.generator.chunk_size
+            fx, fy = self._focus[0] / cs - 0.5, self._focus[1] / cs - 0.5
+            best = min(self._pending,
+                       key=lambda p: ((p[0] - fx) ** 2 + (p[1] - fy) ** 2, p[1], p[0]))
+            self._pending.discard(best)
+            return best
+
+    def _run(self):
+        while not self._stop:
+            coords = self._next()
+            if coords is None:
+                return
+            try:
+                self.ready.put(self.generator.chunk(*coords))
+            except Exception:
+                log.exception("Chunk generation failed at %s", coords)
+                return
+
+    def poll(self, max_chunks=PROCGEN_CHUNKS_PER_FRAME):
+        """Finished chunks (at most *max_chunks*) without blocking.
+
+        Without a worker thread the chunks are generated here instead.
+        """
+        out = []
+        while len(out) < max_chunks:
+            if self._thread is None:
+                coords = self._next()
+                if coords is None:
+                    break
+                out.append(self.generator.chunk(*coords))
+                continue
+            try:
+                out.append(self.ready.get_nowait())
+            except queue.Empty:
+                break
+        self.remaining -= len(out)
+        return out
+
+    def close(self):
+        self._stop = True
+
+
+def build_procedural_scene(zone_id, seed, biome="meadow", cols=PROCGEN_ZONE_SIZE,
+                           rows=PROCGEN_ZONE_SIZE, threaded=True):
+    """Scene dict whose map streams in around the start point.
+
+    The chunk under the start tile is generated immediately so the
+    player never lands on missing terrain; the rest arrive through
+    scene["streamer"] (see stream_scene).
+    """
+    gen = ZoneGenerator(seed, biome, cols, rows)
+    m = IsoMap(cols, rows)
+    m.fill_rect(0, 0, cols, rows, TILE_EMPTY)
+    scene = {"iso_map": m, "enemies": [], "npcs": [],
+             "spawner": SpawnDirector([]), "meta": gen.meta(zone_id),
+             "player_start": gen.start}
+    streamer = ChunkStreamer(gen, threaded=threaded)
+    _apply_chunk(scene, gen.chunk(*streamer.first), gen.chunk_size)
+    streamer.remaining -= 1
+    scene["streamer"] = streamer
+    log.info("Procedural zone %s: %s seed=%s %dx%d", zone_id, biome, seed, cols, rows)
+    return scene
+
+
+def _apply_chunk(scene, chunk, chunk_size):
+    paste_chunk(scene["iso_map"], chunk, chunk_size)
+    enemies = [Enemy(s["wx"], s["wy"], s["type"]) for s in chunk.spawns]
+    scene["enemies"].extend(enemies)
+    scene["spawner"].add_enemies(enemies)
+
+
+def stream_scene(scene, player=None):
+    """Paste any finished chunks into *scene*; returns how many arrived."""
+    streamer = scene.get("streamer")
+    if streamer is None:
+        return 0
+    if player:
+        streamer.set_focus(player.wx, player.wy)
+    chunks = streamer.poll()
+    for chunk in chunks:
+        _apply_chunk(scene, chunk, streamer.generator.chunk_size)
+    if streamer.done:
+        del scene["streamer"]
+        log.info("Procedural zone %s fully generated", scene["meta"]["id"])
+    return len(chunks)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    biome = sys.argv[1] if len(sys.argv) > 1 else "meadow"
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    size = int(sys.argv[3]) if len(sys.argv) > 3 else PROCGEN_ZONE_SIZE
+    t0 = time.perf_counter()
+    gen = ZoneGenerator(seed, biome, size, size)
+    m, spawns = gen.build()
+    problems = validate_zone(m, spawns, gen.entrances())
+    print(f"{biome} seed={seed} {size}x{size}: {len(spawns)} enemies, "
+          f"{m.count_walkable(0, 0, size, size) / (size * size):.0%} walkable, "
+          f"{time.perf_counter() - t0:.2f}s")
+    for p in problems:
+        print("  PROBLEM:", p)
+    sys.exit(1 if problems else 0)
@@ -11,8 +11,27 @@
 #
 #  Transitions: walking off a scene edge teleports the
 #  player to the adjacent scene with a brief black fade.
+#  Neighbours are built and warmed (nav field, minimap, music)
+#  while the player approaches their edge, so the switch itself
+#  has nothing left to compute.
+#
+#  At most SCENE_RESIDENT_MAX scenes stay built; the least
+#  recently visited are evicted to compact snapshots (tile diff
+#  + entity states) and rebuilt from them on the next visit.
+#
+#  Seamless mode (world/seamless.py) stitches the grid into one
+#  continuous space instead: edges are crossed without a fade and
+#  the zones around the player are kept built (pinned).
 # ============================================================
+import queue
+import threading
+import time
+import zlib
 import pygame
+from core.settings import SCENE_PREFETCH_EDGE, SCENE_PREFETCH_BUDGET_MS, SCENE_RESIDENT_MAX
+from core.logger import get_logger
+
+log = get_logger("scene")
 
 SCENE_SIZE = 30   # every scene is SCENE_SIZE × SCENE_SIZE tiles
 
@@ -46,18 +65,103 @@ class SceneManager:
     FADE_SPEED = 14   # alpha decremented per frame (255 / 14 ≈ 18 frames fade)
 
     def __init__(self):
-        # zone_id → { "iso_map": IsoMap, "enemies": [...], "npcs": [...] }
+        # Built scenes only: zone_id → { "iso_map": IsoMap, "enemies": [...],
+        #                                "npcs": [...], "spawner": SpawnDirector }
         self.scenes: dict = {}
+        # zone_id → callable() returning a fresh scene; built on first get()
+        self._builders: dict = {}
+        self.zone_ids: list = []     # every known zone, in registration order
         self.active_id: str | None = None
         # Fade overlay: 255 = fully black, 0 = fully transparent
         self.fade_alpha: int = 0
+        # Neighbour prefetch: SceneWarmer set by the game (None = build only)
+        self.warmer = None
+        self.baked: dict = {}        # zone_id -> warm-up results (see SceneWarmer)
+        self._prefetched = set()     # zones already built + queued for warm-up
+        # Eviction: zone_id -> compact snapshot_scene(); visit order, oldest first
+        self.evicted: dict = {}
+        self.lru: list = []
+        self.resident_max = SCENE_RESIDENT_MAX
+        self.pinned: set = set()     # zones trim() must keep (seamless window)
+        self._pristine: dict = {}    # zone_id -> zlib'd freshly built tiles
 
     # ------------------------------------------------------------------
     #  Scene access
     # ------------------------------------------------------------------
+    def register(self, zone_id: str, builder):
+        """Add a zone that is built lazily by *builder* on first access."""
+        if zone_id not in self._builders and zone_id not in self.scenes:
+            self.zone_ids.append(zone_id)
+        self._builders[zone_id] = builder
+
+    def add(self, zone_id: str, scene: dict):
+        """Add an already built scene (no builder: it can't be unloaded)."""
+        if zone_id not in self._builders and zone_id not in self.scenes:
+            self.zone_ids.append(zone_id)
+        self.scenes[zone_id] = scene
+
+    def has_zone(self, zone_id: str) -> bool:
+        return zone_id in self.scenes or zone_id in self._builders
+
+    def is_built(self, zone_id: str) -> bool:
+        return zone_id in self.scenes
+
+    def get(self, zone_id: str) -> dict:
+        """Return the scene, building it first if needed (counts as a visit)."""
+        scene = self.scenes.get(zone_id)
+        if scene is None:
+            t0 = time.perf_counter()
+            scene = self.scenes[zone_id] = self._builders[zone_id]()
+            tiles = bytes(scene["iso_map"].tiles)
+            self._pristine.setdefault(zone_id, zlib.compress(tiles))
+            compact = self.evicted.pop(zone_id, None)
+            if compact is not None:
+                from core.snapshot import restore_scene
+                restore_scene(scene, compact)
+            log.info("Scene %s: %s (%.1f ms)", "restored" if compact else "built",
+                     zone_id, (time.perf_counter() - t0) * 1000)
+        if zone_id in self._builders:
+            if zone_id in self.lru:
+                self.lru.remove(zone_id)
+            self.lru.append(zone_id)
+        return scene
+
+    def unload(self, zone_id: str):
+        """Drop a built scene; the next get() rebuilds it from its builder."""
+        if zone_id in self._builders:
+            self.scenes.pop(zone_id, None)
+            self.evicted.pop(zone_id, None)
+            if zone_id in self.lru:
+                self.lru.remove(zone_id)
+            self.baked.pop(zone_id, None)
+            self._prefetched.discard(zone_id)
+
+    def evict(self, zone_id: str):
+        """Unload a scene but keep its state; the next get() restores it."""
+        from core.snapshot import snapshot_scene
+        scene = self.scenes[zone_id]
+        compact = snapshot_scene(scene, zlib.decompress(self._pristine[zone_id]))
+        self.unload(zone_id)
+        self.evicted[zone_id] = compact
+        log.info("Scene evicted: %s", zone_id)
+
+    def trim(self):
+        """Evict least recently visited scenes down to resident_max (never the active or a pinned one)."""
+        for zone_id in list(self.lru):
+            if len(self.scenes) <= self.resident_max:
+                break
+            if zone_id != self.active_id and zone_id not in self.pinned:
+                self.evict(zone_id)
+
+    def build_all(self) -> dict:
+        """Materialize every zone (tools / reports); returns self.scenes."""
+        for zone_id in self.zone_ids:
+            self.get(zone_id)
+        return self.scenes
+
     @property
     def active(self) -> dict:
-        return self.scenes[self.active_id]
+        return self.get(self.active_id)
 
     @property
     def iso_map(self):
@@ -68,10 +172,68 @@ class SceneManager:
     # ------------------------------------------------------------------
     def neighbor_id(self, direction: str) -> str | None:
         """Return zone_id of the neighbor in *direction*, or None at world edge."""
+        if self.active_id not in ZONE_GRID:   # procedural zones stand alone
+            return None
         cb, rb = ZONE_GRID[self.active_id]
         dc, dr = _DIR_DELTA[direction]
         return GRID_TO_ZONE.get((cb + dc, rb + dr))
 
+    def edge_neighbors(self, wx: float, wy: float, margin: float) -> list:
+        """Neighbour zones whose shared edge is within *margin* tiles, nearest first."""
+        m = self.iso_map
+        dist = {"west": wx, "east": m.cols - wx, "north": wy, "south": m.rows - wy}
+        out = []
+        for direction in sorted(dist, key=dist.get):
+            if dist[direction] >= margin:
+                break
+            zone_id = self.neighbor_id(direction)
+            if zone_id:
+                out.append(zone_id)
+        return out
+
+    # ------------------------------------------------------------------
+    #  Prefetch (call every gameplay frame)
+    # ------------------------------------------------------------------
+    def prefetch(self, wx: float, wy: float, margin: float = SCENE_PREFETCH_EDGE):
+        """Get the neighbours the player is walking towards ready in advance.
+
+        Lazy scenes are built here, at most one per call: builders draw
+        from the shared RNG streams, so they must run on the game thread
+        at the same frame in every run.  The rest of the warm-up goes to
+        the warmer, whose finished results are collected into self.baked.
+        """
+        self.warm(self.edge_neighbors(wx, wy, margin))
+
+    def warm(self, zone_ids):
+        """Build (at most one per call) and warm up *zone_ids*, in order."""
+        for zone_id in zone_ids:
+            if zone_id in self._prefetched:
+                continue
+            built = self.is_built(zone_id)
+            scene = self.get(zone_id)
+            self._prefetched.add(zone_id)
+            if self.warmer:
+                self.warmer.submit(zone_id, scene)
+            if not built:
+                self.trim()
+                break
+        if self.warmer:
+            for zone_id, scene, baked in self.warmer.poll():
+                if self.scenes.get(zone_id) is not scene:   # unloaded meanwhile
+                    continue
+                if "nav" in baked:
+                    scene["iso_map"].install_nav(baked.pop("nav"))
+                self.baked[zone_id] = baked
+
+    def take_baked(self, zone_id: str) -> dict:
+        """Pop the warm-up results for *zone_id* ({} if none are ready)."""
+        self._prefetched.discard(zone_id)   # warm again when next approached
+        return self.baked.pop(zone_id, {})
+
+    def close(self):
+        if self.warmer:
+            self.warmer.close()
+
     # ------------------------------------------------------------------
     #  Fade animation (call update_fade every frame)
     # ------------------------------------------------------------------
@@ -101,3 +263,68 @@ class SceneManager:
             if z["id"] == self.active_id:
                 return z
         return None
+
+
+# ============================================================
+#  SceneWarmer: off-thread warm-up of prefetched scenes
+# ============================================================
+class SceneWarmer:
+    """Runs bake(zone_id, scene) -> dict for prefetched scenes on a worker.
+
+    bake must only read the scene (nav field, minimap image, audio
+    files); results are handed back to the game thread by poll().
+    Without a worker thread poll() runs the bakes itself, stopping
+    once *budget_ms* is spent.
+    """
+
+    def __init__(self, bake, threaded=True):
+        self.bake = bake
+        self._jobs = queue.Queue()
+        self._done = queue.Queue()
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="scene-warm", daemon=True)
+            self._thread.start()
+
+    def submit(self, zone_id, scene):
+        self._jobs.put((zone_id, scene))
+
+    def _bake(self, zone_id, scene):
+        t0 = time.perf_counter()
+        try:
+            baked = self.bake(zone_id, scene)
+        except Exception:
+            log.exception("Scene warm-up failed: %s", zone_id)
+            baked = {}
+        log.debug("Scene warmed: %s (%.1f ms)", zone_id, (time.perf_counter() - t0) * 1000)
+        return zone_id, scene, baked
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            self._done.put(self._bake(*job))
+
+    def poll(self, budget_ms=SCENE_PREFETCH_BUDGET_MS):
+        """Finished warm-ups, without blocking."""
+        out = []
+        if self._thread is None:
+            deadline = time.perf_counter() + budget_ms / 1000
+            while time.perf_counter() < deadline:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                out.append(self._bake(*job))
+            return out
+        while True:
+            try:
+                out.append(self._done.get_nowait())
+            except queue.Empty:
+                return out
+
+    def close(self):
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread = None
@@ -0,0 +1,228 @@
+# ============================================================
+#  SeamlessWorld: the 4×4 zone grid as one open world
+#
+#  Optional mode (Settings → Seamless World).  Every zone keeps
+#  its own local coordinates, map and entity lists, so quests,
+#  spawners, saves and replays work unchanged; the grid is only
+#  placed in one world space (zone (col, row) starts at tile
+#  col*30, row*30) and handled as a continuous area around the
+#  player, in chunks of SEAMLESS_CHUNK tiles:
+#
+#   - streaming:  zones overlapping the SEAMLESS_LOAD_RADIUS chunk
+#     window are built (one per frame), warmed and pinned; zones
+#     leaving it fall back to the normal LRU eviction
+#   - simulation: the active zone runs as usual; entities of the
+#     other loaded zones inside the SEAMLESS_SIM_RADIUS window run
+#     in their own zone's frame (floating origin: player and
+#     camera are shifted into it for the duration); their sight
+#     lines continue into the neighbouring zones' tiles instead
+#     of stopping at the map edge
+#   - drawing:    neighbour terrain and entities go through a
+#     shifted camera, depth-sorted with the active zone
+#   - crossing an edge rebases player and camera by one zone
+#     offset instead of teleporting, so the view never jumps
+# ============================================================
+from contextlib import contextmanager
+from core.settings import SEAMLESS_CHUNK, SEAMLESS_LOAD_RADIUS, SEAMLESS_SIM_RADIUS
+from core.utils import world_to_screen
+from core.logger import get_logger
+from world.camera import Camera
+from world.influence import InfluenceMaps
+from world.iso_map import TILE_WALL
+from world.scene_manager import SCENE_SIZE, ZONE_GRID, GRID_TO_ZONE
+
+log = get_logger("scene")
+
+_EDGE = 1e-3   # a crossing lands this far inside the neighbour's far border
+
+
+class SeamlessWorld:
+    """Streams, simulates and draws the zones around the player as one space."""
+
+    def __init__(self, scene_mgr):
+        self.scene_mgr = scene_mgr
+        self.loaded: list = []   # zones overlapping the load window, row-major
+
+    # ------------------------------------------------------------------
+    #  Coordinates
+    # ------------------------------------------------------------------
+    @staticmethod
+    def covers(zone_id) -> bool:
+        """Procedural zones are not part of the grid and stay standalone."""
+        return zone_id in ZONE_GRID
+
+    @staticmethod
+    def origin(zone_id):
+        """World position of the zone's (0, 0) tile."""
+        cb, rb = ZONE_GRID[zone_id]
+        return cb * SCENE_SIZE, rb * SCENE_SIZE
+
+    def offset(self, zone_id):
+        """Origin of *zone_id* in the active zone's local coordinates."""
+        zx, zy = self.origin(zone_id)
+        ax, ay = self.origin(self.scene_mgr.active_id)
+        return zx - ax, zy - ay
+
+    def tile_at(self, zone_id, col, row):
+        """Tile at *zone_id*-local (col, row), looked up in whichever built zone holds it."""
+        zx, zy = self.origin(zone_id)
+        gx, gy = zx + col, zy + row
+        owner = GRID_TO_ZONE.get((gx // SCENE_SIZE, gy // SCENE_SIZE))
+        scene = self.scene_mgr.scenes.get(owner) if owner else None
+        if scene is None:   # off the grid, or not built yet
+            return TILE_WALL
+        ox, oy = self.origin(owner)
+        return scene["iso_map"].get_tile(gx - ox, gy - oy)
+
+    @staticmethod
+    def window(gx, gy, radius):
+        """World tile box (c1, r1, c2, r2) of the chunks within *radius* of (gx, gy)'s chunk."""
+        cx, cy = int(gx // SEAMLESS_CHUNK), int(gy // SEAMLESS_CHUNK)
+        return ((cx - radius) * SEAMLESS_CHUNK, (cy - radius) * SEAMLESS_CHUNK,
+                (cx + radius + 1) * SEAMLESS_CHUNK, (cy + radius + 1) * SEAMLESS_CHUNK)
+
+    @staticmethod
+    def zones_in(box) -> list:
+        """Grid zones overlapping a world tile box, row-major."""
+        c1, r1, c2, r2 = box
+        out = []
+        for rb in range(max(0, r1 // SCENE_SIZE), (r2 - 1) // SCENE_SIZE + 1):
+            for cb in range(max(0, c1 // SCENE_SIZE), (c2 - 1) // SCENE_SIZE + 1):
+                zone_id = GRID_TO_ZONE.get((cb, rb))
+                if zone_id:
+                    out.append(zone_id)
+        return out
+
+    # ------------------------------------------------------------------
+    #  Streaming + simulation (call every gameplay frame)
+    # ------------------------------------------------------------------
+    def update(self, game):
+        """Stream the load window in and run the neighbours' awake entities."""
+        sm = self.scene_mgr
+        player = game.entities.player
+        ax, ay = self.origin(sm.active_id)
+        gx, gy = player.wx + ax, player.wy + ay
+        self.loaded = self.zones_in(self.window(gx, gy, SEAMLESS_LOAD_RADIUS))
+        sm.pinned = set(self.loaded)
+        sm.warm([z for z in self.loaded if z != sm.active_id])
+
+        awake = self.window(gx, gy, SEAMLESS_SIM_RADIUS)
+        for zone_id in self.zones_in(awake):
+            if zone_id != sm.active_id and sm.is_built(zone_id):
+                self._simulate(game, zone_id, awake)
+
+    def _simulate(self, game, zone_id, box):
+        """One tick of a neighbour zone; only entities inside *box* move."""
+        scene = self.scene_mgr.scenes[zone_id]
+        zx, zy = self.origin(zone_id)
+        c1, r1, c2, r2 = box[0] - zx, box[1] - zy, box[2] - zx, box[3] - zy
+        with self.zone_frame(game, zone_id) as ents:
+            ents.crowd.update(ents, game.iso_map)
+            game.influence.update(ents)
+            for e in ents.enemies + ents.npcs:
+                if e.active and c1 <= e.wx < c2 and r1 <= e.wy < r2:
+                    e.update(game)
+            for p in ents.projectiles:
+                if p.active:
+                    p.update(game)
+            ents.projectiles[:] = [p for p in ents.projectiles if p.active]
+            spawner = scene.get("spawner")
+            if spawner:
+                spawner.update(scene, ents.player, game.camera)
+
+    @contextmanager
+    def zone_frame(self, game, zone_id):
+        """Make *zone_id* the simulated zone, with player and camera shifted into its frame."""
+        scene = self.scene_mgr.scenes[zone_id]
+        ents, player, camera = game.entities, game.entities.player, game.camera
+        ox, oy = self.offset(zone_id)
+        sx, sy = world_to_screen(ox, oy)
+        iso_map = scene["iso_map"]
+        saved = (game.iso_map, game.influence, ents.enemies, ents.npcs, ents.projectiles,
+                 player.wx, player.wy, camera.offset_x, camera.offset_y, iso_map.outside)
+        game.iso_map = iso_map
+        # the player stands off this map: let sight lines cross into the neighbours
+        iso_map.outside = lambda col, row: self.tile_at(zone_id, col, row)
+        game.influence = InfluenceMaps.for_scene(scene)
+        ents.enemies, ents.npcs = scene["enemies"], scene["npcs"]
+        ents.projectiles = scene.setdefault("projectiles", [])
+        player.wx -= ox
+        player.wy -= oy
+        camera.offset_x -= sx
+        camera.offset_y -= sy
+        try:
+            yield ents
+        finally:
+            # Restore exact values: subtracting and re-adding would drift
+            (game.iso_map, game.influence, ents.enemies, ents.npcs, ents.projectiles,
+             player.wx, player.wy, camera.offset_x, camera.offset_y, iso_map.outside) = saved
+
+    # ------------------------------------------------------------------
+    #  Edge crossing
+    # ------------------------------------------------------------------
+    def cross(self, game, direction) -> bool:
+        """Step into the neighbour in *direction* without a fade; False if blocked there."""
+        sm = self.scene_mgr
+        neighbor = sm.neighbor_id(direction)
+        if not neighbor:
+            return False
+        m = sm.get(neighbor)["iso_map"]
+        player = game.entities.player
+        ox, oy = self.offset(neighbor)
+        x = min(max(player.wx - ox, 0.0), m.cols - _EDGE)
+        y = min(max(player.wy - oy, 0.0), m.rows - _EDGE)
+        if not m.can_occupy(x, y, player.radius):
+            return False   # the edge acts as a wall
+
+        prev_id, prev = sm.active_id, sm.active
+        in_flight = game.entities.projectiles
+        game._activate_scene(neighbor, start_fade=False)
+        if in_flight:   # keep flying in the zone they were fired in
+            prev["projectiles"] = in_flight
+        player.wx, player.wy = x, y
+        sx, sy = world_to_screen(ox, oy)
+        game.camera.offset_x -= sx
+        game.camera.offset_y -= sy
+        log.info("Seamless crossing: %s -> %s", prev_id, neighbor)
+        return True
+
+    # ------------------------------------------------------------------
+    #  Drawing
+    # ------------------------------------------------------------------
+    def _views(self, game):
+        """(depth offset, iso_map, entities, camera) per built loaded zone, back to front."""
+        sm = self.scene_mgr
+        views = [(0, game.iso_map, game.entities.all_entities(), game.camera)]
+        for zone_id in self.loaded:
+            scene = sm.scenes.get(zone_id)
+            if zone_id == sm.active_id or scene is None:
+                continue
+            ox, oy = self.offset(zone_id)
+            sx, sy = world_to_screen(ox, oy)
+            cam = Camera()
+            cam.offset_x = game.camera.offset_x - sx
+            cam.offset_y = game.camera.offset_y - sy
+            ents = [e for e in scene["enemies"] + scene["npcs"] + scene.get("projectiles", [])
+                    if e.active and cam.is_visible(e.wx, e.wy, margin=32)]
+            views.append((ox + oy, scene["iso_map"], ents, cam))
+        views.sort(key=lambda v: v[0])
+        return views
+
+    @staticmethod
+    def _depth_sorted(views):
+        items = [(e.sort_key + depth, e, cam) for depth, _, ents, cam in views for e in ents]
+        items.sort(key=lambda it: it[0])
+        return items
+
+    def draw(self, surface, game):
+        """Terrain of every loaded zone, then all their entities depth-sorted together."""
+        views = self._views(game)
+        for _, iso_map, _, cam in views:
+            iso_map.draw(surface, cam)
+        for _, e, cam in self._depth_sorted(views):
+            e.draw(surface, cam)
+
+    def draw_labels(self, surface, game):
+        """Entity labels of every loaded zone (screen layer, after scaling)."""
+        for _, e, cam in self._depth_sorted(self._views(game)):
+            e.draw_labels(surface, cam)
@@ -0,0 +1,203 @@
+# ============================================================
+#  Spawn director: per-scene enemy population management
+#
+#  Each scene gets a spawn table (one slot per enemy placed by
+#  its builder).  When an enemy dies its object goes back to a
+#  pool and its slot is scheduled to respawn after a delay —
+#  off-screen, away from the player, at most one spawn per
+#  SPAWN_MIN_INTERVAL frames and never above the live budget.
+# ============================================================
+import heapq
+from entities.enemy import Enemy
+from core.settings import (
+    SPAWN_RESPAWN_DELAY, SPAWN_MIN_INTERVAL,
+    SPAWN_SCREEN_MARGIN, SPAWN_MIN_PLAYER_DIST,
+)
+from core.utils import distance
+
+
+class SpawnSlot:
+    """One row of a spawn table: what spawns where, and whether it comes back."""
+
+    __slots__ = ("enemy_type", "wx", "wy", "respawn")
+
+    def __init__(self, enemy_type, wx, wy, respawn=True):
+        self.enemy_type = enemy_type
+        self.wx = wx
+        self.wy = wy
+        self.respawn = respawn
+
+
+class EnemyPool:
+    """Free-lists of dead Enemy objects, keyed by enemy_type."""
+
+    def __init__(self):
+        self._free = {}   # enemy_type -> [Enemy, ...]
+
+    def acquire(self, enemy_type, wx, wy):
+        free = self._free.get(enemy_type)
+        if free:
+            enemy = free.pop()
+            enemy.reset(wx, wy)
+            return enemy
+        return Enemy(wx, wy, enemy_type)
+
+    def release(self, enemy):
+        self._free.setdefault(enemy.enemy_type, []).append(enemy)
+
+    def __len__(self):
+        return sum(len(v) for v in self._free.values())
+
+
+class SpawnDirector:
+    """Keeps one scene's enemy list populated within a live budget.
+
+    The director mutates scene["enemies"] in place (the same list the
+    EntityManager iterates while the scene is active): dead enemies are
+    removed and recycled, respawned ones are appended.
+    """
+
+    def __init__(self, slots, budget=None, respawn_delay=SPAWN_RESPAWN_DELAY,
+                 min_interval=SPAWN_MIN_INTERVAL):
+        self.slots = list(slots)
+        self.budget = len(self.slots) if budget is None else budget
+        self.respawn_delay = respawn_delay
+        self.min_interval = min_interval
+        self.pool = EnemyPool()
+
+        self.tick = 0
+        self._next_spawn_tick = 0
+        self._pending = []        # heap of (due_tick, seq, slot)
+        self._seq = 0
+        self._slot_of = {}        # id(enemy) -> SpawnSlot for live enemies
+
+    @classmethod
+    def from_enemies(cls, enemies, **kwargs):
+        """Build a spawn table from a builder's initial placement.
+
+        Bosses are one-off: their slot never respawns.
+        """
+        slots = [SpawnSlot(e.enemy_type, e.wx, e.wy, respawn=not e.is_boss)
+                 for e in enemies]
+        director = cls(slots, **kwargs)
+        for e, slot in zip(enemies, slots):
+            director._slot_of[id(e)] = slot
+        return director
+
+    def add_enemies(self, enemies):
+        """Extend the table with enemies placed after construction (streamed chunks)."""
+        for e in enemies:
+            slot = SpawnSlot(e.enemy_type, e.wx, e.wy, respawn=not e.is_boss)
+            self.slots.append(slot)
+            self._slot_of[id(e)] = slot
+        self.budget += len(enemies)
+
+    # ------------------------------------------------------------------
+    #  Per-frame update (active scene only)
+    # ------------------------------------------------------------------
+    def update(self, scene, player, camera):
+        self.tick += 1
+        enemies = scene["enemies"]
+        self._reap(enemies)
+        if self._pending and self.tick >= self._next_spawn_tick:
+            self._spawn_due(enemies, scene["iso_map"], player, camera)
+
+    def _reap(self, enemies):
+        """Drop finished enemies from the scene list and schedule their slots."""
+        if all(e.active for e in enemies):
+            return
+        alive = []
+        for e in enemies:
+            if e.active:
+                alive.append(e)
+                continue
+            slot = self._slot_of.pop(id(e), None)
+            self.pool.release(e)
+            if slot is not None and slot.respawn:
+                self._seq += 1
+                heapq.heappush(self._pending,
+                               (self.tick + self.respawn_delay, self._seq, slot))
+        enemies[:] = alive
+
+    def _spawn_due(self, enemies, iso_map, player, camera):
+        """Spawn at most one due slot whose home point is out of sight."""
+        if len(enemies) >= self.budget:
+            return
+        deferred = []
+        spawned = False
+        while self._pending and self._pending[0][0] <= self.tick:
+            entry = heapq.heappop(self._pending)
+            slot = entry[2]
+            if spawned or not self._can_spawn_at(slot, iso_map, player, camera):
+                deferred.append(entry)
+                continue
+            enemy = self.pool.acquire(slot.enemy_type, slot.wx, slot.wy)
+            self._slot_of[id(enemy)] = slot
+            enemies.append(enemy)
+            spawned = True
+        for entry in deferred:
+            heapq.heappush(self._pending, entry)
+        if spawned:
+            self._next_spawn_tick = self.tick + self.min_interval
+
+    @staticmethod
+    def _can_spawn_at(slot, iso_map, player, camera):
+        if player and distance(slot.wx, slot.wy, player.wx, player.wy) < SPAWN_MIN_PLAYER_DIST:
+            return False
+        if camera and camera.is_visible(slot.wx, slot.wy, SPAWN_SCREEN_MARGIN):
+            return False
+        return iso_map.can_occupy(slot.wx, slot.wy, 0.0)
+
+    # ------------------------------------------------------------------
+    #  Save files
+    # ------------------------------------------------------------------
+    def dead_slots(self, enemies):
+        """[[slot index, frames until respawn or None], ...] for every slot without a live enemy."""
+        slot_idx = {id(s): i for i, s in enumerate(self.slots)}
+        live = [slot_idx[id(self._slot_of[id(e)])] for e in enemies
+                if e.active and id(e) in self._slot_of]
+        pending = [(due, slot_idx[id(slot)]) for due, _, slot in self._pending]
+        return dead_slot_list(len(self.slots), live, self.tick, pending)
+
+    def apply_dead_slots(self, enemies, dead):
+        """Apply dead_slots() output to a freshly built scene's *enemies* list.
+
+        Slots without a due time respawn after the full delay; one-off
+        slots (bosses) stay dead.  Unknown slot indices are ignored.
+        """
+        dead = {i: frames for i, frames in dead if 0 <= i < len(self.slots)}
+        slot_idx = {id(s): i for i, s in enumerate(self.slots)}
+        alive = []
+        for e in enemies:
+            slot = self._slot_of.get(id(e))
+            if slot is None or slot_idx[id(slot)] not in dead:
+                alive.append(e)
+                continue
+            del self._slot_of[id(e)]
+            self.pool.release(e)
+        enemies[:] = alive
+        for i, frames in sorted(dead.items()):
+            slot = self.slots[i]
+            if slot.respawn:
+                delay = self.respawn_delay if frames is None else frames
+                self._seq += 1
+                heapq.heappush(self._pending, (self.tick + delay, self._seq, slot))
+
+    # ------------------------------------------------------------------
+    #  Introspection
+    # ------------------------------------------------------------------
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+
+def dead_slot_list(n_slots, live, tick, pending):
+    """Shared by SpawnDirector.dead_slots and evicted-scene snapshots.
+
+    *live* are slot indices with a live enemy, *pending* (due_tick, slot
+    index) respawns; slots that are neither get None (boss, or dead but
+    not reaped yet).
+    """
+    due = {i: max(0, d - tick) for d, i in pending}
+    live = set(live)
+    return [[i, due.get(i)] for i in range(n_slots) if i not in live]